@@ -0,0 +1,129 @@
+from typing import Dict, List, Optional, Tuple
+from functools import lru_cache
+from itertools import permutations
+import numpy as np
+
+PERMUTATION_TABLE_MAX = 8
+
+@lru_cache(maxsize=None)
+def _permutation_table(size: int) -> np.ndarray:
+    """Every ordering of range(size), one ordering per column"""
+    return np.ascontiguousarray(np.array(list(permutations(range(size))), dtype=np.int16).T)
+
+class BatchSimulator:
+    """Vectorised version of PairingOptimizer.run_single_simulation.
+
+    Scores live in a dense float32 array indexed by player ids. Every random
+    choice in a rollout is uniform, so each rollout is drawn as a random
+    ordering of the players still in play and the pairings are read off fixed
+    positions of that ordering: defender first, then the attacker that gets
+    picked, then the refused attacker. Orderings are stored position-major,
+    shape (players, rollouts), so each position is a contiguous row.
+    
+    When spreads give (min, max) ranges, each pairing's score is drawn from
+    the triangular distribution over its range peaking at the matrix score,
+    by inverting the CDF over a whole row of uniforms at once.
+    """
+
+    def __init__(self,
+                 your_team: List[str],
+                 opponent_team: List[str],
+                 matrices: Dict[str, Dict[str, float]],
+                 chunk_size: int = 262144,
+                 spreads: Optional[Dict[str, Dict[str, Tuple[float, float]]]] = None):
+        self.your_team = your_team
+        self.opponent_team = opponent_team
+        self.scores = np.array(
+            [[matrices.get(y, {}).get(o, 10.0) for o in opponent_team] for y in your_team],
+            dtype=np.float32
+        )
+        self._flat_scores = self.scores.ravel()
+        self._flat_low = self._flat_high = None
+        if spreads:
+            low = self.scores.copy()
+            high = self.scores.copy()
+            for i, y in enumerate(your_team):
+                for j, o in enumerate(opponent_team):
+                    if o in spreads.get(y, {}):
+                        low[i, j], high[i, j] = spreads[y][o]
+            self._flat_low = low.ravel()
+            self._flat_high = high.ravel()
+        self.chunk_size = chunk_size
+        self._orderings: Dict[Tuple[int, ...], np.ndarray] = {}
+
+    def _shuffled(self, ids: np.ndarray, count: int, rng: np.random.Generator) -> np.ndarray:
+        """An independent random ordering of ids for each of count rollouts"""
+        if len(ids) == 0:
+            return np.empty((0, count), dtype=np.int16)
+        if len(ids) <= PERMUTATION_TABLE_MAX:
+            # Drawing a column of the table of all orderings is far cheaper
+            # than argsorting a block of random keys. Tables for 8 players
+            # have 40320 columns, so each pool's table is built once.
+            key = tuple(ids.tolist())
+            table = self._orderings.get(key)
+            if table is None:
+                table = ids.astype(np.int16)[_permutation_table(len(ids))]
+                self._orderings[key] = table
+            picks = rng.integers(0, table.shape[1], count, dtype=np.int32)
+            return table.take(picks, axis=1)
+        return ids.astype(np.int16)[np.argsort(rng.random((len(ids), count)), axis=0)]
+
+    def _pair_scores(self, yours: np.ndarray, opp: np.ndarray, rng: np.random.Generator) -> np.ndarray:
+        cells = yours.astype(np.intp) * self.scores.shape[1] + opp
+        likely = self._flat_scores[cells]
+        if self._flat_low is None:
+            return likely
+        low = self._flat_low[cells]
+        high = self._flat_high[cells]
+        width = high - low
+        u = rng.random(len(cells), dtype=np.float32)
+        below = u * width < likely - low
+        return np.where(
+            below,
+            low + np.sqrt(u * width * (likely - low)),
+            high - np.sqrt((1 - u) * width * (high - likely))
+        )
+
+    def _simulate_chunk(self, defender: int, attackers: Tuple[int, int],
+                        count: int, rng: np.random.Generator) -> np.ndarray:
+        committed = {defender, *attackers}
+        rest = np.array([i for i in range(len(self.your_team)) if i not in committed], dtype=np.int16)
+        yours = self._shuffled(rest, count, rng)
+        opp = self._shuffled(np.arange(len(self.opponent_team), dtype=np.int16), count, rng)
+
+        # Opening exchange: our defender and attackers are fixed by the strategy,
+        # the opponent's defender picks one of our attackers at random.
+        pick = rng.integers(0, 2, count, dtype=np.int8)
+        attacker_ids = np.array(attackers, dtype=np.int16)
+        total = (self._pair_scores(attacker_ids[pick], opp[0], rng)
+                 + self._pair_scores(np.full(count, defender, dtype=np.int16), opp[1], rng)
+                 + self._pair_scores(attacker_ids[1 - pick], opp[2], rng))
+        opp = opp[3:]
+
+        while len(yours) >= 3:
+            total += (self._pair_scores(yours[1], opp[0], rng)
+                      + self._pair_scores(yours[0], opp[1], rng)
+                      + self._pair_scores(yours[2], opp[2], rng))
+            yours = yours[3:]
+            opp = opp[3:]
+
+        if len(yours) == 2:
+            total += self._pair_scores(yours[1], opp[0], rng) + self._pair_scores(yours[0], opp[1], rng)
+        elif len(yours) == 1:
+            total += self._pair_scores(yours[0], opp[0], rng)
+
+        return total
+
+    def simulate(self, defender: str, attackers: List[str], num_rollouts: int,
+                 rng: Optional[np.random.Generator] = None) -> np.ndarray:
+        """Total team scores of num_rollouts random pairings for one strategy"""
+        rng = rng if rng is not None else np.random.default_rng()
+        defender_id = self.your_team.index(defender)
+        attacker_ids = (self.your_team.index(attackers[0]), self.your_team.index(attackers[1]))
+        chunks = []
+        remaining = num_rollouts
+        while remaining > 0:
+            count = min(remaining, self.chunk_size)
+            chunks.append(self._simulate_chunk(defender_id, attacker_ids, count, rng))
+            remaining -= count
+        return np.concatenate(chunks) if chunks else np.empty(0, dtype=np.float32)
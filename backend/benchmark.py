@@ -0,0 +1,175 @@
+"""Offline benchmarks for PairingOptimizer and the /recommend evaluator.
+
+Runs without a server. Results are written as JSON so two runs (e.g. two
+commits) can be compared:
+
+    python benchmark.py --output before.json
+    python benchmark.py --output after.json --compare before.json
+"""
+import argparse
+import json
+import platform
+import random
+import subprocess
+import sys
+import time
+import tracemalloc
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+import numpy as np
+
+from optimizer import PairingOptimizer
+from recommender import SubgameEvaluator
+
+TEAM_SIZES = [3, 5, 8, 10]
+
+# (mode, simulation counts, largest team size the mode is benchmarked at)
+OPTIMIZER_CASES = [
+    ("exact", [0], 10),
+    ("monte_carlo", [1000, 10000], 10),
+    ("batch", [10000, 600000, 6000000], 10),
+    ("adaptive", [60000, 600000], 10),
+]
+RECOMMEND_MAX_TEAM_SIZE = 10
+
+def synthetic_teams(size: int, seed: int = 0):
+    rng = random.Random(seed)
+    your_team = [f"Y{i}" for i in range(size)]
+    opponent_team = [f"O{i}" for i in range(size)]
+    matrices = {y: {o: float(rng.randint(0, 20)) for o in opponent_team} for y in your_team}
+    return your_team, opponent_team, matrices
+
+def measure(fn: Callable[[], object], repeats: int) -> Dict[str, float]:
+    """Latency percentiles over repeats, plus peak traced memory of one extra run"""
+    fn()  # warm-up: imports, permutation tables
+    latencies = []
+    for _ in range(repeats):
+        start = time.perf_counter()
+        fn()
+        latencies.append(time.perf_counter() - start)
+
+    tracemalloc.start()
+    fn()
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    latencies_ms = np.array(latencies) * 1000
+    return {
+        "mean_ms": float(latencies_ms.mean()),
+        "p50_ms": float(np.percentile(latencies_ms, 50)),
+        "p90_ms": float(np.percentile(latencies_ms, 90)),
+        "p99_ms": float(np.percentile(latencies_ms, 99)),
+        "peak_memory_kb": peak / 1024,
+    }
+
+def optimizer_cases(repeats: int, sizes: List[int]) -> List[Dict]:
+    results = []
+    for size in sizes:
+        your_team, opponent_team, matrices = synthetic_teams(size)
+        for mode, simulation_counts, max_size in OPTIMIZER_CASES:
+            if size > max_size:
+                continue
+            for num_simulations in simulation_counts:
+                optimizer = PairingOptimizer(your_team, opponent_team, matrices)
+                stats = measure(lambda: optimizer.optimize(num_simulations=num_simulations, mode=mode), repeats)
+                throughput = num_simulations / (stats["mean_ms"] / 1000) if num_simulations else None
+                results.append({
+                    "name": f"optimize/{mode}/n{size}/sims{num_simulations}",
+                    "team_size": size,
+                    "mode": mode,
+                    "simulations": num_simulations,
+                    "rollouts_per_second": throughput,
+                    **stats,
+                })
+                print(f"  {results[-1]['name']:<40} p50 {stats['p50_ms']:>10.2f} ms")
+    return results
+
+def recommend_cases(repeats: int, sizes: List[int]) -> List[Dict]:
+    results = []
+    for size in sizes:
+        if size > RECOMMEND_MAX_TEAM_SIZE:
+            continue
+        your_team, opponent_team, matrices = synthetic_teams(size)
+        warm = SubgameEvaluator(your_team, opponent_team, matrices)
+        cases = {
+            "pick_defender/cold": lambda: SubgameEvaluator(your_team, opponent_team, matrices)
+                .defender_options(your_team, opponent_team),
+            "pick_defender/warm": lambda: warm.defender_options(your_team, opponent_team),
+            "pick_attackers/warm": lambda: warm.attacker_options(your_team, opponent_team,
+                                                                 your_team[0], opponent_team[0]),
+        }
+        for case, fn in cases.items():
+            stats = measure(fn, repeats)
+            results.append({
+                "name": f"recommend/{case}/n{size}",
+                "team_size": size,
+                "mode": case,
+                "simulations": 0,
+                "rollouts_per_second": None,
+                **stats,
+            })
+            print(f"  {results[-1]['name']:<40} p50 {stats['p50_ms']:>10.2f} ms")
+    return results
+
+def git_commit() -> Optional[str]:
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def compare(current: Dict, baseline: Dict, threshold: float) -> List[str]:
+    """Cases whose p50 latency grew by more than threshold times the baseline"""
+    baseline_cases = {case["name"]: case for case in baseline["cases"]}
+    regressions = []
+    print(f"\n{'case':<40} {'before':>10} {'after':>10} {'ratio':>7}")
+    for case in current["cases"]:
+        before = baseline_cases.get(case["name"])
+        if before is None or before["p50_ms"] == 0:
+            continue
+        ratio = case["p50_ms"] / before["p50_ms"]
+        flag = "  REGRESSION" if ratio > threshold else ""
+        print(f"{case['name']:<40} {before['p50_ms']:>10.2f} {case['p50_ms']:>10.2f} {ratio:>7.2f}{flag}")
+        if flag:
+            regressions.append(case["name"])
+    return regressions
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--output", default="benchmark_results.json")
+    parser.add_argument("--compare", help="earlier results file to check for regressions")
+    parser.add_argument("--threshold", type=float, default=1.2,
+                        help="p50 slowdown ratio reported as a regression")
+    parser.add_argument("--repeats", type=int, default=5)
+    parser.add_argument("--sizes", type=int, nargs="+", default=TEAM_SIZES)
+    args = parser.parse_args()
+
+    print("Benchmarking PairingOptimizer...")
+    cases = optimizer_cases(args.repeats, args.sizes)
+    print("Benchmarking recommendation evaluator...")
+    cases += recommend_cases(args.repeats, args.sizes)
+
+    results = {
+        "commit": git_commit(),
+        "timestamp": datetime.now(timezone.utc).isoformat(),
+        "python": platform.python_version(),
+        "numpy": np.__version__,
+        "machine": platform.machine(),
+        "repeats": args.repeats,
+        "cases": cases,
+    }
+    with open(args.output, "w") as f:
+        json.dump(results, f, indent=2)
+    print(f"\n✓ Results written to {args.output}")
+
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        regressions = compare(results, baseline, args.threshold)
+        if regressions:
+            print(f"\n✗ {len(regressions)} regression(s) over {args.threshold}x")
+            sys.exit(1)
+        print("\n✓ No regressions")
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,208 @@
+from typing import Dict, Iterable, List, Tuple
+from collections import defaultdict
+import math
+
+from sqlalchemy import func, literal, update
+
+from models import GameResult, CalibrationStat, Player, Prediction, dialect_insert, utc_now
+from optimizer import Spreads
+
+# Prediction calibration, kept as running sums in calibration_stats so reads
+# never scan the results history. Recording a result adds its error to the
+# player's, their army's and the opponent's army's sums in the same
+# transaction; re-recording a game first takes the old error back out.
+
+CALIBRATION_SCOPES = ("player", "army", "opponent_army")
+# Games of evidence a player's observed bias is weighed against before it
+# is trusted in full: after BIAS_PRIOR_GAMES games half of it is corrected.
+BIAS_PRIOR_GAMES = 5
+SCORE_RANGE = (0.0, 20.0)
+
+def calibration_keys(player: Player, opponent: Player) -> List[Tuple[str, str]]:
+    keys = [("player", str(player.id))]
+    if player.army:
+        keys.append(("army", player.army))
+    if opponent.army:
+        keys.append(("opponent_army", opponent.army))
+    return keys
+
+def add_error(sums: Dict[Tuple[str, str], List[float]], keys: Iterable[Tuple[str, str]],
+              predicted: float, actual: float, sign: int = 1):
+    error = predicted - actual
+    for key in keys:
+        totals = sums[key]
+        totals[0] += sign
+        totals[1] += sign * error
+        totals[2] += sign * abs(error)
+        totals[3] += sign * error * error
+
+def lock_session_results(db, session_id: int):
+    """Hold off other writers to a session's results until this transaction ends.
+
+    Row locks can't cover a game that hasn't been recorded yet, so Postgres
+    takes a transaction advisory lock per session. SQLite has one writer at
+    a time and takes the lock at a transaction's first write, so an update
+    that matches nothing takes it before anything is read.
+    """
+    if db.bind.dialect.name == "postgresql":
+        db.execute(func.pg_advisory_xact_lock(func.hashtext(GameResult.__tablename__), session_id).select())
+    else:
+        db.execute(update(GameResult).where(literal(False)).values(score=GameResult.score))
+
+def record_results(db, session_id: int, results: List[Tuple[int, int, float]]) -> List[GameResult]:
+    """Insert or replace (player_id, opponent_player_id, score) results and update the aggregates.
+
+    Each result keeps the player's prediction for that pairing, so its error
+    can be taken back out exactly if the game is re-recorded later. The
+    previous results are read under lock_session_results, so two requests
+    re-recording the same game can't both take out the same old error.
+    The caller commits.
+    """
+    lock_session_results(db, session_id)
+    player_ids = [player_id for player_id, _, _ in results]
+    previous = {
+        result.player_id: result
+        for result in db.query(GameResult).filter(
+            GameResult.session_id == session_id,
+            GameResult.player_id.in_(player_ids)
+        ).all()
+    }
+    involved = set(player_ids) | {opponent_id for _, opponent_id, _ in results}
+    involved |= {result.opponent_player_id for result in previous.values()}
+    players = {player.id: player for player in db.query(Player).filter(Player.id.in_(involved)).all()}
+    predictions = {
+        (your_player, opponent_player): score
+        for your_player, opponent_player, score in db.query(
+            Prediction.your_player, Prediction.opponent_player, Prediction.score
+        ).filter(
+            Prediction.session_id == session_id,
+            Prediction.your_player.in_([players[player_id].name for player_id in player_ids])
+        ).all()
+    }
+
+    deltas: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    for old in previous.values():
+        if old.predicted is not None:
+            add_error(deltas, calibration_keys(players[old.player_id], players[old.opponent_player_id]),
+                      old.predicted, old.score, sign=-1)
+
+    rows = []
+    for player_id, opponent_id, score in results:
+        player, opponent = players[player_id], players[opponent_id]
+        predicted = predictions.get((player.name, opponent.name))
+        rows.append({
+            "session_id": session_id,
+            "player_id": player_id,
+            "opponent_player_id": opponent_id,
+            "score": score,
+            "predicted": predicted,
+            "recorded_at": utc_now()
+        })
+        if predicted is not None:
+            add_error(deltas, calibration_keys(player, opponent), predicted, score)
+    if not rows:
+        return []
+
+    statement = dialect_insert(db, GameResult).values(rows)
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["session_id", "player_id"],
+        set_={
+            "opponent_player_id": statement.excluded.opponent_player_id,
+            "score": statement.excluded.score,
+            "predicted": statement.excluded.predicted,
+            "recorded_at": statement.excluded.recorded_at
+        }
+    ))
+    apply_deltas(db, deltas)
+    return db.query(GameResult).filter(
+        GameResult.session_id == session_id,
+        GameResult.player_id.in_(player_ids)
+    ).all()
+
+def apply_deltas(db, deltas: Dict[Tuple[str, str], List[float]]):
+    """Add to the running sums with one upsert; increments are applied in SQL so concurrent writers don't clash"""
+    if not deltas:
+        return
+    statement = dialect_insert(db, CalibrationStat).values([
+        {"scope": scope, "key": key, "games": int(games), "error_sum": error,
+         "abs_error_sum": abs_error, "sq_error_sum": sq_error}
+        for (scope, key), (games, error, abs_error, sq_error) in deltas.items()
+    ])
+    db.execute(statement.on_conflict_do_update(
+        index_elements=["scope", "key"],
+        set_={
+            "games": CalibrationStat.games + statement.excluded.games,
+            "error_sum": CalibrationStat.error_sum + statement.excluded.error_sum,
+            "abs_error_sum": CalibrationStat.abs_error_sum + statement.excluded.abs_error_sum,
+            "sq_error_sum": CalibrationStat.sq_error_sum + statement.excluded.sq_error_sum
+        }
+    ))
+
+def rebuild_calibration(db) -> int:
+    """Recompute every aggregate from the full results history; for repairs, not requests"""
+    results = db.query(GameResult).filter(GameResult.predicted.isnot(None)).all()
+    involved = {result.player_id for result in results} | {result.opponent_player_id for result in results}
+    players = {player.id: player for player in db.query(Player).filter(Player.id.in_(involved)).all()}
+    sums: Dict[Tuple[str, str], List[float]] = defaultdict(lambda: [0, 0.0, 0.0, 0.0])
+    for result in results:
+        add_error(sums, calibration_keys(players[result.player_id], players[result.opponent_player_id]),
+                  result.predicted, result.score)
+    db.query(CalibrationStat).delete()
+    apply_deltas(db, sums)
+    return len(results)
+
+def stat_summary(stat: CalibrationStat) -> Dict:
+    games = stat.games
+    return {
+        "scope": stat.scope,
+        "key": stat.key,
+        "games": games,
+        "bias": stat.error_sum / games if games else 0.0,
+        "mean_absolute_error": stat.abs_error_sum / games if games else 0.0,
+        "rmse": math.sqrt(max(0.0, stat.sq_error_sum / games)) if games else 0.0
+    }
+
+def load_calibration(db, scope: str, min_games: int = 1) -> List[Dict]:
+    """Summaries for one scope, most games first; player rows are labelled with the player's name"""
+    stats = db.query(CalibrationStat).filter(
+        CalibrationStat.scope == scope,
+        CalibrationStat.games >= min_games
+    ).order_by(CalibrationStat.games.desc(), CalibrationStat.key).all()
+    summaries = [stat_summary(stat) for stat in stats]
+    if scope == "player" and summaries:
+        names = dict(db.query(Player.id, Player.name).filter(
+            Player.id.in_([int(summary["key"]) for summary in summaries])
+        ).all())
+        for summary in summaries:
+            summary["player_name"] = names.get(int(summary["key"]))
+    return summaries
+
+def player_biases(db, player_ids: Dict[str, int]) -> Dict[str, Tuple[float, int]]:
+    """(bias, games) per player name, from the aggregates alone"""
+    ids = {str(player_id): name for name, player_id in player_ids.items()}
+    stats = db.query(CalibrationStat).filter(
+        CalibrationStat.scope == "player",
+        CalibrationStat.key.in_(list(ids))
+    ).all()
+    return {ids[stat.key]: (stat.error_sum / stat.games, stat.games) for stat in stats if stat.games}
+
+def bias_corrected_matrices(matrices: Dict[str, Dict[str, float]],
+                            spreads: Spreads,
+                            biases: Dict[str, Tuple[float, int]]) -> Tuple[Dict[str, Dict[str, float]], Spreads]:
+    """Take each player's shrunk bias off their predictions and any ranges around them, within the score range"""
+    def shifted(score: float, shift: float) -> float:
+        return min(SCORE_RANGE[1], max(SCORE_RANGE[0], score - shift))
+
+    shifts = {player: bias * games / (games + BIAS_PRIOR_GAMES) for player, (bias, games) in biases.items()}
+    corrected = {
+        your_player: {opponent: shifted(score, shifts.get(your_player, 0.0)) for opponent, score in row.items()}
+        for your_player, row in matrices.items()
+    }
+    corrected_spreads = {
+        your_player: {
+            opponent: (shifted(low, shifts.get(your_player, 0.0)), shifted(high, shifts.get(your_player, 0.0)))
+            for opponent, (low, high) in row.items()
+        }
+        for your_player, row in (spreads or {}).items()
+    }
+    return corrected, corrected_spreads
@@ -0,0 +1,59 @@
+import os
+import random
+import tempfile
+
+# The app's engine is created when models is first imported, so point it at
+# a throwaway file before anything does; tests never touch strategium.db.
+os.environ.setdefault("DATABASE_URL", f"sqlite:///{tempfile.mkdtemp()}/test.db")
+
+from sqlalchemy.orm import sessionmaker
+
+from models import Base, create_database_engine
+
+# Data and databases shared by the offline test modules. They import from
+# here directly rather than through fixtures, so each one still runs as a
+# plain script; modules that use the app import conftest before main. The
+# walkthrough scripts talk to a live server on localhost:8000 and are kept
+# out of pytest's collection.
+
+collect_ignore = ["test_optimizer.py", "test_recommendations.py"]
+
+sample_matrices = {
+    "Laurence": {"Jack": 15, "John": 8, "James": 12, "Jim": 6, "Joe": 11},
+    "Byron": {"Jack": 9, "John": 14, "James": 10, "Jim": 16, "Joe": 7},
+    "Denis": {"Jack": 11, "John": 7, "James": 18, "Jim": 10, "Joe": 13},
+    "Sam": {"Jack": 8, "John": 12, "James": 9, "Jim": 13, "Joe": 15},
+    "Euan": {"Jack": 13, "John": 16, "James": 6, "Jim": 11, "Joe": 9}
+}
+your_team = list(sample_matrices.keys())
+opponent_team = ["Jack", "John", "James", "Jim", "Joe"]
+
+def random_matrices(size: int, seed: int):
+    """Teams Y0.. and O0.. with whole-number predictions drawn from seed"""
+    rng = random.Random(seed)
+    names = [f"Y{i}" for i in range(size)]
+    opponents = [f"O{i}" for i in range(size)]
+    matrices = {y: {o: float(rng.randint(0, 20)) for o in opponents} for y in names}
+    return names, opponents, matrices
+
+def session_factory(url: str = "sqlite://"):
+    """Sessions over a freshly created schema, in memory unless given a file URL"""
+    engine = create_database_engine(url)
+    Base.metadata.create_all(bind=engine)
+    return sessionmaker(bind=engine)
+
+def fresh_db():
+    return session_factory()()
+
+def create_pairing(client, matrices=None) -> str:
+    """A tournament of the sample teams and a session between them, matrices submitted; returns its code"""
+    tournament = client.post("/tournaments", json={"name": "Test", "teams": [
+        {"name": "Home", "players": [{"name": name} for name in your_team]},
+        {"name": "Away", "players": [{"name": name} for name in opponent_team]},
+    ]}).json()
+    home, away = tournament["teams"]
+    code = client.post("/sessions", json={
+        "tournament_id": tournament["id"], "your_team_id": home["id"], "opponent_team_id": away["id"]
+    }).json()["code"]
+    client.post(f"/sessions/{code}/matrices", json={"matrices": matrices or sample_matrices})
+    return code
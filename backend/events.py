@@ -0,0 +1,42 @@
+from typing import Dict, Set
+from collections import defaultdict
+import asyncio
+import json
+
+KEEPALIVE_SECONDS = 15
+
+class SessionEventBroker:
+    """In-process fan-out of session events to Server-Sent Events subscribers.
+
+    Subscribers only see events published by the same server process; clients
+    fall back to polling /sessions/{code}/matrices when the stream drops.
+    """
+
+    def __init__(self):
+        self._subscribers: Dict[str, Set[asyncio.Queue]] = defaultdict(set)
+
+    def subscribe(self, session_code: str) -> asyncio.Queue:
+        queue = asyncio.Queue(maxsize=100)
+        self._subscribers[session_code].add(queue)
+        return queue
+
+    def unsubscribe(self, session_code: str, queue: asyncio.Queue):
+        subscribers = self._subscribers.get(session_code)
+        if subscribers is None:
+            return
+        subscribers.discard(queue)
+        if not subscribers:
+            del self._subscribers[session_code]
+
+    def publish(self, session_code: str, event: str, data: dict):
+        for queue in list(self._subscribers.get(session_code, ())):
+            try:
+                queue.put_nowait((event, data))
+            except asyncio.QueueFull:
+                # A stalled client misses events; it resyncs from the snapshot on reconnect.
+                pass
+
+def format_sse(event: str, data: dict) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+broker = SessionEventBroker()
@@ -0,0 +1,98 @@
+from typing import Callable, Dict, Optional, Union
+from datetime import datetime, timezone
+from email.utils import format_datetime, parsedate_to_datetime
+
+from fastapi import Request, Response
+from starlette.datastructures import Headers
+from starlette.middleware.gzip import GZipMiddleware, GZipResponder
+from starlette.types import Message, Receive, Scope, Send
+
+# Conditional GETs: rows that back a read endpoint carry a version counter,
+# bumped by every write (see models.touch), and an updated_at time. A read
+# looks those up first and answers 304 when the client already holds that
+# version, skipping the main query and serialisation altogether.
+#
+# Last-Modified only has whole seconds while a row can change several times
+# within one, so a date is only sent, or trusted from If-Modified-Since,
+# once its second is over; until then the ETag alone validates.
+
+# Responses are small enough under this not to be worth compressing
+COMPRESS_MIN_BYTES = 1000
+# Streams are flushed event by event, which compressing would hold back
+UNCOMPRESSED_MEDIA_TYPES = ("text/event-stream", "application/x-ndjson")
+
+def entity_tag(kind: str, row_id: int, version: int) -> str:
+    # Weak: the gzipped and plain bodies of a version are equivalent, not byte-identical
+    return f'W/"{kind}-{row_id}-v{version}"'
+
+def http_date(moment: datetime) -> str:
+    """Timestamps are stored as naive UTC"""
+    return format_datetime(moment.replace(tzinfo=timezone.utc, microsecond=0), usegmt=True)
+
+def in_current_second(moment: datetime) -> bool:
+    """Whether a naive UTC timestamp's second may still see further writes"""
+    return moment.replace(microsecond=0) >= datetime.now(timezone.utc).replace(tzinfo=None, microsecond=0)
+
+def cache_headers(etag: str, last_modified: Optional[datetime]) -> Dict[str, str]:
+    # no-cache lets browsers keep the body but makes them revalidate on every use
+    headers = {"ETag": etag, "Cache-Control": "no-cache"}
+    if last_modified is not None and not in_current_second(last_modified):
+        headers["Last-Modified"] = http_date(last_modified)
+    return headers
+
+def is_not_modified(request: Request, etag: str, last_modified: Optional[datetime]) -> bool:
+    """RFC 9110 evaluation: If-None-Match (weak comparison) wins over If-Modified-Since"""
+    if_none_match = request.headers.get("if-none-match")
+    if if_none_match is not None:
+        if if_none_match.strip() == "*":
+            return True
+        opaque = etag.removeprefix("W/")
+        return any(tag.strip().removeprefix("W/") == opaque for tag in if_none_match.split(","))
+
+    if_modified_since = request.headers.get("if-modified-since")
+    if if_modified_since is None or last_modified is None or in_current_second(last_modified):
+        return False
+    try:
+        since = parsedate_to_datetime(if_modified_since)
+    except (TypeError, ValueError):
+        return False
+    if since.tzinfo is None:
+        since = since.replace(tzinfo=timezone.utc)
+    return last_modified.replace(tzinfo=timezone.utc, microsecond=0) <= since
+
+def conditional_response(request: Request, etag: str, last_modified: Optional[datetime],
+                         render: Callable[[], Union[str, bytes]]) -> Response:
+    """304 if the client's copy is current, otherwise the JSON body from render()"""
+    headers = cache_headers(etag, last_modified)
+    if is_not_modified(request, etag, last_modified):
+        return Response(status_code=304, headers=headers)
+    return Response(content=render(), media_type="application/json", headers=headers)
+
+class _StreamAwareGZipResponder(GZipResponder):
+    """GZipResponder that passes event streams through untouched"""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.passthrough = False
+
+    async def send_with_gzip(self, message: Message) -> None:
+        if message["type"] == "http.response.start":
+            media_type = Headers(raw=message["headers"]).get("content-type", "").split(";")[0].strip()
+            self.passthrough = media_type in UNCOMPRESSED_MEDIA_TYPES
+        if self.passthrough:
+            await self.send(message)
+            return
+        await super().send_with_gzip(message)
+
+class CompressionMiddleware(GZipMiddleware):
+    """gzip for responses over minimum_size, except Server-Sent Events and NDJSON progress streams"""
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_BYTES, compresslevel: int = 6):
+        super().__init__(app, minimum_size=minimum_size, compresslevel=compresslevel)
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        if scope["type"] == "http" and "gzip" in Headers(scope=scope).get("Accept-Encoding", ""):
+            responder = _StreamAwareGZipResponder(self.app, self.minimum_size, compresslevel=self.compresslevel)
+            await responder(scope, receive, send)
+            return
+        await self.app(scope, receive, send)
@@ -0,0 +1,152 @@
+from typing import AsyncIterator, Dict, Iterable, List, Optional, Set
+import codecs
+import csv
+import json
+
+from sqlalchemy import insert
+
+from models import Tournament, Team, Player
+
+# Rows buffered before they are written; each flush is one INSERT for the new
+# teams and one for their players, whatever the size of the event.
+IMPORT_BATCH_SIZE = 1000
+
+class TournamentImportError(ValueError):
+    """The upload is malformed; nothing from it is committed"""
+
+class TournamentImporter:
+    """Batched inserts for a tournament whose teams and players arrive incrementally.
+
+    Players are grouped by team name, so a team's rows need not be contiguous;
+    a team given whole through add_team must not be given again.
+    The caller owns the transaction and commits once finish() returns.
+    """
+
+    def __init__(self, db, name: str, batch_size: int = IMPORT_BATCH_SIZE):
+        if not name or not name.strip():
+            raise TournamentImportError("Tournament name is required")
+        self.db = db
+        self.batch_size = batch_size
+        self.tournament_id = db.execute(
+            insert(Tournament).values(name=name.strip()).returning(Tournament.id)
+        ).scalar_one()
+        self.name = name.strip()
+        self.team_ids: Dict[str, int] = {}
+        self._listed_teams: Set[str] = set()
+        self.player_count = 0
+        self._new_teams: List[str] = []
+        self._pending_players: List[dict] = []
+
+    def add_player(self, team_name: str, player_name: str, army: Optional[str] = None,
+                   archetype: Optional[str] = None):
+        team_name = (team_name or "").strip()
+        player_name = (player_name or "").strip()
+        if not team_name or not player_name:
+            raise TournamentImportError("Every player needs a team name and a player name")
+        self._register_team(team_name)
+        self._pending_players.append({
+            "team_name": team_name,
+            "name": player_name,
+            "army": army or None,
+            "archetype": archetype or None
+        })
+        if len(self._pending_players) >= self.batch_size:
+            self.flush()
+
+    def add_team(self, team_name: str, players: Iterable[dict]):
+        team_name = (team_name or "").strip()
+        if not team_name:
+            raise TournamentImportError("Every team needs a name")
+        if team_name in self._listed_teams:
+            raise TournamentImportError(f"Team {team_name} is listed more than once")
+        self._listed_teams.add(team_name)
+        self._register_team(team_name)
+        for player in players:
+            if not isinstance(player, dict):
+                raise TournamentImportError(f"Players of {team_name} must be objects with a name")
+            self.add_player(team_name, player.get("name"), player.get("army"), player.get("archetype"))
+
+    def _register_team(self, team_name: str):
+        if team_name not in self.team_ids and team_name not in self._new_teams:
+            self._new_teams.append(team_name)
+
+    def flush(self):
+        if self._new_teams:
+            ids = self.db.execute(
+                insert(Team).returning(Team.id, sort_by_parameter_order=True),
+                [{"tournament_id": self.tournament_id, "name": name} for name in self._new_teams]
+            ).scalars().all()
+            self.team_ids.update(zip(self._new_teams, ids))
+            self._new_teams = []
+        if self._pending_players:
+            self.db.execute(insert(Player), [
+                {
+                    "team_id": self.team_ids[player["team_name"]],
+                    "name": player["name"],
+                    "army": player["army"],
+                    "archetype": player["archetype"]
+                }
+                for player in self._pending_players
+            ])
+            self.player_count += len(self._pending_players)
+            self._pending_players = []
+
+    def finish(self) -> dict:
+        self.flush()
+        return {
+            "id": self.tournament_id,
+            "name": self.name,
+            "team_count": len(self.team_ids),
+            "player_count": self.player_count
+        }
+
+async def iter_lines(chunks: AsyncIterator[bytes]) -> AsyncIterator[str]:
+    """Decode a byte stream into lines without holding the whole upload in memory"""
+    decoder = codecs.getincrementaldecoder("utf-8-sig")()
+    buffer = ""
+    async for chunk in chunks:
+        try:
+            buffer += decoder.decode(chunk)
+        except UnicodeDecodeError:
+            raise TournamentImportError("Upload must be UTF-8 encoded")
+        *lines, buffer = buffer.split("\n")
+        for line in lines:
+            yield line.rstrip("\r")
+    try:
+        buffer += decoder.decode(b"", final=True)
+    except UnicodeDecodeError:
+        raise TournamentImportError("Upload must be UTF-8 encoded")
+    if buffer:
+        yield buffer.rstrip("\r")
+
+async def import_csv(lines: AsyncIterator[str], importer: TournamentImporter):
+    """Rows of team,player[,army][,archetype] under a header line naming those columns"""
+    header = None
+    async for line in lines:
+        if not line.strip():
+            continue
+        row = next(csv.reader([line]))
+        if header is None:
+            header = [column.strip().lower() for column in row]
+            missing = [column for column in ("team", "player") if column not in header]
+            if missing:
+                raise TournamentImportError(f"CSV header is missing column(s): {', '.join(missing)}")
+            continue
+        values = dict(zip(header, row))
+        importer.add_player(values.get("team"), values.get("player"),
+                            values.get("army"), values.get("archetype"))
+
+async def import_ndjson(lines: AsyncIterator[str], importer: TournamentImporter):
+    """One team per line: {"name": ..., "players": [{"name": ..., "army": ..., "archetype": ...}]}"""
+    line_number = 0
+    async for line in lines:
+        line_number += 1
+        if not line.strip():
+            continue
+        try:
+            team = json.loads(line)
+        except json.JSONDecodeError as e:
+            raise TournamentImportError(f"Line {line_number} is not valid JSON: {e.msg}")
+        if not isinstance(team, dict) or not isinstance(team.get("players", []), list):
+            raise TournamentImportError(f"Line {line_number} must be a team object with a players list")
+        importer.add_team(team.get("name"), team.get("players", []))
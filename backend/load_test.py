@@ -0,0 +1,98 @@
+"""Concurrent submit_matrix load test against a running server.
+
+Creates a tournament and several sessions, then has every player of every
+session submit (and resubmit) their matrix at the same time. Fails if any
+request errors or a session ends up missing a player's matrix. Run it
+against several workers sharing one database to exercise write contention:
+
+    pip install -r requirements-dev.txt
+    uvicorn main:app --port 8000 --workers 4
+    python load_test.py --url http://localhost:8000 --sessions 10 --concurrency 50
+"""
+import argparse
+import random
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import numpy as np
+import requests
+
+def create_sessions(url: str, session_count: int, team_size: int):
+    your_team = [f"Player{i}" for i in range(team_size)]
+    opponent_team = [f"Opponent{i}" for i in range(team_size)]
+    tournament = requests.post(f"{url}/tournaments", json={
+        "name": f"Load test {int(time.time())}",
+        "teams": [
+            {"name": "Home", "players": [{"name": name} for name in your_team]},
+            {"name": "Away", "players": [{"name": name} for name in opponent_team]},
+        ]
+    }).json()
+    home, away = (team["id"] for team in tournament["teams"])
+    codes = [
+        requests.post(f"{url}/sessions", json={
+            "tournament_id": tournament["id"],
+            "your_team_id": home,
+            "opponent_team_id": away,
+        }).json()["code"]
+        for _ in range(session_count)
+    ]
+    return codes, your_team, opponent_team
+
+def submit(http: requests.Session, url: str, code: str, player: str, opponent_team, rng: random.Random):
+    matrix = {name: rng.randint(0, 20) for name in opponent_team}
+    start = time.perf_counter()
+    try:
+        response = http.post(f"{url}/sessions/{code}/matrix",
+                             json={"player_name": player, "matrix": matrix}, timeout=60)
+        ok = response.status_code == 200
+        detail = None if ok else f"{response.status_code} {response.text[:200]}"
+    except requests.RequestException as e:
+        ok, detail = False, str(e)
+    return ok, time.perf_counter() - start, detail
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--url", default="http://localhost:8000")
+    parser.add_argument("--sessions", type=int, default=10)
+    parser.add_argument("--team-size", type=int, default=5)
+    parser.add_argument("--rounds", type=int, default=3, help="submissions per player")
+    parser.add_argument("--concurrency", type=int, default=50)
+    args = parser.parse_args()
+
+    codes, your_team, opponent_team = create_sessions(args.url, args.sessions, args.team_size)
+    jobs = [(code, player) for _ in range(args.rounds) for code in codes for player in your_team]
+    random.shuffle(jobs)
+    print(f"Submitting {len(jobs)} matrices across {len(codes)} sessions with {args.concurrency} threads...")
+
+    http = requests.Session()
+    http.mount("http://", requests.adapters.HTTPAdapter(pool_maxsize=args.concurrency))
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=args.concurrency) as pool:
+        results = list(pool.map(
+            lambda job: submit(http, args.url, job[0], job[1], opponent_team, random.Random(hash(job))),
+            jobs
+        ))
+    elapsed = time.perf_counter() - start
+
+    failures = [detail for ok, _, detail in results if not ok]
+    latencies_ms = np.array([seconds for _, seconds, _ in results]) * 1000
+    print(f"  {len(results) - len(failures)}/{len(results)} succeeded in {elapsed:.2f}s "
+          f"({len(results) / elapsed:.0f} req/s)")
+    print(f"  latency p50 {np.percentile(latencies_ms, 50):.1f} ms, "
+          f"p90 {np.percentile(latencies_ms, 90):.1f} ms, p99 {np.percentile(latencies_ms, 99):.1f} ms")
+
+    incomplete = [
+        code for code in codes
+        if requests.get(f"{args.url}/sessions/{code}/matrices").json()["submitted_count"] != len(your_team)
+    ]
+    for detail in failures[:5]:
+        print(f"  ✗ {detail}")
+    if incomplete:
+        print(f"  ✗ {len(incomplete)} session(s) missing matrices")
+    if failures or incomplete:
+        sys.exit(1)
+    print("✓ Every submission succeeded and every session has all matrices")
+
+if __name__ == "__main__":
+    main()
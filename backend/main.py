@@ -1,21 +1,51 @@
-from fastapi import FastAPI, Depends, HTTPException
+from fastapi import FastAPI, Depends, HTTPException, Request, Query, Response
 from fastapi.middleware.cors import CORSMiddleware
-from sqlalchemy.orm import Session
+from fastapi.responses import ORJSONResponse, StreamingResponse
+from sqlalchemy import func
+from sqlalchemy.orm import Session, selectinload
+import asyncio
+import cProfile
+import json
+import orjson
+import time
 import random
 import string
-from typing import List
+from typing import Dict, List, Literal, Optional, Tuple, Union
 
-from models import get_db, init_db, Tournament, Team, Player, Session as DBSession
+from models import (
+    get_db, init_db, SessionLocal, Tournament, Team, Player, Session as DBSession,
+    OptimizationResult as DBOptimizationResult, Prediction, GameResult,
+    upsert_predictions, upsert_team_predictions, load_matrices, load_matrices_by_session,
+    load_spreads, load_spreads_by_session, migrate_json_matrices, touch, engine
+)
 from schemas import (
-    TournamentCreate, TournamentResponse,
+    TournamentCreate, TournamentResponse, TournamentSummary,
     TeamCreate, TeamResponse,
     SessionCreate, SessionResponse,
-    MatrixInput,
+    MatrixInput, BulkMatrixInput, ScoreRange, ResultsInput,
     RecommendationRequest
 )
-from optimizer import PairingOptimizer, OptimizationResult as OptimizerResult
+from optimizer import (
+    PairingOptimizer, OptimizationResult as OptimizerResult, Objective, Spreads, content_fingerprint, expected_matrices
+)
+from recommender import recommend_options
+from playbook import session_playbook, PLAYBOOK_MAX_STATES
+from sensitivity import SENSITIVITY_STEP, TIPPING_PRECISION
+from calibration import (
+    CALIBRATION_SCOPES, record_results, load_calibration, player_biases, bias_corrected_matrices
+)
+from parallel import (
+    optimize_in_pool, optimize_anytime_in_pool, sensitivity_in_pool, run_for_session, start_pool, shutdown_pool
+)
+from importer import TournamentImporter, TournamentImportError, iter_lines, import_csv, import_ndjson
+from events import broker, format_sse, KEEPALIVE_SECONDS
+from http_cache import CompressionMiddleware, conditional_response, entity_tag
+from metrics import (
+    REQUEST_LATENCY, REQUEST_QUERIES, PROFILE_DIR, RequestStats, current_request,
+    instrument_engine, observe_phases, dump_profile, render_metrics
+)
 
-app = FastAPI(title="Strategium API")
+app = FastAPI(title="Strategium API", default_response_class=ORJSONResponse)
 
 app.add_middleware(
     CORSMiddleware,
@@ -24,10 +54,53 @@ app.add_middleware(
     allow_methods=["*"],
     allow_headers=["*"],
 )
+app.add_middleware(CompressionMiddleware)
+
+instrument_engine(engine)
+
+@app.middleware("http")
+async def record_request_metrics(request: Request, call_next):
+    """Per-route latency and query counts; opt-in profiling with "X-Profile: 1" when PROFILE_DIR is set"""
+    stats = RequestStats()
+    token = current_request.set(stats)
+    profiler = cProfile.Profile() if PROFILE_DIR and request.headers.get("x-profile") == "1" else None
+    start = time.perf_counter()
+    try:
+        if profiler is not None:
+            profiler.enable()
+        response = await call_next(request)
+    finally:
+        if profiler is not None:
+            profiler.disable()
+        current_request.reset(token)
+    elapsed = time.perf_counter() - start
+    
+    # Label by route template, not the raw path, to keep the series bounded
+    route = request.scope.get("route")
+    route_path = route.path if route is not None else "unmatched"
+    REQUEST_LATENCY.observe(elapsed, request.method, route_path, str(response.status_code))
+    REQUEST_QUERIES.observe(stats.query_count, request.method, route_path)
+    response.headers["Server-Timing"] = (
+        f'db;dur={stats.query_time * 1000:.2f};desc="{stats.query_count} queries", '
+        f"app;dur={elapsed * 1000:.2f}"
+    )
+    if profiler is not None:
+        response.headers["X-Profile-Dump"] = dump_profile(profiler, request.method, route_path, elapsed, stats)
+    return response
 
 @app.on_event("startup")
 async def startup_event():
     init_db()
+    db = SessionLocal()
+    try:
+        migrate_json_matrices(db)
+    finally:
+        db.close()
+    start_pool()
+
+@app.on_event("shutdown")
+async def shutdown_event():
+    shutdown_pool()
 
 def generate_session_code() -> str:
     return ''.join(random.choices(string.ascii_uppercase + string.digits, k=6))
@@ -36,47 +109,119 @@ def generate_session_code() -> str:
 async def root():
     return {"message": "Strategium API is running"}
 
+@app.get("/metrics")
+async def metrics():
+    return Response(render_metrics(), media_type="text/plain; version=0.0.4")
+
 @app.get("/health")
 async def health():
     return {"status": "healthy"}
 
 @app.post("/tournaments", response_model=TournamentResponse)
 async def create_tournament(tournament: TournamentCreate, db: Session = Depends(get_db)):
-    db_tournament = Tournament(name=tournament.name)
-    db.add(db_tournament)
-    db.flush()
-    
-    for team_data in tournament.teams:
-        db_team = Team(
-            tournament_id=db_tournament.id,
-            name=team_data.name
-        )
-        db.add(db_team)
-        db.flush()
-        
-        for player_data in team_data.players:
-            db_player = Player(
-                team_id=db_team.id,
-                name=player_data.name,
-                army=player_data.army,
-                archetype=player_data.archetype
+    try:
+        importer = TournamentImporter(db, tournament.name)
+        for team_data in tournament.teams:
+            importer.add_team(team_data.name, [player.model_dump() for player in team_data.players])
+        tournament_id = importer.finish()["id"]
+    except TournamentImportError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    db.commit()
+    return db.query(Tournament).options(tournament_tree()).filter(Tournament.id == tournament_id).one()
+
+@app.post("/tournaments/import", response_model=TournamentSummary)
+async def import_tournament(request: Request, name: Optional[str] = None, db: Session = Depends(get_db)):
+    """Create a tournament from a streamed upload, written in batches as it arrives.
+
+    text/csv: a team,player[,army][,archetype] header then one row per player.
+    application/x-ndjson: one {"name", "players"} team object per line.
+    application/json: a TournamentCreate body.
+    The tournament name comes from the name query parameter for CSV and NDJSON.
+    """
+    content_type = request.headers.get("content-type", "").split(";")[0].strip().lower()
+    try:
+        if content_type == "application/json":
+            try:
+                tournament = TournamentCreate.model_validate_json(await request.body())
+            except ValueError as e:
+                raise TournamentImportError(str(e))
+            importer = TournamentImporter(db, tournament.name)
+            for team_data in tournament.teams:
+                importer.add_team(team_data.name, [player.model_dump() for player in team_data.players])
+        elif content_type in ("text/csv", "application/x-ndjson"):
+            importer = TournamentImporter(db, name)
+            parse = import_csv if content_type == "text/csv" else import_ndjson
+            await parse(iter_lines(request.stream()), importer)
+        else:
+            raise HTTPException(
+                status_code=415,
+                detail="Send text/csv, application/x-ndjson or application/json"
             )
-            db.add(db_player)
-    
+        summary = importer.finish()
+    except TournamentImportError as e:
+        db.rollback()
+        raise HTTPException(status_code=400, detail=str(e))
+    if not summary["team_count"]:
+        db.rollback()
+        raise HTTPException(status_code=400, detail="Upload contains no teams")
     db.commit()
-    db.refresh(db_tournament)
-    return db_tournament
+    return summary
+
+def tournament_tree():
+    """Tournaments with teams and players loaded in one query per level"""
+    return selectinload(Tournament.teams).selectinload(Team.players)
 
-@app.get("/tournaments", response_model=List[TournamentResponse])
-async def list_tournaments(db: Session = Depends(get_db)):
-    return db.query(Tournament).all()
+@app.get("/tournaments", response_model=List[Union[TournamentResponse, TournamentSummary]])
+async def list_tournaments(
+    skip: int = Query(0, ge=0),
+    limit: int = Query(50, ge=1, le=500),
+    summary: bool = False,
+    db: Session = Depends(get_db)
+):
+    if summary:
+        rows = (
+            db.query(
+                Tournament.id,
+                Tournament.name,
+                func.count(func.distinct(Team.id)),
+                func.count(Player.id)
+            )
+            .outerjoin(Team, Team.tournament_id == Tournament.id)
+            .outerjoin(Player, Player.team_id == Team.id)
+            .group_by(Tournament.id, Tournament.name)
+            .order_by(Tournament.id)
+            .offset(skip)
+            .limit(limit)
+            .all()
+        )
+        return [
+            TournamentSummary(id=id, name=name, team_count=team_count, player_count=player_count)
+            for id, name, team_count, player_count in rows
+        ]
+    
+    tournaments = (
+        db.query(Tournament)
+        .options(tournament_tree())
+        .order_by(Tournament.id)
+        .offset(skip)
+        .limit(limit)
+        .all()
+    )
+    return [TournamentResponse.model_validate(t) for t in tournaments]
 
 @app.get("/tournaments/{tournament_id}", response_model=TournamentResponse)
-async def get_tournament(tournament_id: int, db: Session = Depends(get_db)):
-    tournament = db.query(Tournament).filter(Tournament.id == tournament_id).first()
-    if not tournament:
+async def get_tournament(tournament_id: int, request: Request, db: Session = Depends(get_db)):
+    """Supports If-None-Match/If-Modified-Since; the tree is only loaded when it has changed"""
+    row = db.query(Tournament.version, Tournament.updated_at).filter(Tournament.id == tournament_id).first()
+    if not row:
         raise HTTPException(status_code=404, detail="Tournament not found")
-    return tournament
+    
+    def render() -> str:
+        tournament = db.query(Tournament).options(tournament_tree()).filter(Tournament.id == tournament_id).one()
+        return TournamentResponse.model_validate(tournament).model_dump_json()
+    
+    return conditional_response(request, entity_tag("tournament", tournament_id, row.version), row.updated_at, render)
 
 @app.get("/tournaments/{tournament_id}/sessions")
 async def list_tournament_sessions(tournament_id: int, db: Session = Depends(get_db)):
@@ -105,11 +250,17 @@ async def create_session(session_data: SessionCreate, db: Session = Depends(get_
     return db_session
 
 @app.get("/sessions/{code}", response_model=SessionResponse)
-async def get_session(code: str, db: Session = Depends(get_db)):
+async def get_session(code: str, request: Request, db: Session = Depends(get_db)):
     session = db.query(DBSession).filter(DBSession.code == code).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
-    return session
+    return conditional_response(
+        request, entity_tag("session", session.id, session.version), session.updated_at,
+        lambda: SessionResponse.model_validate(session).model_dump_json()
+    )
+
+def score_ranges(spread: Optional[Dict[str, ScoreRange]]) -> Dict[str, Tuple[float, float]]:
+    return {opponent: (score_range.min, score_range.max) for opponent, score_range in (spread or {}).items()}
 
 @app.post("/sessions/{code}/matrix")
 async def submit_matrix(code: str, matrix_data: MatrixInput, db: Session = Depends(get_db)):
@@ -117,32 +268,204 @@ async def submit_matrix(code: str, matrix_data: MatrixInput, db: Session = Depen
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    current_matrices = session.matrices if session.matrices else {}
-    current_matrices[matrix_data.player_name] = matrix_data.matrix
-    session.matrices = current_matrices
+    upsert_predictions(db, session.id, matrix_data.player_name, matrix_data.matrix,
+                       score_ranges(matrix_data.spread))
+    touch(db, DBSession, session.id)
+    db.query(DBOptimizationResult).filter(DBOptimizationResult.session_id == session.id).delete()
+    total_submitted = db.query(func.count(func.distinct(Prediction.your_player))).filter(
+        Prediction.session_id == session.id
+    ).scalar()
+    # Counted inside the write transaction so the connection goes back to the pool at commit
+    # rather than staying checked out until the response has been sent.
     db.commit()
-    db.refresh(session)
+    
+    broker.publish(code, "matrix_submitted", {
+        "player": matrix_data.player_name,
+        "matrix": matrix_data.matrix,
+        "submitted_count": total_submitted
+    })
     
     return {
         "message": "Matrix submitted", 
         "player": matrix_data.player_name,
-        "total_submitted": len(session.matrices)
+        "total_submitted": total_submitted
     }
 
-@app.get("/sessions/{code}/matrices")
-async def get_matrices(code: str, db: Session = Depends(get_db)):
+@app.post("/sessions/{code}/matrices")
+async def submit_matrices(code: str, matrix_data: BulkMatrixInput, db: Session = Depends(get_db)):
+    """Submit several players' matrices, e.g. a whole team's, in one transaction"""
     session = db.query(DBSession).filter(DBSession.code == code).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
+    upsert_team_predictions(db, session.id, matrix_data.matrices, {
+        player_name: score_ranges(spread) for player_name, spread in (matrix_data.spreads or {}).items()
+    })
+    touch(db, DBSession, session.id)
+    db.query(DBOptimizationResult).filter(DBOptimizationResult.session_id == session.id).delete()
+    total_submitted = db.query(func.count(func.distinct(Prediction.your_player))).filter(
+        Prediction.session_id == session.id
+    ).scalar()
+    db.commit()
+    
+    for player_name, matrix in matrix_data.matrices.items():
+        broker.publish(code, "matrix_submitted", {
+            "player": player_name,
+            "matrix": matrix,
+            "submitted_count": total_submitted
+        })
+    
     return {
+        "message": "Matrices submitted",
+        "players": list(matrix_data.matrices),
+        "total_submitted": total_submitted
+    }
+
+@app.get("/sessions/{code}/matrices")
+async def get_matrices(code: str, request: Request, db: Session = Depends(get_db)):
+    """Supports If-None-Match/If-Modified-Since; every submission bumps the session's version"""
+    session = db.query(DBSession).filter(DBSession.code == code).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    def render() -> bytes:
+        matrices = load_matrices(db, session.id)
+        return orjson.dumps({
+            "session_code": code,
+            "matrices": matrices,
+            "spreads": load_spreads(db, session.id),
+            "submitted_count": len(matrices)
+        })
+    
+    return conditional_response(request, entity_tag("matrices", session.id, session.version), session.updated_at, render)
+
+@app.get("/sessions/{code}/events")
+async def session_events(code: str, request: Request, db: Session = Depends(get_db)):
+    """Server-Sent Events stream: a snapshot of the matrices, then each new submission"""
+    session = db.query(DBSession).filter(DBSession.code == code).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    matrices = load_matrices(db, session.id)
+    snapshot = {
         "session_code": code,
-        "matrices": session.matrices or {},
-        "submitted_count": len(session.matrices or {})
+        "matrices": matrices,
+        "submitted_count": len(matrices)
+    }
+    queue = broker.subscribe(code)
+    
+    async def stream():
+        try:
+            yield format_sse("snapshot", snapshot)
+            while not await request.is_disconnected():
+                try:
+                    event, data = await asyncio.wait_for(queue.get(), timeout=KEEPALIVE_SECONDS)
+                    yield format_sse(event, data)
+                except asyncio.TimeoutError:
+                    yield ": keepalive\n\n"
+        finally:
+            broker.unsubscribe(code, queue)
+    
+    return StreamingResponse(
+        stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+OptimizeMode = Literal["exact", "monte_carlo", "batch", "adaptive"]
+OpponentModel = Literal["uniform", "greedy", "minimax", "nash"]
+ObjectiveKind = Literal["mean", "win_probability", "cvar"]
+SIMULATIONS_BY_MODE = {"batch": 6_000_000, "adaptive": 600_000}
+
+def optimization_hash(your_team: List[str], opponent_team: List[str], matrices: dict, params: dict,
+                      spreads: Optional[Spreads] = None) -> str:
+    content = {
+        "your_team": your_team,
+        "opponent_team": opponent_team,
+        "matrices": matrices,
+        **params
+    }
+    # Only ranged sessions carry the key, so results stored before ranges existed stay valid
+    if spreads:
+        content["spreads"] = spreads
+    return content_fingerprint(content)
+
+def objective_params(objective: Objective) -> dict:
+    """The objective's part of a stored result's parameters; empty for the default mean"""
+    if objective.kind == "mean":
+        return {}
+    return {"objective": objective.kind, "win_threshold": objective.win_threshold, "cvar_alpha": objective.cvar_alpha}
+
+def find_stored_optimization(db: Session, session_id: int, content_hash: str) -> Optional[dict]:
+    """A stored response computed from exactly the same inputs, if any"""
+    stored_results = db.query(DBOptimizationResult).filter(DBOptimizationResult.session_id == session_id).all()
+    for stored in stored_results:
+        if stored.results and stored.results.get("content_hash") == content_hash:
+            return stored.results["response"]
+    return None
+
+def store_optimization(db: Session, session_id: int, content_hash: str, params: dict, response: dict):
+    db.add(DBOptimizationResult(
+        session_id=session_id,
+        results={
+            "content_hash": content_hash,
+            "params": params,
+            "response": response
+        }
+    ))
+    db.commit()
+
+def optimization_response(result: OptimizerResult, mode: str) -> dict:
+    return {
+        "mode": mode,
+        "best_defender": result.best_defender,
+        "best_attackers": result.best_attackers,
+        "expected_score": round(result.expected_score, 2),
+        "best_case_score": round(result.best_case_score, 2),
+        "worst_case_score": round(result.worst_case_score, 2),
+        "confidence": round(result.confidence, 3),
+        "confidence_interval": [round(bound, 2) for bound in result.confidence_interval],
+        "decision_tree": result.decision_tree,
+        "simulations_run": result.simulations_run,
+        "computation_time": round(result.computation_time, 2),
+        "seed": result.seed,
+        "opponent_model": result.opponent_model,
+        "objective": result.objective,
+        "win_probability": None if result.win_probability is None else round(result.win_probability, 3),
+        "cvar": None if result.cvar is None else round(result.cvar, 2)
     }
 
 @app.post("/sessions/{code}/optimize")
-async def optimize_pairings(code: str, db: Session = Depends(get_db)):
+async def optimize_pairings(
+    code: str,
+    mode: Optional[OptimizeMode] = Query(None, description="exact up to 7 players, batch above; see below"),
+    seed: Optional[int] = Query(None, ge=0),
+    opponent_model: OpponentModel = "uniform",
+    objective: ObjectiveKind = "mean",
+    win_threshold: Optional[float] = Query(None, description="Team total to beat; half the available points by default"),
+    cvar_alpha: float = Query(0.1, gt=0, le=1, description="Share of worst outcomes averaged by objective=cvar"),
+    bias_correction: bool = Query(False, description="Correct each player's predictions by their recorded bias"),
+    db: Session = Depends(get_db)
+):
+    """Best opening strategy, ranked by objective.
+    
+    Without a mode, teams of up to 7 players are solved exactly and larger
+    teams are sampled in batch mode; a risk objective always samples and an
+    opponent model other than uniform always solves. The response says
+    which mode ran.
+    
+    In exact mode the confidence is 1 and the interval a single point while
+    the whole tree is searched. Asked for at 8 or more players, exact mode
+    estimates the exchanges below the first: the interval is then the range
+    the expected score could take if they were searched, and the confidence
+    the share of other openings proven no better, which is usually 0. In
+    the sampling modes both describe the sampling error.
+    
+    Cells submitted with a min/max range are sampled from a triangular
+    distribution in the sampling modes; exact mode uses their mean. With
+    bias_correction, each player's predictions are shifted by their bias
+    over recorded results (see calibration.py).
+    """
     session = db.query(DBSession).filter(DBSession.code == code).first()
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
@@ -154,7 +477,8 @@ async def optimize_pairings(code: str, db: Session = Depends(get_db)):
         raise HTTPException(status_code=404, detail="Teams not found")
     
     your_player_names = [p.name for p in your_team.players]
-    submitted_players = list(session.matrices.keys()) if session.matrices else []
+    matrices = load_matrices(db, session.id)
+    submitted_players = list(matrices.keys())
     
     if len(submitted_players) < len(your_player_names):
         return {
@@ -165,24 +489,249 @@ async def optimize_pairings(code: str, db: Session = Depends(get_db)):
         }
     
     opponent_player_names = [p.name for p in opponent_team.players]
-    optimizer = PairingOptimizer(
-        your_team=your_player_names,
-        opponent_team=opponent_player_names,
-        matrices=session.matrices
+    spreads = load_spreads(db, session.id)
+    risk = Objective(objective, win_threshold, cvar_alpha)
+    if mode is None:
+        mode = PairingOptimizer(your_player_names, opponent_player_names, matrices, objective=risk).default_mode(opponent_model)
+    num_simulations = SIMULATIONS_BY_MODE.get(mode, 10000)
+    if bias_correction:
+        biases = player_biases(db, {p.name: p.id for p in your_team.players})
+        matrices, spreads = bias_corrected_matrices(matrices, spreads, biases)
+    
+    # Reuse a stored result while the teams, matrices and parameters are unchanged
+    params = {"mode": mode, "num_simulations": num_simulations, "seed": seed, "opponent_model": opponent_model,
+              **objective_params(risk)}
+    if bias_correction:
+        params["bias_correction"] = True
+    content_hash = optimization_hash(your_player_names, opponent_player_names, matrices, params, spreads)
+    stored = find_stored_optimization(db, session.id, content_hash)
+    if stored is not None:
+        return stored
+    
+    try:
+        result = await optimize_in_pool(
+            your_player_names,
+            opponent_player_names,
+            matrices,
+            num_simulations=num_simulations,
+            mode=mode,
+            session_code=code,
+            seed=seed,
+            opponent_model=opponent_model,
+            spreads=spreads,
+            objective=risk
+        )
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    observe_phases(mode, result.timings)
+    
+    response = optimization_response(result, mode)
+    store_optimization(db, session.id, content_hash, params, response)
+    return response
+
+@app.get("/sessions/{code}/optimize/stream")
+async def stream_optimization(
+    code: str,
+    mode: Literal["monte_carlo", "batch"] = "batch",
+    updates: int = Query(20, ge=1, le=200),
+    seed: Optional[int] = Query(None, ge=0),
+    objective: ObjectiveKind = "mean",
+    win_threshold: Optional[float] = None,
+    cvar_alpha: float = Query(0.1, gt=0, le=1),
+    db: Session = Depends(get_db)
+):
+    """Server-Sent Events version of /optimize that reports the best strategy so far.
+    
+    Sends a "progress" event after each of `updates` equal slices of the
+    simulation budget and a final "result" event. The captain can close the
+    stream as soon as the answer has settled; only a completed run is stored.
+    """
+    session = db.query(DBSession).filter(DBSession.code == code).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    your_team = db.query(Team).filter(Team.id == session.your_team_id).first()
+    opponent_team = db.query(Team).filter(Team.id == session.opponent_team_id).first()
+    
+    if not your_team or not opponent_team:
+        raise HTTPException(status_code=404, detail="Teams not found")
+    
+    your_player_names = [p.name for p in your_team.players]
+    opponent_player_names = [p.name for p in opponent_team.players]
+    matrices = load_matrices(db, session.id)
+    missing = [p for p in your_player_names if p not in matrices]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Not all players have submitted matrices: {', '.join(missing)}")
+    
+    try:
+        strategy_count = len(PairingOptimizer(your_player_names, opponent_player_names, matrices).strategies())
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    session_id = session.id
+    num_simulations = SIMULATIONS_BY_MODE.get(mode, 10000)
+    spreads = load_spreads(db, session_id)
+    risk = Objective(objective, win_threshold, cvar_alpha)
+    # Every slice needs at least one rollout per strategy
+    updates = min(updates, max(1, num_simulations // strategy_count))
+    # Slices draw from their own streams, so the slice count is part of the result's identity
+    params = {"mode": mode, "num_simulations": num_simulations, "seed": seed, "updates": updates,
+              **objective_params(risk)}
+    content_hash = optimization_hash(your_player_names, opponent_player_names, matrices, params, spreads)
+    stored = find_stored_optimization(db, session_id, content_hash)
+    
+    async def event_stream():
+        if stored is not None:
+            yield format_sse("result", stored)
+            return
+        
+        response = None
+        completed = 0
+        async for result in optimize_anytime_in_pool(your_player_names, opponent_player_names, matrices,
+                                                     num_simulations=num_simulations, mode=mode,
+                                                     updates=updates, seed=seed,
+                                                     spreads=spreads, objective=risk):
+            completed += 1
+            response = optimization_response(result, mode)
+            yield format_sse("progress", {**response, "completed": completed, "total": updates})
+        # Phase times accumulate across slices, so the last result holds the whole run's
+        observe_phases(mode, result.timings)
+        
+        with SessionLocal() as stream_db:
+            store_optimization(stream_db, session_id, content_hash, params, response)
+        yield format_sse("result", response)
+    
+    return StreamingResponse(
+        event_stream(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
     )
+
+@app.post("/tournaments/{tournament_id}/optimize")
+async def optimize_tournament(
+    tournament_id: int,
+    your_team_id: Optional[int] = None,
+    mode: Optional[OptimizeMode] = None,
+    opponent_model: OpponentModel = "uniform",
+    db: Session = Depends(get_db)
+):
+    """Precompute /optimize for every session in a tournament, streaming NDJSON progress.
     
-    result = optimizer.optimize(num_simulations=10000)
+    Each line reports one session as "computed", "stored" (already up to
+    date) or "skipped" (matrices incomplete or teams unusable); a final
+    summary line follows. Results are stored exactly as /optimize stores
+    them, so captains opening a session later get the answer immediately;
+    without a mode, each session gets /optimize's default for its team size.
+    """
+    tournament = (
+        db.query(Tournament)
+        .options(tournament_tree())
+        .filter(Tournament.id == tournament_id)
+        .first()
+    )
+    if not tournament:
+        raise HTTPException(status_code=404, detail="Tournament not found")
     
-    return {
-        "best_defender": result.best_defender,
-        "best_attackers": result.best_attackers,
-        "expected_score": round(result.expected_score, 2),
-        "best_case_score": round(result.best_case_score, 2),
-        "worst_case_score": round(result.worst_case_score, 2),
-        "decision_tree": result.decision_tree,
-        "simulations_run": result.simulations_run,
-        "computation_time": round(result.computation_time, 2)
-    }
+    rosters = {team.id: (team.name, [p.name for p in team.players]) for team in tournament.teams}
+    query = db.query(DBSession).filter(DBSession.tournament_id == tournament_id)
+    if your_team_id is not None:
+        query = query.filter(DBSession.your_team_id == your_team_id)
+    sessions = query.order_by(DBSession.id).all()
+    matrices_by_session = load_matrices_by_session(db, [session.id for session in sessions])
+    spreads_by_session = load_spreads_by_session(db, [session.id for session in sessions])
+    
+    jobs = []
+    for session in sessions:
+        your_name, your_players = rosters.get(session.your_team_id, (None, []))
+        opponent_name, opponent_players = rosters.get(session.opponent_team_id, (None, []))
+        matrices = matrices_by_session.get(session.id, {})
+        spreads = spreads_by_session.get(session.id, {})
+        job_mode = mode or PairingOptimizer(your_players, opponent_players, matrices).default_mode(opponent_model)
+        num_simulations = SIMULATIONS_BY_MODE.get(job_mode, 10000)
+        params = {"mode": job_mode, "num_simulations": num_simulations, "seed": None, "opponent_model": opponent_model}
+        jobs.append({
+            "mode": job_mode,
+            "params": params,
+            "session_id": session.id,
+            "session_code": session.code,
+            "your_team": your_name,
+            "opponent_team": opponent_name,
+            "your_players": your_players,
+            "opponent_players": opponent_players,
+            "matrices": matrices,
+            "spreads": spreads,
+            "content_hash": optimization_hash(your_players, opponent_players, matrices, params, spreads)
+        })
+    
+    async def run_job(job: dict) -> dict:
+        line = {
+            "session_code": job["session_code"],
+            "your_team": job["your_team"],
+            "opponent_team": job["opponent_team"]
+        }
+        missing = [p for p in job["your_players"] if p not in job["matrices"]]
+        if not job["your_players"] or missing:
+            return {**line, "status": "skipped", "missing": missing}
+        
+        with SessionLocal() as job_db:
+            stored = find_stored_optimization(job_db, job["session_id"], job["content_hash"])
+        if stored is not None:
+            return {**line, "status": "stored", "result": stored}
+        
+        try:
+            result = await optimize_in_pool(
+                job["your_players"],
+                job["opponent_players"],
+                job["matrices"],
+                num_simulations=job["params"]["num_simulations"],
+                mode=job["mode"],
+                session_code=job["session_code"],
+                opponent_model=opponent_model,
+                spreads=job["spreads"]
+            )
+        except ValueError as e:
+            return {**line, "status": "skipped", "error": str(e)}
+        observe_phases(job["mode"], result.timings)
+        
+        response = optimization_response(result, job["mode"])
+        with SessionLocal() as job_db:
+            store_optimization(job_db, job["session_id"], job["content_hash"], job["params"], response)
+        return {**line, "status": "computed", "result": response}
+    
+    async def progress():
+        counts = {"computed": 0, "stored": 0, "skipped": 0}
+        for completed, finished in enumerate(asyncio.as_completed([run_job(job) for job in jobs]), start=1):
+            line = await finished
+            counts[line["status"]] += 1
+            yield json.dumps({**line, "completed": completed, "total": len(jobs)}) + "\n"
+        yield json.dumps({"done": True, "total": len(jobs), **counts}) + "\n"
+    
+    return StreamingResponse(progress(), media_type="application/x-ndjson")
+
+def unpaired_problem(request: RecommendationRequest) -> Optional[str]:
+    """Why the players named in a recommendation request can't be the position it describes, if they can't.
+
+    Names outside the rosters are left to the evaluator, which reports them
+    as unknown players.
+    """
+    yours, theirs = request.unpaired_your_team, request.unpaired_opponent_team
+    if not yours:
+        return "No players left to pair"
+    if len(set(yours)) != len(yours) or len(set(theirs)) != len(theirs):
+        return "Unpaired players must each be listed once"
+    if request.your_defender is not None and request.your_defender not in yours:
+        return f"your_defender {request.your_defender} is not unpaired"
+    if request.opponent_defender is not None and request.opponent_defender not in theirs:
+        return f"opponent_defender {request.opponent_defender} is not unpaired"
+    for name in request.opponent_attackers or []:
+        if name not in theirs or name == request.opponent_defender:
+            return f"opponent attacker {name} is not unpaired or is their defender"
+    for name in request.your_attackers or []:
+        if name not in yours or name == request.your_defender:
+            return f"your attacker {name} is not unpaired or is your defender"
+    if request.your_attacker_taken is not None and request.your_attacker_taken not in (request.your_attackers or []):
+        return f"your_attacker_taken {request.your_attacker_taken} is not among your_attackers"
+    return None
 
 @app.post("/sessions/{code}/recommend")
 async def get_recommendation(
@@ -194,202 +743,256 @@ async def get_recommendation(
     if not session:
         raise HTTPException(status_code=404, detail="Session not found")
     
-    if not session.matrices:
+    matrices = load_matrices(db, session.id)
+    if not matrices:
         raise HTTPException(status_code=400, detail="No matrices submitted")
+    # Recommendations are expected values, so a ranged cell counts at its mean
+    matrices = expected_matrices(matrices, load_spreads(db, session.id))
     
-    from itertools import combinations
+    your_team = db.query(Team).filter(Team.id == session.your_team_id).first()
+    opponent_team = db.query(Team).filter(Team.id == session.opponent_team_id).first()
     
-    if request.decision_type == "pick_defender":
-        best_defender = None
-        best_avg_score = 0
-        defender_results = {}
-        
-        for potential_defender in request.unpaired_your_team:
-            simulation_scores = []
-            
-            for _ in range(500):
-                total_score = 0
-                your_remaining = request.unpaired_your_team.copy()
-                opp_remaining = request.unpaired_opponent_team.copy()
-                
-                while len(your_remaining) > 0:
-                    if len(your_remaining) == len(request.unpaired_your_team):
-                        your_def = potential_defender
-                    else:
-                        your_def = random.choice(your_remaining)
-                    
-                    opp_def = random.choice(opp_remaining)
-                    your_remaining.remove(your_def)
-                    opp_remaining.remove(opp_def)
-                    
-                    if len(your_remaining) == 0:
-                        break
-                    
-                    your_attackers = random.sample(your_remaining, min(2, len(your_remaining)))
-                    opp_attackers = random.sample(opp_remaining, min(2, len(opp_remaining)))
-                    
-                    your_chosen_attacker = random.choice(your_attackers)
-                    opp_chosen_attacker = random.choice(opp_attackers)
-                    
-                    if your_chosen_attacker in session.matrices:
-                        total_score += session.matrices[your_chosen_attacker].get(opp_def, 10)
-                    
-                    if your_def in session.matrices:
-                        total_score += session.matrices[your_def].get(opp_chosen_attacker, 10)
-                    
-                    your_remaining.remove(your_chosen_attacker)
-                    opp_remaining.remove(opp_chosen_attacker)
-                
-                simulation_scores.append(total_score)
-            
-            avg_score = sum(simulation_scores) / len(simulation_scores)
-            defender_results[potential_defender] = round(avg_score, 2)
-            
-            if avg_score > best_avg_score:
-                best_avg_score = avg_score
-                best_defender = potential_defender
-        
-        return {
-            "recommendation": best_defender,
-            "expected_total_score": round(best_avg_score, 2),
-            "all_options": defender_results,
-            "decision_type": "pick_defender"
-        }
+    if not your_team or not opponent_team:
+        raise HTTPException(status_code=404, detail="Teams not found")
     
-    elif request.decision_type == "pick_attackers":
+    if len(request.unpaired_your_team) != len(request.unpaired_opponent_team):
+        raise HTTPException(status_code=400, detail="Unpaired teams must be the same size")
+    
+    if request.decision_type == "pick_attackers":
         if not request.opponent_defender:
             raise HTTPException(status_code=400, detail="opponent_defender required")
         
         if not request.your_defender:
             raise HTTPException(status_code=400, detail="your_defender required")
-        
-        remaining = [p for p in request.unpaired_your_team if p != request.your_defender]
-        
-        best_attackers = None
-        best_avg_score = 0
-        attacker_results = {}
-        
-        for attacker_pair in combinations(remaining, min(2, len(remaining))):
-            simulation_scores = []
-            
-            for _ in range(500):
-                total_score = 0
-                
-                opp_remaining = [p for p in request.unpaired_opponent_team if p != request.opponent_defender]
-                opp_attackers = random.sample(opp_remaining, min(2, len(opp_remaining)))
-                
-                your_chosen = random.choice(list(attacker_pair))
-                opp_chosen = random.choice(opp_attackers)
-                
-                if your_chosen in session.matrices:
-                    total_score += session.matrices[your_chosen].get(request.opponent_defender, 10)
-                
-                if request.your_defender in session.matrices:
-                    total_score += session.matrices[request.your_defender].get(opp_chosen, 10)
-                
-                your_remaining = [p for p in request.unpaired_your_team 
-                                 if p not in [request.your_defender, your_chosen]]
-                opp_remaining_after = [p for p in request.unpaired_opponent_team 
-                                      if p not in [request.opponent_defender, opp_chosen]]
-                
-                while len(your_remaining) > 1:
-                    your_def = random.choice(your_remaining)
-                    opp_def = random.choice(opp_remaining_after)
-                    
-                    your_remaining.remove(your_def)
-                    opp_remaining_after.remove(opp_def)
-                    
-                    your_atts = random.sample(your_remaining, min(2, len(your_remaining)))
-                    opp_atts = random.sample(opp_remaining_after, min(2, len(opp_remaining_after)))
-                    
-                    your_ch = random.choice(your_atts)
-                    opp_ch = random.choice(opp_atts)
-                    
-                    if your_ch in session.matrices:
-                        total_score += session.matrices[your_ch].get(opp_def, 10)
-                    if your_def in session.matrices:
-                        total_score += session.matrices[your_def].get(opp_ch, 10)
-                    
-                    your_remaining.remove(your_ch)
-                    opp_remaining_after.remove(opp_ch)
-                
-                if len(your_remaining) == 1 and len(opp_remaining_after) == 1:
-                    if your_remaining[0] in session.matrices:
-                        total_score += session.matrices[your_remaining[0]].get(opp_remaining_after[0], 10)
-                
-                simulation_scores.append(total_score)
-            
-            avg_score = sum(simulation_scores) / len(simulation_scores)
-            attacker_results[str(attacker_pair)] = round(avg_score, 2)
-            
-            if avg_score > best_avg_score:
-                best_avg_score = avg_score
-                best_attackers = list(attacker_pair)
-        
-        return {
-            "recommendation": best_attackers,
-            "expected_total_score": round(best_avg_score, 2),
-            "all_options": attacker_results,
-            "decision_type": "pick_attackers"
-        }
     
     elif request.decision_type == "pick_defender_matchup":
-        if not request.your_defender or not request.opponent_attackers:
-            raise HTTPException(status_code=400, detail="your_defender and opponent_attackers required")
-        
-        best_matchup = None
-        best_avg_score = 0
-        matchup_results = {}
-        
-        for opp_attacker in request.opponent_attackers:
-            simulation_scores = []
-            
-            for _ in range(500):
-                total_score = 0
-                
-                if request.your_defender in session.matrices:
-                    total_score += session.matrices[request.your_defender].get(opp_attacker, 10)
-                
-                your_remaining = [p for p in request.unpaired_your_team if p != request.your_defender]
-                opp_remaining = [p for p in request.unpaired_opponent_team if p != opp_attacker]
-                
-                while len(your_remaining) > 1:
-                    your_def = random.choice(your_remaining)
-                    opp_def = random.choice(opp_remaining)
-                    
-                    your_remaining.remove(your_def)
-                    opp_remaining.remove(opp_def)
-                    
-                    your_atts = random.sample(your_remaining, min(2, len(your_remaining)))
-                    opp_atts = random.sample(opp_remaining, min(2, len(opp_remaining)))
-                    
-                    your_ch = random.choice(your_atts)
-                    opp_ch = random.choice(opp_atts)
-                    
-                    if your_ch in session.matrices:
-                        total_score += session.matrices[your_ch].get(opp_def, 10)
-                    if your_def in session.matrices:
-                        total_score += session.matrices[your_def].get(opp_ch, 10)
-                    
-                    your_remaining.remove(your_ch)
-                    opp_remaining.remove(opp_ch)
-                
-                if len(your_remaining) == 1 and len(opp_remaining) == 1:
-                    if your_remaining[0] in session.matrices:
-                        total_score += session.matrices[your_remaining[0]].get(opp_remaining[0], 10)
-                
-                simulation_scores.append(total_score)
-            
-            avg_score = sum(simulation_scores) / len(simulation_scores)
-            matchup_results[opp_attacker] = round(avg_score, 2)
-            
-            if avg_score > best_avg_score:
-                best_avg_score = avg_score
-                best_matchup = opp_attacker
-        
-        return {
-            "recommendation": best_matchup,
-            "expected_total_score": round(best_avg_score, 2),
-            "all_options": matchup_results,
-            "decision_type": "pick_defender_matchup"
-        }
\ No newline at end of file
+        if not (request.your_defender and request.opponent_attackers
+                and request.opponent_defender and request.your_attackers):
+            raise HTTPException(
+                status_code=400,
+                detail="your_defender, your_attackers, opponent_defender and opponent_attackers required"
+            )
+    
+    problem = unpaired_problem(request)
+    if problem:
+        raise HTTPException(status_code=400, detail=problem)
+    
+    try:
+        options = await run_for_session(
+            code,
+            recommend_options,
+            code,
+            [p.name for p in your_team.players],
+            [p.name for p in opponent_team.players],
+            matrices,
+            request.decision_type,
+            request.unpaired_your_team,
+            request.unpaired_opponent_team,
+            request.your_defender,
+            request.opponent_defender,
+            request.opponent_attackers,
+            request.opponent_model,
+            request.your_attackers,
+            request.your_attacker_taken
+        )
+    except KeyError as e:
+        raise HTTPException(status_code=400, detail=f"Unknown player: {e.args[0]}")
+    
+    best_option = max(options, key=options.get)
+    recommendation = list(best_option) if isinstance(best_option, tuple) else best_option
+    
+    return {
+        "recommendation": recommendation,
+        "expected_total_score": round(options[best_option], 2),
+        "all_options": {str(option): round(score, 2) for option, score in options.items()},
+        "decision_type": request.decision_type,
+        "opponent_model": request.opponent_model
+    }
+
+@app.get("/sessions/{code}/playbook")
+async def get_playbook(
+    code: str,
+    opponent_model: OpponentModel = "uniform",
+    db: Session = Depends(get_db)
+):
+    """Every recommendation for the pairing, precomputed so the captain's client can look them up.
+
+    Built within PLAYBOOK_TIME_BUDGET on the session's worker, so /recommend
+    calls queued behind it wait at most about that long; positions the book
+    does not reach are answered by /recommend.
+    """
+    session = db.query(DBSession).filter(DBSession.code == code).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    your_team = db.query(Team).filter(Team.id == session.your_team_id).first()
+    opponent_team = db.query(Team).filter(Team.id == session.opponent_team_id).first()
+    if not your_team or not opponent_team:
+        raise HTTPException(status_code=404, detail="Teams not found")
+    
+    your_player_names = [p.name for p in your_team.players]
+    opponent_player_names = [p.name for p in opponent_team.players]
+    if len(your_player_names) != len(opponent_player_names) or len(your_player_names) < 2:
+        raise HTTPException(status_code=400, detail="Teams must have the same number of players, at least 2")
+    
+    matrices = load_matrices(db, session.id)
+    missing = [p for p in your_player_names if p not in matrices]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Matrices missing for: {', '.join(missing)}")
+    matrices = expected_matrices(matrices, load_spreads(db, session.id))
+    
+    params = {"mode": "playbook", "max_states": PLAYBOOK_MAX_STATES, "opponent_model": opponent_model}
+    content_hash = optimization_hash(your_player_names, opponent_player_names, matrices, params)
+    stored = find_stored_optimization(db, session.id, content_hash)
+    if stored is not None:
+        return stored
+    
+    playbook = await run_for_session(
+        code,
+        session_playbook,
+        code,
+        your_player_names,
+        opponent_player_names,
+        matrices,
+        opponent_model
+    )
+    # A book cut short by time depends on the machine and on how warm the worker was; build again next time
+    if not playbook["timed_out"]:
+        store_optimization(db, session.id, content_hash, params, playbook)
+    return playbook
+
+def rounded_cell(cell: dict) -> dict:
+    return {
+        **cell,
+        "slope": round(cell["slope"], 3),
+        "lower_tipping_point": None if cell["lower_tipping_point"] is None else round(cell["lower_tipping_point"], 2),
+        "upper_tipping_point": None if cell["upper_tipping_point"] is None else round(cell["upper_tipping_point"], 2)
+    }
+
+@app.get("/sessions/{code}/sensitivity")
+async def get_sensitivity(
+    code: str,
+    opponent_model: OpponentModel = "uniform",
+    db: Session = Depends(get_db)
+):
+    """How far each cell of the matrix can move before the exact recommendation changes.
+    
+    Every cell reports the scores below and above its current value at
+    which another opening becomes best (null if none is found within 0-20),
+    the opening that takes over, and the slope of the expected score in
+    that cell. Scores are swept in SENSITIVITY_STEP steps, so an opening
+    that is best only over a narrower window can be missed and the point
+    reported is not always the nearest. Cells are listed most sensitive first. Ranged cells count at
+    their mean, as in exact mode.
+    """
+    session = db.query(DBSession).filter(DBSession.code == code).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    your_team = db.query(Team).filter(Team.id == session.your_team_id).first()
+    opponent_team = db.query(Team).filter(Team.id == session.opponent_team_id).first()
+    if not your_team or not opponent_team:
+        raise HTTPException(status_code=404, detail="Teams not found")
+    
+    your_player_names = [p.name for p in your_team.players]
+    opponent_player_names = [p.name for p in opponent_team.players]
+    matrices = load_matrices(db, session.id)
+    missing = [p for p in your_player_names if p not in matrices]
+    if missing:
+        raise HTTPException(status_code=400, detail=f"Matrices missing for: {', '.join(missing)}")
+    matrices = expected_matrices(matrices, load_spreads(db, session.id))
+    
+    params = {"mode": "sensitivity", "step": SENSITIVITY_STEP, "precision": TIPPING_PRECISION,
+              "opponent_model": opponent_model}
+    content_hash = optimization_hash(your_player_names, opponent_player_names, matrices, params)
+    stored = find_stored_optimization(db, session.id, content_hash)
+    if stored is not None:
+        return stored
+    
+    try:
+        report = await sensitivity_in_pool(your_player_names, opponent_player_names, matrices, opponent_model)
+    except ValueError as e:
+        raise HTTPException(status_code=400, detail=str(e))
+    
+    response = {
+        **report,
+        "expected_score": round(report["expected_score"], 2),
+        "computation_time": round(report["computation_time"], 2),
+        "cells": [rounded_cell(cell) for cell in report["cells"]]
+    }
+    store_optimization(db, session.id, content_hash, params, response)
+    return response
+
+@app.post("/sessions/{code}/results")
+async def submit_results(code: str, results_data: ResultsInput, db: Session = Depends(get_db)):
+    """Record how our players' games actually went; re-sending a player's game replaces it.
+    
+    Each result is compared with the player's prediction for that pairing
+    and the calibration aggregates are updated in the same transaction.
+    """
+    session = db.query(DBSession).filter(DBSession.code == code).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    your_ids = {p.name: p.id for p in db.query(Player).filter(Player.team_id == session.your_team_id).all()}
+    opponent_ids = {p.name: p.id for p in db.query(Player).filter(Player.team_id == session.opponent_team_id).all()}
+    unknown = [r.player for r in results_data.results if r.player not in your_ids]
+    unknown += [r.opponent for r in results_data.results if r.opponent not in opponent_ids]
+    if unknown:
+        raise HTTPException(status_code=400, detail=f"Unknown player(s): {', '.join(unknown)}")
+    for side in ("player", "opponent"):
+        names = [getattr(r, side) for r in results_data.results]
+        if len(set(names)) != len(names):
+            raise HTTPException(status_code=400, detail=f"Each {side} can only have one result per session")
+    
+    recorded = record_results(db, session.id, [
+        (your_ids[r.player], opponent_ids[r.opponent], r.score) for r in results_data.results
+    ])
+    total_recorded = db.query(func.count(GameResult.id)).filter(GameResult.session_id == session.id).scalar()
+    db.commit()
+    
+    names = {player_id: name for name, player_id in {**your_ids, **opponent_ids}.items()}
+    return {
+        "message": "Results recorded",
+        "results": [result_row(result, names) for result in recorded],
+        "total_recorded": total_recorded
+    }
+
+def result_row(result: GameResult, names: dict) -> dict:
+    return {
+        "player": names.get(result.player_id),
+        "opponent": names.get(result.opponent_player_id),
+        "score": result.score,
+        "predicted": result.predicted,
+        "error": None if result.predicted is None else round(result.predicted - result.score, 2)
+    }
+
+@app.get("/sessions/{code}/results")
+async def get_results(code: str, db: Session = Depends(get_db)):
+    session = db.query(DBSession).filter(DBSession.code == code).first()
+    if not session:
+        raise HTTPException(status_code=404, detail="Session not found")
+    
+    results = db.query(GameResult).filter(GameResult.session_id == session.id).order_by(GameResult.id).all()
+    names = dict(db.query(Player.id, Player.name).filter(
+        Player.team_id.in_([session.your_team_id, session.opponent_team_id])
+    ).all())
+    return {
+        "session_code": code,
+        "results": [result_row(result, names) for result in results]
+    }
+
+@app.get("/calibration")
+async def get_calibration(
+    scope: Literal[CALIBRATION_SCOPES] = "player",
+    min_games: int = Query(1, ge=1),
+    db: Session = Depends(get_db)
+):
+    """Prediction bias (predicted minus actual), mean absolute error and RMSE, read from the running aggregates"""
+    return {
+        "scope": scope,
+        "rows": [
+            {**row, **{name: round(row[name], 3) for name in ("bias", "mean_absolute_error", "rmse")}}
+            for row in load_calibration(db, scope, min_games)
+        ]
+    }
@@ -0,0 +1,122 @@
+from typing import Dict, List, Optional, Tuple
+from contextvars import ContextVar
+from dataclasses import dataclass, field
+import bisect
+import cProfile
+import json
+import os
+import re
+import threading
+import time
+
+from sqlalchemy import event
+
+# Metrics are per process; each uvicorn/gunicorn worker exposes its own /metrics.
+
+LATENCY_BUCKETS = (0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+QUERY_COUNT_BUCKETS = (0, 1, 2, 5, 10, 20, 50, 100)
+
+# Opt-in profiling: requests sent with "X-Profile: 1" are profiled and dumped here.
+PROFILE_DIR = os.environ.get("PROFILE_DIR")
+
+class Histogram:
+    """Prometheus-style cumulative histogram, one series per label set"""
+
+    def __init__(self, name: str, help_text: str, label_names: Tuple[str, ...], buckets: Tuple[float, ...]):
+        self.name = name
+        self.help_text = help_text
+        self.label_names = label_names
+        self.buckets = buckets
+        self._series: Dict[Tuple[str, ...], List[float]] = {}
+        self._lock = threading.Lock()
+
+    def observe(self, value: float, *labels: str):
+        with self._lock:
+            # bucket counts, overflow, then sum and count
+            series = self._series.setdefault(labels, [0] * (len(self.buckets) + 3))
+            series[bisect.bisect_left(self.buckets, value)] += 1
+            series[-2] += value
+            series[-1] += 1
+
+    def render(self) -> List[str]:
+        lines = [f"# HELP {self.name} {self.help_text}", f"# TYPE {self.name} histogram"]
+        with self._lock:
+            series_items = sorted(self._series.items())
+        for labels, series in series_items:
+            label_text = ",".join(f'{name}="{value}"' for name, value in zip(self.label_names, labels))
+            prefix = label_text + "," if label_text else ""
+            cumulative = 0
+            for bound, count in zip(self.buckets, series):
+                cumulative += count
+                lines.append(f'{self.name}_bucket{{{prefix}le="{bound}"}} {cumulative}')
+            lines.append(f'{self.name}_bucket{{{prefix}le="+Inf"}} {series[-1]}')
+            suffix = f"{{{label_text}}}" if label_text else ""
+            lines.append(f"{self.name}_sum{suffix} {series[-2]}")
+            lines.append(f"{self.name}_count{suffix} {series[-1]}")
+        return lines
+
+REQUEST_LATENCY = Histogram("http_request_duration_seconds", "Time to produce the response headers",
+                            ("method", "route", "status"), LATENCY_BUCKETS)
+REQUEST_QUERIES = Histogram("http_request_db_queries", "Database queries issued per request",
+                            ("method", "route"), QUERY_COUNT_BUCKETS)
+QUERY_LATENCY = Histogram("db_query_duration_seconds", "Database query execution time",
+                          ("statement",), LATENCY_BUCKETS)
+OPTIMIZER_PHASES = Histogram("optimizer_phase_duration_seconds", "Time spent in each optimiser phase",
+                             ("mode", "phase"), LATENCY_BUCKETS)
+
+@dataclass
+class RequestStats:
+    """Queries issued while serving one request"""
+    query_count: int = 0
+    query_time: float = 0.0
+    queries: List[Tuple[float, str]] = field(default_factory=list)
+
+current_request: ContextVar[Optional[RequestStats]] = ContextVar("current_request", default=None)
+
+def instrument_engine(engine):
+    """Count and time every query, globally and against the request being served"""
+
+    @event.listens_for(engine, "before_cursor_execute")
+    def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        conn.info.setdefault("query_start", []).append(time.perf_counter())
+
+    @event.listens_for(engine, "after_cursor_execute")
+    def after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+        elapsed = time.perf_counter() - conn.info["query_start"].pop()
+        QUERY_LATENCY.observe(elapsed, statement.lstrip().split(None, 1)[0].upper())
+        stats = current_request.get()
+        if stats is not None:
+            stats.query_count += 1
+            stats.query_time += elapsed
+            if PROFILE_DIR:
+                stats.queries.append((elapsed, statement))
+
+def observe_phases(mode: str, timings: Dict[str, float]):
+    for phase, seconds in timings.items():
+        OPTIMIZER_PHASES.observe(seconds, mode, phase)
+
+def dump_profile(profiler: cProfile.Profile, method: str, route: str, elapsed: float, stats: RequestStats) -> str:
+    """Write a request's cProfile stats and query log to PROFILE_DIR; returns the file stem"""
+    os.makedirs(PROFILE_DIR, exist_ok=True)
+    stem = f"{int(time.time() * 1000)}-{method}-{re.sub(r'[^A-Za-z0-9]+', '_', route).strip('_') or 'root'}"
+    path = os.path.join(PROFILE_DIR, stem)
+    profiler.dump_stats(path + ".prof")
+    with open(path + ".json", "w") as f:
+        json.dump({
+            "method": method,
+            "route": route,
+            "duration_ms": round(elapsed * 1000, 3),
+            "query_count": stats.query_count,
+            "query_ms": round(stats.query_time * 1000, 3),
+            "slowest_queries": [
+                {"ms": round(seconds * 1000, 3), "statement": statement}
+                for seconds, statement in sorted(stats.queries, reverse=True)[:20]
+            ]
+        }, f, indent=2)
+    return stem
+
+def render_metrics() -> str:
+    lines = []
+    for histogram in (REQUEST_LATENCY, REQUEST_QUERIES, QUERY_LATENCY, OPTIMIZER_PHASES):
+        lines.extend(histogram.render())
+    return "\n".join(lines) + "\n"
@@ -0,0 +1,17 @@
+from models import init_db, SessionLocal, migrate_json_matrices
+
+def migrate():
+    init_db()
+    db = SessionLocal()
+    
+    try:
+        migrated = migrate_json_matrices(db)
+        print(f"✓ Moved predictions for {migrated} session(s) into the predictions table")
+    except Exception as e:
+        print(f"Error migrating matrices: {e}")
+        db.rollback()
+    finally:
+        db.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,85 @@
+from typing import List, Optional, Sequence, Tuple
+import numpy as np
+
+# How the opponent is assumed to choose at each of its decisions:
+#   uniform - every option equally likely (the Monte Carlo rollouts' model)
+#   greedy  - the option best for them on the pairings it settles immediately
+#   minimax - the option worst for us, knowing our choice (pure security level)
+#   nash    - simultaneous reveals played as mixed-strategy equilibria
+OPPONENT_MODELS = ("uniform", "greedy", "minimax", "nash")
+
+def respond(model: str, values: Sequence[float], myopic: Optional[Sequence[float]] = None) -> float:
+    """Our value when the opponent picks among options worth values to us.
+
+    myopic holds, for the greedy model, what each option settles straight
+    away; ties between equally greedy options are averaged.
+    """
+    if model == "minimax":
+        return min(values)
+    if model == "greedy":
+        lowest = min(myopic)
+        chosen = [value for value, score in zip(values, myopic) if score == lowest]
+        return sum(chosen) / len(chosen)
+    return sum(values) / len(values)
+
+def solve_2x2(a: float, b: float, c: float, d: float) -> float:
+    """Value of the zero-sum game [[a, b], [c, d]] for the maximising row player"""
+    lower = max(min(a, b), min(c, d))
+    upper = min(max(a, c), max(b, d))
+    if lower == upper:
+        return lower
+    return (a * d - b * c) / (a + d - b - c)
+
+def solve_matrix_game(payoff: np.ndarray) -> Tuple[float, np.ndarray, np.ndarray]:
+    """Value and equilibrium mixes of a zero-sum game; rows maximise, columns minimise.
+
+    Pure saddle points are returned directly. Otherwise the column player's
+    problem, max sum(y) s.t. (payoff + shift) y <= 1, is solved by the
+    simplex method with Bland's rule; the row mix is its dual.
+    """
+    payoff = np.asarray(payoff, dtype=np.float64)
+    rows, cols = payoff.shape
+    row_mins = payoff.min(axis=1)
+    col_maxes = payoff.max(axis=0)
+    best_row = int(row_mins.argmax())
+    best_col = int(col_maxes.argmin())
+    if row_mins[best_row] == col_maxes[best_col]:
+        return float(row_mins[best_row]), np.eye(rows)[best_row], np.eye(cols)[best_col]
+
+    shift = 1.0 - payoff.min()
+    tableau = np.zeros((rows + 1, cols + rows + 1))
+    tableau[:rows, :cols] = payoff + shift
+    tableau[:rows, cols:cols + rows] = np.eye(rows)
+    tableau[:rows, -1] = 1.0
+    tableau[rows, :cols] = -1.0
+    basis = list(range(cols, cols + rows))
+
+    while True:
+        entering = np.flatnonzero(tableau[rows, :-1] < -1e-12)
+        if not len(entering):
+            break
+        column = entering[0]
+        positive = tableau[:rows, column] > 1e-12
+        ratios = np.full(rows, np.inf)
+        ratios[positive] = tableau[:rows, -1][positive] / tableau[:rows, column][positive]
+        tied = np.flatnonzero(ratios <= ratios.min() + 1e-12)
+        leaving = min(tied, key=lambda row: basis[row])
+        tableau[leaving] /= tableau[leaving, column]
+        pivot_row = tableau[leaving].copy()
+        tableau -= np.outer(tableau[:, column], pivot_row)
+        tableau[leaving] = pivot_row
+        basis[leaving] = column
+
+    total = tableau[rows, -1]
+    col_mix = np.zeros(cols)
+    for row, variable in enumerate(basis):
+        if variable < cols:
+            col_mix[variable] = tableau[row, -1]
+    row_mix = tableau[rows, cols:cols + rows].copy()
+    return 1.0 / total - shift, row_mix / total, col_mix / total
+
+def second_best(values: List[float]) -> float:
+    """The weaker of the two best options, e.g. the attacker a defender is left facing"""
+    if len(values) < 2:
+        return max(values)
+    return sorted(values)[-2]
@@ -1,10 +1,29 @@
 import random
 from typing import Dict, List, Tuple, Optional
-from dataclasses import dataclass
-from collections import defaultdict
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+import hashlib
+import json
+import math
 import time
+import numpy as np
 
-@dataclass
+from solver import GameTreeSolver, MODEL_OUTLOOKS, searched_exactly
+from batch_simulator import BatchSimulator
+
+# Optional per-cell score ranges, {your_player: {opponent_player: (min, max)}};
+# the matrices hold the most likely score and outcomes are triangular over the range.
+Spreads = Dict[str, Dict[str, Tuple[float, float]]]
+
+OBJECTIVES = ("mean", "win_probability", "cvar")
+# Resolution of the team-total histogram CVaR is read from
+TOTAL_BIN_WIDTH = 0.05
+
+def content_fingerprint(data: dict) -> str:
+    """Stable hash of JSON-serialisable optimiser inputs"""
+    return hashlib.sha256(json.dumps(data, sort_keys=True).encode()).hexdigest()
+
+@dataclass(slots=True)
 class SimulationResult:
     """Results from a single simulation"""
     your_defender: str
@@ -27,20 +46,296 @@ class OptimizationResult:
     decision_tree: Dict[str, str]
     simulations_run: int
     computation_time: float
+    confidence_interval: Optional[Tuple[float, float]] = None
+    seed: Optional[int] = None
+    opponent_model: str = "uniform"
+    timings: Dict[str, float] = field(default_factory=dict)
+    objective: str = "mean"
+    win_probability: Optional[float] = None
+    cvar: Optional[float] = None
+
+@dataclass
+class StrategySummary:
+    """Sampled team scores for one (defender, attackers) strategy"""
+    mean: float
+    best_case: float
+    worst_case: float
+    rollouts: int
+    std: float = 0.0
+    win_probability: Optional[float] = None
+    cvar: Optional[float] = None
+    
+    @property
+    def standard_error(self) -> float:
+        return self.std / math.sqrt(self.rollouts) if self.rollouts else 0.0
+    
+    def interval(self, z: float = 1.96) -> Tuple[float, float]:
+        return (self.mean - z * self.standard_error, self.mean + z * self.standard_error)
+
+@dataclass(frozen=True)
+class Objective:
+    """What sampled strategies are ranked by.
+    
+    "mean" is the expected team total, "win_probability" the chance the
+    total is strictly above win_threshold (half the available points when
+    None) and "cvar" the mean total over the worst cvar_alpha of outcomes.
+    """
+    kind: str = "mean"
+    win_threshold: Optional[float] = None
+    cvar_alpha: float = 0.1
+    
+    def __post_init__(self):
+        if self.kind not in OBJECTIVES:
+            raise ValueError(f"Unknown objective {self.kind!r}; expected one of {', '.join(OBJECTIVES)}")
+        if not 0 < self.cvar_alpha <= 1:
+            raise ValueError("cvar_alpha must be in (0, 1]")
+    
+    def threshold(self, team_size: int) -> float:
+        return self.win_threshold if self.win_threshold is not None else 10.0 * team_size
+    
+    def value(self, summary: StrategySummary) -> float:
+        if self.kind == "win_probability":
+            return summary.win_probability
+        if self.kind == "cvar":
+            return summary.cvar
+        return summary.mean
+    
+    def standard_error(self, summary: StrategySummary) -> float:
+        if not summary.rollouts:
+            return 0.0
+        if self.kind == "win_probability":
+            p = summary.win_probability
+            return math.sqrt(p * (1 - p) / summary.rollouts)
+        if self.kind == "cvar":
+            # The tail spread is at most the overall spread, so this errs wide
+            return summary.std / math.sqrt(max(1.0, self.cvar_alpha * summary.rollouts))
+        return summary.standard_error
+    
+    def interval(self, summary: StrategySummary, z: float = 1.96) -> Tuple[float, float]:
+        value = self.value(summary)
+        error = self.standard_error(summary)
+        return (value - z * error, value + z * error)
+
+class ScoreAccumulator:
+    """Running totals for a strategy sampled over several batches.
+    
+    Alongside the moments it counts wins over win_threshold and keeps a
+    histogram of team totals (count and sum per TOTAL_BIN_WIDTH bin), so
+    tail averages can still be read off after batches are merged.
+    """
+    
+    def __init__(self, win_threshold: float = math.inf):
+        self.count = 0
+        self.total = 0.0
+        self.total_sq = 0.0
+        self.best_case = -math.inf
+        self.worst_case = math.inf
+        self.win_threshold = win_threshold
+        self.wins = 0
+        self.bin_counts = np.zeros(0, dtype=np.int64)
+        self.bin_sums = np.zeros(0)
+    
+    def add(self, scores: np.ndarray):
+        scores = scores.astype(np.float64)
+        self.count += len(scores)
+        self.total += float(scores.sum())
+        self.total_sq += float(np.square(scores).sum())
+        self.best_case = max(self.best_case, float(scores.max()))
+        self.worst_case = min(self.worst_case, float(scores.min()))
+        self.wins += int(np.count_nonzero(scores > self.win_threshold))
+        bins = np.maximum(scores / TOTAL_BIN_WIDTH, 0).astype(np.intp)
+        self._add_bins(np.bincount(bins), np.bincount(bins, weights=scores))
+    
+    def _add_bins(self, counts: np.ndarray, sums: np.ndarray):
+        if len(counts) > len(self.bin_counts):
+            self.bin_counts = np.pad(self.bin_counts, (0, len(counts) - len(self.bin_counts)))
+            self.bin_sums = np.pad(self.bin_sums, (0, len(sums) - len(self.bin_sums)))
+        self.bin_counts[:len(counts)] += counts
+        self.bin_sums[:len(sums)] += sums
+    
+    def merge(self, other: "ScoreAccumulator"):
+        self.count += other.count
+        self.total += other.total
+        self.total_sq += other.total_sq
+        self.best_case = max(self.best_case, other.best_case)
+        self.worst_case = min(self.worst_case, other.worst_case)
+        self.wins += other.wins
+        self._add_bins(other.bin_counts, other.bin_sums)
+    
+    def tail_mean(self, alpha: float) -> float:
+        """Mean of the lowest alpha share of totals; the bin it ends in counts pro rata"""
+        wanted = max(1.0, alpha * self.count)
+        cumulative = np.cumsum(self.bin_counts)
+        last = int(np.searchsorted(cumulative, wanted))
+        taken = cumulative[last - 1] if last else 0
+        tail_sum = self.bin_sums[:last].sum() + (wanted - taken) * self.bin_sums[last] / self.bin_counts[last]
+        return float(tail_sum / wanted)
+    
+    def summary(self, cvar_alpha: float = 0.1) -> StrategySummary:
+        mean = self.total / self.count
+        variance = max(0.0, self.total_sq / self.count - mean * mean)
+        return StrategySummary(
+            mean=mean,
+            best_case=self.best_case,
+            worst_case=self.worst_case,
+            rollouts=self.count,
+            std=math.sqrt(variance),
+            win_probability=self.wins / self.count,
+            cvar=self.tail_mean(cvar_alpha)
+        )
+
+def probability_best(best: StrategySummary, runner_up: Optional[StrategySummary],
+                     objective: Objective = Objective()) -> float:
+    """Normal-approximation probability that best really beats the runner-up on the objective"""
+    if runner_up is None:
+        return 1.0
+    spread = math.sqrt(objective.standard_error(best) ** 2 + objective.standard_error(runner_up) ** 2)
+    margin = objective.value(best) - objective.value(runner_up)
+    if spread == 0:
+        return 1.0 if margin > 0 else 0.5
+    return 0.5 * (1 + math.erf(margin / (spread * math.sqrt(2))))
+
+def expected_matrices(matrices: Dict[str, Dict[str, float]], spreads: Optional[Spreads]) -> Dict[str, Dict[str, float]]:
+    """Mean score of each cell: (min + likely + max) / 3 where a range is given"""
+    if not spreads:
+        return matrices
+    return {
+        your_player: {
+            opponent_player: (sum(spreads[your_player][opponent_player]) + score) / 3
+            if opponent_player in spreads.get(your_player, {}) else score
+            for opponent_player, score in row.items()
+        }
+        for your_player, row in matrices.items()
+    }
+
+def default_seed(your_team: List[str], opponent_team: List[str], matrices: Dict[str, Dict[str, float]]) -> int:
+    """Seed derived from the inputs, so unseeded runs on identical inputs still agree"""
+    fingerprint = content_fingerprint({
+        "your_team": your_team,
+        "opponent_team": opponent_team,
+        "matrices": matrices
+    })
+    return int(fingerprint[:8], 16)
 
 class PairingOptimizer:
     def __init__(self, 
                  your_team: List[str],
                  opponent_team: List[str],
-                 matrices: Dict[str, Dict[str, float]]):
+                 matrices: Dict[str, Dict[str, float]],
+                 seed: Optional[int] = None,
+                 spreads: Optional[Spreads] = None,
+                 objective: Objective = Objective()):
         self.your_team = your_team
         self.opponent_team = opponent_team
         self.matrices = matrices
+        self.spreads = spreads or None
+        self.objective = objective
+        self.win_threshold = objective.threshold(len(your_team))
+        self.seed = seed if seed is not None else default_seed(your_team, opponent_team, matrices)
+        self.rng = random.Random(self.seed)
+        # Seconds spent per optimiser phase, reported with each result
+        self.timings: Dict[str, float] = {}
+        # Names map to row/column ids once; rollouts then index one flat score list.
+        self.your_index = {name: i for i, name in enumerate(your_team)}
+        self.opponent_index = {name: j for j, name in enumerate(opponent_team)}
+        self._stride = len(opponent_team)
+        self._scores = [
+            matrices.get(y, {}).get(o, 10.0)
+            for y in your_team
+            for o in opponent_team
+        ]
+        # (min, likely, max) of each cell given a range, by flat index
+        self._ranges: Dict[int, Tuple[float, float, float]] = {}
+        for y, row in (spreads or {}).items():
+            for o, (low, high) in row.items():
+                if y in self.your_index and o in self.opponent_index:
+                    cell = self.your_index[y] * self._stride + self.opponent_index[o]
+                    self._ranges[cell] = (low, self._scores[cell], high)
         
     def get_score(self, your_player: str, opponent_player: str) -> float:
-        if your_player not in self.matrices:
-            return 10.0
-        return self.matrices[your_player].get(opponent_player, 10.0)
+        return self._scores[self.your_index[your_player] * self._stride + self.opponent_index[opponent_player]]
+    
+    @contextmanager
+    def timed(self, phase: str):
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.timings[phase] = self.timings.get(phase, 0.0) + time.perf_counter() - start
+    
+    def stream_seed(self, *key: int) -> np.random.SeedSequence:
+        """Independent random stream for a unit of work, e.g. (slice, strategy index).
+        
+        Streams depend only on the run seed and the key, so results do not
+        depend on how the work is split across workers.
+        """
+        return np.random.SeedSequence([self.seed, *key])
+    
+    def _play_out(self,
+                  your_pool: List[int],
+                  opponent_pool: List[int],
+                  your_defender: int,
+                  opponent_defender: int,
+                  your_attackers: List[int],
+                  opponent_attackers: List[int],
+                  rng: random.Random,
+                  pairings: Optional[List[Tuple[int, int]]] = None) -> float:
+        """Total score of one random play-out from the given opening, on player ids.
+        
+        Each exchange pairs three players per side; exchanges repeat while at
+        least three players remain, then the last two (or one) pair off.
+        Pairings are appended to pairings when a list is given.
+        """
+        scores = self._scores
+        stride = self._stride
+        rand = rng.random
+        total = 0.0
+        
+        while True:
+            # Each defender picks one of the two attackers it is offered;
+            # the refused attackers face each other.
+            pick = rand() < 0.5
+            your_attacker, your_refused = (your_attackers[0], your_attackers[1]) if pick else (your_attackers[1], your_attackers[0])
+            pick = rand() < 0.5
+            opponent_attacker, opponent_refused = (opponent_attackers[0], opponent_attackers[1]) if pick else (opponent_attackers[1], opponent_attackers[0])
+            
+            total += (scores[your_attacker * stride + opponent_defender]
+                      + scores[your_defender * stride + opponent_attacker]
+                      + scores[your_refused * stride + opponent_refused])
+            if pairings is not None:
+                pairings.extend([(your_attacker, opponent_defender),
+                                 (your_defender, opponent_attacker),
+                                 (your_refused, opponent_refused)])
+            
+            your_pool = [p for p in your_pool if p != your_defender and p != your_attacker and p != your_refused]
+            opponent_pool = [p for p in opponent_pool
+                             if p != opponent_defender and p != opponent_attacker and p != opponent_refused]
+            
+            if len(your_pool) < 3 or len(opponent_pool) < 3:
+                break
+            
+            your_defender = rng.choice(your_pool)
+            opponent_defender = rng.choice(opponent_pool)
+            your_attackers = rng.sample([p for p in your_pool if p != your_defender], 2)
+            opponent_attackers = rng.sample([p for p in opponent_pool if p != opponent_defender], 2)
+        
+        if len(your_pool) == 2 and len(opponent_pool) == 2:
+            # Final pick: each side's defender faces the other side's last player.
+            your_final_defender = rand() < 0.5
+            opponent_final_defender = rand() < 0.5
+            your_final = (your_pool[1], your_pool[0]) if your_final_defender else (your_pool[0], your_pool[1])
+            opponent_final = (opponent_pool[1], opponent_pool[0]) if opponent_final_defender else (opponent_pool[0], opponent_pool[1])
+            final = [(your_final[0], opponent_final[1]), (your_final[1], opponent_final[0])]
+        elif len(your_pool) == 1 and len(opponent_pool) == 1:
+            final = [(your_pool[0], opponent_pool[0])]
+        else:
+            final = []
+        
+        for your_player, opponent_player in final:
+            total += scores[your_player * stride + opponent_player]
+        if pairings is not None:
+            pairings.extend(final)
+        return total
     
     def simulate_pairing_round(self, 
                                your_pool: List[str],
@@ -49,51 +344,51 @@ class PairingOptimizer:
                                opponent_defender: str,
                                your_attackers: List[str],
                                opponent_attackers: List[str]) -> List[Tuple[str, str]]:
+        """Play out the whole pairing from the given opening, for any team size"""
+        yours = self.your_index
+        theirs = self.opponent_index
         pairings = []
-        your_turn_first = random.random() < 0.5
-        
-        if your_turn_first:
-            your_attacker = random.choice(your_attackers)
-            pairings.append((your_attacker, opponent_defender))
-            your_attackers = [a for a in your_attackers if a != your_attacker]
-            
-            opponent_attacker = random.choice(opponent_attackers)
-            pairings.append((your_defender, opponent_attacker))
-            opponent_attackers = [a for a in opponent_attackers if a != opponent_attacker]
-        else:
-            opponent_attacker = random.choice(opponent_attackers)
-            pairings.append((your_defender, opponent_attacker))
-            opponent_attackers = [a for a in opponent_attackers if a != opponent_attacker]
-            
-            your_attacker = random.choice(your_attackers)
-            pairings.append((your_attacker, opponent_defender))
-            your_attackers = [a for a in your_attackers if a != your_attacker]
-        
-        your_new_defender = your_attackers[0]
-        opponent_new_defender = opponent_attackers[0]
-        pairings.append((your_new_defender, opponent_new_defender))
-        
-        your_pool = [p for p in your_pool if p not in [your_defender, your_attacker, your_new_defender]]
-        opponent_pool = [p for p in opponent_pool if p not in [opponent_defender, opponent_attacker, opponent_new_defender]]
-        
-        if len(your_pool) == 2 and len(opponent_pool) == 2:
-            your_remaining = your_pool
-            opponent_remaining = opponent_pool
-            
-            your_final_defender = random.choice(your_remaining)
-            opponent_final_defender = random.choice(opponent_remaining)
-            
-            your_final_attacker = [p for p in your_remaining if p != your_final_defender][0]
-            opponent_final_attacker = [p for p in opponent_remaining if p != opponent_final_defender][0]
-            
-            if random.random() < 0.5:
-                pairings.append((your_final_attacker, opponent_final_defender))
-                pairings.append((your_final_defender, opponent_final_attacker))
-            else:
-                pairings.append((your_final_defender, opponent_final_attacker))
-                pairings.append((your_final_attacker, opponent_final_defender))
-        
-        return pairings
+        self._play_out(
+            [yours[p] for p in your_pool],
+            [theirs[p] for p in opponent_pool],
+            yours[your_defender],
+            theirs[opponent_defender],
+            [yours[p] for p in your_attackers],
+            [theirs[p] for p in opponent_attackers],
+            self.rng,
+            pairings
+        )
+        return [(self.your_team[y], self.opponent_team[o]) for y, o in pairings]
+    
+    def rollout_totals(self, your_defender: str, your_attackers: List[str], num_rollouts: int,
+                       rng: Optional[random.Random] = None) -> List[float]:
+        """Team totals of num_rollouts play-outs against a random opponent opening"""
+        rng = rng if rng is not None else self.rng
+        your_pool = list(range(len(self.your_team)))
+        opponent_pool = list(range(len(self.opponent_team)))
+        defender = self.your_index[your_defender]
+        attackers = [self.your_index[a] for a in your_attackers]
+        play_out = self._play_out
+        totals = []
+        for _ in range(num_rollouts):
+            opponent_defender = rng.choice(opponent_pool)
+            opponent_attackers = rng.sample([p for p in opponent_pool if p != opponent_defender], 2)
+            if not self._ranges:
+                totals.append(play_out(your_pool, opponent_pool, defender, opponent_defender,
+                                       attackers, opponent_attackers, rng))
+                continue
+            pairings = []
+            play_out(your_pool, opponent_pool, defender, opponent_defender,
+                     attackers, opponent_attackers, rng, pairings)
+            totals.append(sum(self._draw_score(y * self._stride + o, rng) for y, o in pairings))
+        return totals
+    
+    def _draw_score(self, cell: int, rng: random.Random) -> float:
+        """One outcome of a pairing: triangular over the cell's range, or its fixed score"""
+        if cell not in self._ranges:
+            return self._scores[cell]
+        low, likely, high = self._ranges[cell]
+        return rng.triangular(low, high, likely)
     
     def run_single_simulation(self,
                             your_defender: str,
@@ -101,19 +396,19 @@ class PairingOptimizer:
                             opponent_defender: Optional[str] = None,
                             opponent_attackers: Optional[List[str]] = None) -> SimulationResult:
         if opponent_defender is None:
-            opponent_defender = random.choice(self.opponent_team)
+            opponent_defender = self.rng.choice(self.opponent_team)
         
         if opponent_attackers is None:
             remaining = [p for p in self.opponent_team if p != opponent_defender]
-            opponent_attackers = random.sample(remaining, 2)
+            opponent_attackers = self.rng.sample(remaining, 2)
         
         pairings = self.simulate_pairing_round(
-            self.your_team.copy(),
-            self.opponent_team.copy(),
+            self.your_team,
+            self.opponent_team,
             your_defender,
             opponent_defender,
-            your_attackers.copy(),
-            opponent_attackers.copy()
+            your_attackers,
+            opponent_attackers
         )
         
         individual_scores = {}
@@ -134,58 +429,234 @@ class PairingOptimizer:
             individual_scores=individual_scores
         )
     
-    def optimize(self, num_simulations: int = 10000) -> OptimizationResult:
+    def build_decision_tree(self, best_attackers: List[str]) -> Dict[str, str]:
+        """Our better attacker against each opponent defender; the full playbook is in playbook.py"""
+        return {
+            opponent_defender: max(best_attackers, key=lambda attacker: self.get_score(attacker, opponent_defender))
+            for opponent_defender in self.opponent_team
+        }
+    
+    def optimize_exact(self,
+                       solver: Optional[GameTreeSolver] = None,
+                       opponent_model: str = "uniform") -> OptimizationResult:
+        """Solve the pairing tree by backward induction instead of sampling it.
+        
+        Large teams are searched one exchange deep with the later exchanges
+        estimated; see GameTreeSolver. Passing a solver kept from an earlier
+        call (after update_matrices) reuses every subgame it still holds.
+        The expected score is taken against opponent_model; the best and
+        worst cases are the best- and worst-case opponents. Cells given a
+        range count at their mean, which is exact for the expected total.
+
+        When later exchanges are estimated, the confidence interval is the
+        range the expected score could move over if they were searched (see
+        GameTreeSolver.strategy_bounds), and the confidence is the share of
+        the other openings it is proven to do at least as well as.
+        """
+        self.check_team_sizes()
         start_time = time.time()
-        strategy_results = defaultdict(list)
+        if solver is None:
+            solver = GameTreeSolver(self.your_team, self.opponent_team, expected_matrices(self.matrices, self.spreads))
+        positions_before = solver.positions_computed
+        outlook = MODEL_OUTLOOKS[opponent_model]
+        with self.timed("solve"):
+            strategy_values = solver.solve(dict.fromkeys([outlook, "worst", "best"]))
+        
+        (defender, attackers), values = max(strategy_values.items(), key=lambda item: item[1][outlook])
+        best_attackers = [self.your_team[a] for a in attackers]
+        if solver.exact:
+            confidence, interval = 1.0, (values[outlook], values[outlook])
+        else:
+            with self.timed("bounds"):
+                interval = solver.strategy_bounds(defender, attackers, outlook)
+                others = [solver.strategy_bounds(*strategy, outlook)[1]
+                          for strategy in strategy_values if strategy != (defender, attackers)]
+            confidence = sum(high <= interval[0] for high in others) / len(others)
+        with self.timed("decision_tree"):
+            decision_tree = self.build_decision_tree(best_attackers)
         
+        return OptimizationResult(
+            best_defender=self.your_team[defender],
+            best_attackers=best_attackers,
+            expected_score=values[outlook],
+            best_case_score=values["best"],
+            worst_case_score=values["worst"],
+            confidence=confidence,
+            decision_tree=decision_tree,
+            simulations_run=solver.positions_computed - positions_before,
+            computation_time=time.time() - start_time,
+            confidence_interval=interval,
+            seed=self.seed,
+            opponent_model=opponent_model,
+            timings=dict(self.timings)
+        )
+    
+    def default_mode(self, opponent_model: str = "uniform") -> str:
+        """exact where it searches the whole tree, batch where it would estimate part of it.
+
+        Risk objectives need a sampling mode and other opponent models need
+        exact, so those requests keep to the mode that supports them.
+        """
+        if self.objective.kind != "mean":
+            return "batch"
+        if opponent_model != "uniform" or searched_exactly(len(self.your_team)):
+            return "exact"
+        return "batch"
+    
+    def check_options(self, mode: str, opponent_model: str):
+        if mode == "exact" and self.objective.kind != "mean":
+            raise ValueError("Only sampling modes (monte_carlo, batch, adaptive) support risk objectives")
+        if mode != "exact" and opponent_model != "uniform":
+            raise ValueError("Only mode=exact supports opponent models other than uniform")
+    
+    def check_team_sizes(self):
+        if len(self.your_team) != len(self.opponent_team):
+            raise ValueError("Both teams must have the same number of players")
+        if len(self.your_team) < 3:
+            raise ValueError("Pairing needs at least 3 players per team")
+    
+    def batch_simulator(self) -> BatchSimulator:
+        return BatchSimulator(self.your_team, self.opponent_team, self.matrices, spreads=self.spreads)
+    
+    def strategies(self) -> List[Tuple[str, Tuple[str, str]]]:
+        """Every (defender, attacker pair) opening we can commit to"""
+        self.check_team_sizes()
+        strategies = []
         for your_defender in self.your_team:
             remaining = [p for p in self.your_team if p != your_defender]
-            
             for i, attacker1 in enumerate(remaining):
                 for attacker2 in remaining[i+1:]:
-                    your_attackers = [attacker1, attacker2]
-                    strategy_key = (your_defender, tuple(sorted(your_attackers)))
-                    
-                    for _ in range(num_simulations // 60):
-                        result = self.run_single_simulation(your_defender, your_attackers)
-                        strategy_results[strategy_key].append(result.total_score)
-        
-        best_strategy = None
-        best_avg_score = 0
-        
-        for strategy_key, scores in strategy_results.items():
-            avg_score = sum(scores) / len(scores)
-            if avg_score > best_avg_score:
-                best_avg_score = avg_score
-                best_strategy = strategy_key
-        
-        best_defender, best_attackers = best_strategy
-        best_attackers = list(best_attackers)
-        best_scores = strategy_results[best_strategy]
+                    strategies.append((your_defender, (attacker1, attacker2)))
+        return strategies
+    
+    def accumulate_strategies(self,
+                              strategies: List[Tuple[str, Tuple[str, str]]],
+                              rollouts_per_strategy: int,
+                              mode: str = "monte_carlo",
+                              slice_index: int = 0) -> Dict[Tuple[str, Tuple[str, str]], ScoreAccumulator]:
+        """Roll out each strategy, keeping running totals that later batches can be merged into.
         
-        decision_tree = {}
-        for opponent_defender in self.opponent_team:
-            attacker_scores = {attacker: [] for attacker in best_attackers}
-            
-            for attacker in best_attackers:
-                for _ in range(100):
-                    score = self.get_score(attacker, opponent_defender)
-                    attacker_scores[attacker].append(score)
-            
-            best_attacker = max(attacker_scores.keys(), 
-                              key=lambda a: sum(attacker_scores[a]) / len(attacker_scores[a]))
-            decision_tree[opponent_defender] = best_attacker
+        Each strategy samples from its own stream for this slice, so a chunk
+        of strategies gives the same totals whichever worker runs it.
+        """
+        simulator = self.batch_simulator() if mode == "batch" else None
+        strategy_ids = {strategy: i for i, strategy in enumerate(self.strategies())}
+        accumulators = {}
         
-        computation_time = time.time() - start_time
+        for your_defender, your_attackers in strategies:
+            stream = self.stream_seed(slice_index, strategy_ids[(your_defender, tuple(your_attackers))])
+            if simulator is not None:
+                scores = simulator.simulate(your_defender, list(your_attackers), rollouts_per_strategy,
+                                            np.random.default_rng(stream))
+            else:
+                rng = random.Random(int(stream.generate_state(1)[0]))
+                scores = np.array(self.rollout_totals(your_defender, list(your_attackers), rollouts_per_strategy, rng))
+            accumulator = ScoreAccumulator(self.win_threshold)
+            accumulator.add(scores)
+            accumulators[(your_defender, your_attackers)] = accumulator
+        
+        return accumulators
+    
+    def sample_strategies(self,
+                          strategies: List[Tuple[str, Tuple[str, str]]],
+                          rollouts_per_strategy: int,
+                          mode: str = "monte_carlo") -> Dict[Tuple[str, Tuple[str, str]], StrategySummary]:
+        """Roll out each strategy and summarise its sampled team scores"""
+        return {
+            strategy: accumulator.summary(self.objective.cvar_alpha)
+            for strategy, accumulator in self.accumulate_strategies(strategies, rollouts_per_strategy, mode).items()
+        }
+    
+    def result_from_summaries(self,
+                              summaries: Dict[Tuple[str, Tuple[str, str]], StrategySummary],
+                              num_simulations: int,
+                              start_time: float,
+                              finalists: Optional[List[Tuple[str, Tuple[str, str]]]] = None) -> OptimizationResult:
+        """Pick the best strategy on the objective (from finalists, if given) and its closest rival"""
+        rank = self.objective.value
+        candidates = finalists if finalists is not None else list(summaries)
+        best_key = max(candidates, key=lambda strategy: rank(summaries[strategy]))
+        best_defender, best_attackers = best_key
+        best = summaries[best_key]
+        rivals = [summary for strategy, summary in summaries.items() if strategy != best_key]
+        runner_up = max(rivals, key=rank) if rivals else None
+        best_attackers = list(best_attackers)
+        with self.timed("decision_tree"):
+            decision_tree = self.build_decision_tree(best_attackers)
         
         return OptimizationResult(
             best_defender=best_defender,
             best_attackers=best_attackers,
-            expected_score=best_avg_score,
-            best_case_score=max(best_scores),
-            worst_case_score=min(best_scores),
-            confidence=len(best_scores) / num_simulations,
+            expected_score=best.mean,
+            best_case_score=best.best_case,
+            worst_case_score=best.worst_case,
+            confidence=probability_best(best, runner_up, self.objective),
             decision_tree=decision_tree,
-            simulations_run=len(best_scores),
-            computation_time=computation_time
-        )
\ No newline at end of file
+            simulations_run=best.rollouts,
+            computation_time=time.time() - start_time,
+            confidence_interval=best.interval(),
+            seed=self.seed,
+            timings=dict(self.timings),
+            objective=self.objective.kind,
+            win_probability=best.win_probability,
+            cvar=best.cvar
+        )
+    
+    def optimize_adaptive(self, num_simulations: int, z: float = 2.58) -> OptimizationResult:
+        """Race the strategies with successive halving instead of sampling them evenly.
+        
+        The budget is split over log2(strategies) rounds. After each round any
+        strategy whose upper confidence bound falls below the leader's lower
+        bound is dropped as dominated, then the weaker half of the survivors
+        is dropped, so later rounds spend their rollouts on the close contenders.
+        Bounds and ranking are on the objective.
+        """
+        start_time = time.time()
+        simulator = self.batch_simulator()
+        strategies = self.strategies()
+        accumulators = {strategy: ScoreAccumulator(self.win_threshold) for strategy in strategies}
+        
+        alive = list(strategies)
+        rounds = max(1, math.ceil(math.log2(len(alive))))
+        budget_per_round = num_simulations // rounds
+        
+        strategy_ids = {strategy: i for i, strategy in enumerate(strategies)}
+        
+        for round_index in range(rounds):
+            rollouts = max(32, budget_per_round // len(alive))
+            with self.timed("simulation"):
+                for your_defender, your_attackers in alive:
+                    rng = np.random.default_rng(self.stream_seed(round_index, strategy_ids[(your_defender, your_attackers)]))
+                    scores = simulator.simulate(your_defender, list(your_attackers), rollouts, rng)
+                    accumulators[(your_defender, your_attackers)].add(scores)
+            
+            if len(alive) == 1:
+                continue
+            
+            objective = self.objective
+            summaries = {strategy: accumulators[strategy].summary(objective.cvar_alpha) for strategy in alive}
+            leader_floor = max(objective.interval(summary, z)[0] for summary in summaries.values())
+            alive = [strategy for strategy in alive if objective.interval(summaries[strategy], z)[1] >= leader_floor]
+            alive.sort(key=lambda strategy: objective.value(summaries[strategy]), reverse=True)
+            alive = alive[:max(1, math.ceil(len(alive) / 2))]
+        
+        summaries = {strategy: accumulator.summary(self.objective.cvar_alpha) for strategy, accumulator in accumulators.items()}
+        return self.result_from_summaries(summaries, num_simulations, start_time, finalists=alive)
+    
+    def optimize(self,
+                 num_simulations: int = 10000,
+                 mode: str = "monte_carlo",
+                 opponent_model: str = "uniform") -> OptimizationResult:
+        """Find the best opening by exact solve ("exact") or by sampling ("monte_carlo", "batch", "adaptive")"""
+        self.check_options(mode, opponent_model)
+        if mode == "exact":
+            return self.optimize_exact(opponent_model=opponent_model)
+        if mode == "adaptive":
+            return self.optimize_adaptive(num_simulations)
+        
+        start_time = time.time()
+        strategies = self.strategies()
+        rollouts_per_strategy = max(1, num_simulations // len(strategies))
+        with self.timed("simulation"):
+            summaries = self.sample_strategies(strategies, rollouts_per_strategy, mode)
+        return self.result_from_summaries(summaries, num_simulations, start_time)
@@ -0,0 +1,236 @@
+from typing import AsyncIterator, Dict, List, Optional, Tuple
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+import asyncio
+import os
+import time
+import zlib
+
+from optimizer import (
+    PairingOptimizer, OptimizationResult, ScoreAccumulator, StrategySummary, Objective, Spreads,
+    content_fingerprint, expected_matrices
+)
+from solver import GameTreeSolver
+from sensitivity import row_sensitivity, tipping_distance
+
+# Number of worker processes for optimiser work; defaults to one per core.
+OPTIMIZER_WORKERS = int(os.environ.get("OPTIMIZER_WORKERS", os.cpu_count() or 1))
+
+# One single-process executor per worker, so work for a session can be sent
+# back to the process that holds its cached tables.
+_workers: List[ProcessPoolExecutor] = []
+_in_flight: List[int] = []
+
+def start_pool() -> List[ProcessPoolExecutor]:
+    if not _workers:
+        _workers.extend(ProcessPoolExecutor(max_workers=1) for _ in range(OPTIMIZER_WORKERS))
+        _in_flight[:] = [0] * OPTIMIZER_WORKERS
+    return _workers
+
+def shutdown_pool():
+    for worker in _workers:
+        worker.shutdown(wait=False, cancel_futures=True)
+    _workers.clear()
+    _in_flight.clear()
+
+async def _run_on(index: int, fn, *args):
+    loop = asyncio.get_running_loop()
+    _in_flight[index] += 1
+    try:
+        return await loop.run_in_executor(_workers[index], fn, *args)
+    finally:
+        if index < len(_in_flight):
+            _in_flight[index] -= 1
+
+async def run_in_pool(fn, *args):
+    """Run a picklable function on the least busy worker without blocking the event loop"""
+    start_pool()
+    index = min(range(len(_workers)), key=_in_flight.__getitem__)
+    return await _run_on(index, fn, *args)
+
+async def run_for_session(session_code: str, fn, *args):
+    """run_in_pool, always on the same worker for a session so its cached state is reused"""
+    start_pool()
+    index = zlib.crc32(session_code.encode()) % len(_workers)
+    return await _run_on(index, fn, *args)
+
+MAX_CACHED_SOLVERS = 64
+_session_solvers: "OrderedDict[str, Tuple[str, GameTreeSolver]]" = OrderedDict()
+
+def get_session_solver(session_code: str,
+                       your_team: List[str],
+                       opponent_team: List[str],
+                       matrices: Dict[str, Dict[str, float]]) -> GameTreeSolver:
+    """A session's solver, updated in place when only its matrices have changed"""
+    teams = content_fingerprint({"your_team": your_team, "opponent_team": opponent_team})
+    cached = _session_solvers.get(session_code)
+    if cached and cached[0] == teams:
+        solver = cached[1]
+        solver.update_matrices(matrices)
+    else:
+        solver = GameTreeSolver(your_team, opponent_team, matrices)
+        _session_solvers[session_code] = (teams, solver)
+    _session_solvers.move_to_end(session_code)
+    if len(_session_solvers) > MAX_CACHED_SOLVERS:
+        _session_solvers.popitem(last=False)
+    return solver
+
+def _optimize_whole(your_team: List[str],
+                    opponent_team: List[str],
+                    matrices: Dict[str, Dict[str, float]],
+                    num_simulations: int,
+                    mode: str,
+                    seed: Optional[int],
+                    opponent_model: str,
+                    spreads: Optional[Spreads] = None,
+                    objective: Objective = Objective()) -> OptimizationResult:
+    optimizer = PairingOptimizer(your_team, opponent_team, matrices, seed, spreads, objective)
+    return optimizer.optimize(num_simulations, mode, opponent_model)
+
+def _optimize_session_exact(session_code: str,
+                            your_team: List[str],
+                            opponent_team: List[str],
+                            matrices: Dict[str, Dict[str, float]],
+                            seed: Optional[int],
+                            opponent_model: str,
+                            spreads: Optional[Spreads] = None) -> OptimizationResult:
+    optimizer = PairingOptimizer(your_team, opponent_team, matrices, seed, spreads)
+    optimizer.check_team_sizes()
+    solver = get_session_solver(session_code, your_team, opponent_team, expected_matrices(matrices, spreads))
+    return optimizer.optimize_exact(solver, opponent_model)
+
+def _sample_strategies(your_team: List[str],
+                       opponent_team: List[str],
+                       matrices: Dict[str, Dict[str, float]],
+                       strategies: List[Tuple[str, Tuple[str, str]]],
+                       rollouts_per_strategy: int,
+                       mode: str,
+                       seed: int,
+                       spreads: Optional[Spreads] = None,
+                       objective: Objective = Objective()) -> Dict[Tuple[str, Tuple[str, str]], StrategySummary]:
+    optimizer = PairingOptimizer(your_team, opponent_team, matrices, seed, spreads, objective)
+    return optimizer.sample_strategies(strategies, rollouts_per_strategy, mode)
+
+def _accumulate_strategies(your_team: List[str],
+                           opponent_team: List[str],
+                           matrices: Dict[str, Dict[str, float]],
+                           strategies: List[Tuple[str, Tuple[str, str]]],
+                           rollouts_per_strategy: int,
+                           mode: str,
+                           seed: int,
+                           slice_index: int,
+                           spreads: Optional[Spreads] = None,
+                           objective: Objective = Objective()) -> Dict[Tuple[str, Tuple[str, str]], ScoreAccumulator]:
+    optimizer = PairingOptimizer(your_team, opponent_team, matrices, seed, spreads, objective)
+    return optimizer.accumulate_strategies(strategies, rollouts_per_strategy, mode, slice_index)
+
+async def optimize_in_pool(your_team: List[str],
+                           opponent_team: List[str],
+                           matrices: Dict[str, Dict[str, float]],
+                           num_simulations: int = 10000,
+                           mode: str = "monte_carlo",
+                           session_code: Optional[str] = None,
+                           seed: Optional[int] = None,
+                           opponent_model: str = "uniform",
+                           spreads: Optional[Spreads] = None,
+                           objective: Objective = Objective()) -> OptimizationResult:
+    """PairingOptimizer.optimize with the strategies split across the worker pool.
+    
+    Exact solves for a session run on that session's worker and keep their
+    subgame tables, so after a matrix edit only the edited player's subgames
+    are solved again. Sampled estimates depend on every row and are not kept.
+    Results depend only on the inputs and seed, not on the number of workers.
+    """
+    optimizer = PairingOptimizer(your_team, opponent_team, matrices, seed, spreads, objective)
+    optimizer.check_options(mode, opponent_model)
+    if mode == "exact" and session_code is not None:
+        return await run_for_session(session_code, _optimize_session_exact,
+                                     session_code, your_team, opponent_team, matrices, seed, opponent_model, spreads)
+    if mode in ("exact", "adaptive"):
+        # Exact solves are fast and adaptive rounds depend on each other, so neither is split.
+        return await run_in_pool(_optimize_whole, your_team, opponent_team, matrices,
+                                 num_simulations, mode, seed, opponent_model, spreads, objective)
+
+    start_time = time.time()
+    strategies = optimizer.strategies()
+    rollouts_per_strategy = max(1, num_simulations // len(strategies))
+
+    chunk_count = min(OPTIMIZER_WORKERS, len(strategies))
+    chunks = [strategies[i::chunk_count] for i in range(chunk_count)]
+    with optimizer.timed("simulation"):
+        partials = await asyncio.gather(*[
+            run_in_pool(_sample_strategies, your_team, opponent_team, matrices,
+                        chunk, rollouts_per_strategy, mode, optimizer.seed, spreads, objective)
+            for chunk in chunks
+        ])
+
+    summaries = {}
+    for partial in partials:
+        summaries.update(partial)
+    return optimizer.result_from_summaries(summaries, num_simulations, start_time)
+
+async def optimize_anytime_in_pool(your_team: List[str],
+                                   opponent_team: List[str],
+                                   matrices: Dict[str, Dict[str, float]],
+                                   num_simulations: int = 10000,
+                                   mode: str = "batch",
+                                   updates: int = 20,
+                                   seed: Optional[int] = None,
+                                   spreads: Optional[Spreads] = None,
+                                   objective: Objective = Objective()) -> AsyncIterator[OptimizationResult]:
+    """optimize_in_pool in equal slices, yielding the best strategy so far after each one.
+    
+    Every slice rolls out every strategy, so each yielded result is an
+    unbiased estimate; the last one uses the full budget.
+    """
+    start_time = time.time()
+    optimizer = PairingOptimizer(your_team, opponent_team, matrices, seed, spreads, objective)
+    strategies = optimizer.strategies()
+    rollouts_per_strategy = max(1, num_simulations // len(strategies))
+    updates = max(1, min(updates, rollouts_per_strategy))
+    
+    chunk_count = min(OPTIMIZER_WORKERS, len(strategies))
+    chunks = [strategies[i::chunk_count] for i in range(chunk_count)]
+    accumulators = {strategy: ScoreAccumulator(optimizer.win_threshold) for strategy in strategies}
+    
+    for update in range(updates):
+        rollouts = rollouts_per_strategy * (update + 1) // updates - rollouts_per_strategy * update // updates
+        with optimizer.timed("simulation"):
+            partials = await asyncio.gather(*[
+                run_in_pool(_accumulate_strategies, your_team, opponent_team, matrices,
+                            chunk, rollouts, mode, optimizer.seed, update, spreads, objective)
+                for chunk in chunks
+            ])
+        for partial in partials:
+            for strategy, accumulator in partial.items():
+                accumulators[strategy].merge(accumulator)
+        
+        summaries = {strategy: accumulator.summary(objective.cvar_alpha) for strategy, accumulator in accumulators.items()}
+        yield optimizer.result_from_summaries(summaries, num_simulations, start_time)
+
+async def sensitivity_in_pool(your_team: List[str],
+                              opponent_team: List[str],
+                              matrices: Dict[str, Dict[str, float]],
+                              opponent_model: str = "uniform") -> Dict:
+    """Tipping points for every cell of the matrix, one worker task per row of our team.
+    
+    Cells come back most sensitive first, i.e. ordered by how little their
+    score has to move before the recommended opening changes.
+    """
+    PairingOptimizer(your_team, opponent_team, matrices).check_team_sizes()
+    start_time = time.time()
+    rows = await asyncio.gather(*(
+        run_in_pool(row_sensitivity, your_team, opponent_team, matrices, row, opponent_model)
+        for row in range(len(your_team))
+    ))
+    # Every row solved the unperturbed matrices first, so the base comes from there, not the event loop
+    (defender, attackers), value = rows[0]["strategy"], rows[0]["value"]
+    cells = sorted((cell for row in rows for cell in row["cells"]), key=tipping_distance)
+    return {
+        "best_defender": your_team[defender],
+        "best_attackers": [your_team[a] for a in attackers],
+        "expected_score": value,
+        "opponent_model": opponent_model,
+        "cells": cells,
+        "computation_time": time.time() - start_time
+    }
@@ -0,0 +1,146 @@
+from typing import Dict, List, Set, Tuple
+from itertools import combinations
+import time
+from solver import bits
+from recommender import SubgameEvaluator, get_session_evaluator
+
+# A playbook holds, for every pairing state reachable while we follow its
+# advice, the value of each option of each decision /recommend would be asked
+# about there. States are keyed "your_mask:opp_mask" over the team lists'
+# indices; option values are listed in ascending index order so a client can
+# regenerate the labels (see frontend/src/playbook.js) instead of storing them.
+#
+#   value      expected total of the pairings still to be made
+#   defenders  one value per player in bits(your_mask)
+#   defender   the recommended defender, an index into your_team
+#   attackers  per opponent defender in bits(opp_mask), one value per pair
+#              in combinations(bits(your_mask) minus our defender, r)
+#   takes      per opponent defender, per attacker of the pair recommended
+#              for that row (in pair order) that their defender took, one
+#              value per opponent in bits(opp_mask) minus their defender:
+#              our defender taking them when they are among those offered
+#
+# r is 2, or 1 when only one attacker is left to offer. Once we deviate from
+# the recommended defender the state is off the book and /recommend answers.
+#
+# The book is built one exchange round at a time. It stops before a round
+# that would take it past max_states, and drops a round still unfinished
+# when time_budget runs out, so the book is always whole rounds. "depth"
+# counts the levels of states held, "complete" says whether they reach the
+# last pairing and "timed_out" whether the time budget cut it short.
+#
+# Rounds below the first get expensive fast: a second round costs ~4 s at 8
+# players and ~25 s at 10, and the full 5000-state book at 10 players took
+# ~155 s and ~3 MB. Within the budget, 8- and 10-player teams usually get
+# the opening round only and /recommend answers the rest.
+
+PLAYBOOK_DECIMALS = 2
+PLAYBOOK_MAX_STATES = 5000
+# Seconds of building after the opening round, which is always included
+PLAYBOOK_TIME_BUDGET = 2.0
+
+def state_key(your_mask: int, opp_mask: int) -> str:
+    return f"{your_mask}:{opp_mask}"
+
+def attacker_count(pool_size: int) -> int:
+    return min(2, pool_size - 1)
+
+def rounded(values: List[float]) -> List[float]:
+    return [round(value, PLAYBOOK_DECIMALS) for value in values]
+
+def build_playbook(evaluator: SubgameEvaluator, your_remaining: List[str], opp_remaining: List[str],
+                   max_states: int = PLAYBOOK_MAX_STATES, time_budget: float = PLAYBOOK_TIME_BUDGET) -> Dict:
+    """Every contingency from the given pools down to the last pairing, or as many rounds as fit"""
+    root = (evaluator.your_mask(your_remaining), evaluator.opponent_mask(opp_remaining))
+    states: Dict[str, Dict] = {}
+    level = [root]
+    depth = 0
+    timed_out = False
+    deadline = None
+    while level and len(states) + len(level) <= max_states:
+        next_level: Set[Tuple[int, int]] = set()
+        round_states = {}
+        for your_mask, opp_mask in level:
+            if deadline is not None and time.perf_counter() > deadline:
+                timed_out = True
+                break
+            round_states[state_key(your_mask, opp_mask)] = playbook_state(evaluator, your_mask, opp_mask, next_level)
+        if timed_out:
+            break
+        states.update(round_states)
+        level = sorted(next_level)
+        depth += 1
+        if deadline is None:
+            deadline = time.perf_counter() + time_budget
+
+    return {
+        "your_team": evaluator.your_team,
+        "opponent_team": evaluator.opponent_team,
+        "opponent_model": evaluator.opponent_model,
+        "root": state_key(*root),
+        "depth": depth,
+        "complete": not level,
+        "timed_out": timed_out,
+        "states": states,
+    }
+
+def playbook_state(evaluator: SubgameEvaluator, your_mask: int, opp_mask: int,
+                   successors: Set[Tuple[int, int]]) -> Dict:
+    """One state's entry; adds the states our advice can lead to into successors"""
+    your_team = evaluator.your_team
+    opponent_team = evaluator.opponent_team
+    yours = bits(your_mask)
+    theirs = bits(opp_mask)
+    if len(yours) < 2:
+        return {"value": round(evaluator.value(your_mask, opp_mask), PLAYBOOK_DECIMALS)}
+
+    your_names = [your_team[y] for y in yours]
+    their_names = [opponent_team[o] for o in theirs]
+    defender_values = evaluator.defender_options(your_names, their_names)
+    defender = max(yours, key=lambda y: defender_values[your_team[y]])
+    r = attacker_count(len(yours))
+
+    attackers = []
+    takes = []
+    pairs = list(combinations([y for y in yours if y != defender], r))
+    for opp_defender in theirs:
+        options = evaluator.attacker_options(your_names, their_names,
+                                             your_team[defender], opponent_team[opp_defender])
+        row = rounded([options[tuple(your_team[a] for a in pair)] for pair in pairs])
+        attackers.append(row)
+        # The pair a client reading the book is told to send, ties going to the first
+        sent = pairs[row.index(max(row))]
+        sent_names = [your_team[a] for a in sent]
+        offerable = [o for o in theirs if o != opp_defender]
+        offerable_names = [opponent_team[o] for o in offerable]
+        # Taking an attacker is worth the same whichever pair it was offered
+        # in, so one value per opponent stands in for every offer.
+        row_takes = []
+        for taken_by_them in sent:
+            values = evaluator.matchup_options(your_names, their_names, your_team[defender], offerable_names,
+                                               opponent_team[opp_defender], sent_names, your_team[taken_by_them])
+            take_values = [values[name] for name in offerable_names]
+            row_takes.append(rounded(take_values))
+            # Ours takes its pick of whatever they offer
+            for offered in combinations(range(len(offerable)), r):
+                taken = offerable[max(offered, key=take_values.__getitem__)]
+                successors.add((your_mask & ~(1 << defender) & ~(1 << taken_by_them),
+                                opp_mask & ~(1 << opp_defender) & ~(1 << taken)))
+        takes.append(row_takes)
+
+    return {
+        "value": round(defender_values[your_team[defender]], PLAYBOOK_DECIMALS),
+        "defenders": rounded([defender_values[name] for name in your_names]),
+        "defender": defender,
+        "attackers": attackers,
+        "takes": takes,
+    }
+
+def session_playbook(session_code: str,
+                     your_team: List[str],
+                     opponent_team: List[str],
+                     matrices: Dict[str, Dict[str, float]],
+                     opponent_model: str = "uniform") -> Dict:
+    """Full playbook for a session's pairing; runs inside the worker pool"""
+    evaluator = get_session_evaluator(session_code, your_team, opponent_team, matrices, opponent_model)
+    return build_playbook(evaluator, your_team, opponent_team)
@@ -0,0 +1,289 @@
+from typing import Dict, List, Optional, Tuple
+from collections import OrderedDict
+from itertools import combinations
+import numpy as np
+from solver import bits, random_play_value, MAX_EXACT_SUBGAME
+from optimizer import content_fingerprint
+from opponent_models import respond, second_best, solve_matrix_game
+
+class SubgameEvaluator:
+    """Values of the live pairing subgames, cached per (your_remaining, opp_remaining) bitmask.
+
+    Each round both sides reveal a defender and offer up to two attackers,
+    each defender picks one attacker and the refused attackers go back into
+    the pool. Our decisions are maximised and the opponent's follow
+    opponent_model (see opponent_models; uniformly random by default), so a
+    state's value is the total score we can expect from the pairings still
+    to be made. The decision being asked about is always
+    searched; subgames below it with more than max_exact_subgame players per
+    side are estimated with random_play_value.
+
+    This is not the game GameTreeSolver solves for /optimize: there the
+    refused attackers play each other and the attackers are committed with
+    the defender, before the opponent's defender is seen. The two can value
+    and rank the same opening differently.
+    """
+
+    def __init__(self,
+                 your_team: List[str],
+                 opponent_team: List[str],
+                 matrices: Dict[str, Dict[str, float]],
+                 max_entries: int = 65536,
+                 max_exact_subgame: int = MAX_EXACT_SUBGAME,
+                 opponent_model: str = "uniform"):
+        self.your_team = your_team
+        self.opponent_team = opponent_team
+        self.your_index = {name: i for i, name in enumerate(your_team)}
+        self.opponent_index = {name: i for i, name in enumerate(opponent_team)}
+        self.scores = [
+            [matrices.get(y, {}).get(o, 10.0) for o in opponent_team]
+            for y in your_team
+        ]
+        self.max_entries = max_entries
+        self.max_exact_subgame = max_exact_subgame
+        self.opponent_model = opponent_model
+        self._table: "OrderedDict[Tuple[int, int], float]" = OrderedDict()
+        # Per-option breakdowns behind the values in _table, so asking about a
+        # state that was already valued as a subgame does not search it again
+        self._defender_table: "OrderedDict[Tuple[int, int, int], float]" = OrderedDict()
+        self._attackers_table: "OrderedDict[Tuple, float]" = OrderedDict()
+
+    def your_mask(self, names: List[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= 1 << self.your_index[name]
+        return mask
+
+    def opponent_mask(self, names: List[str]) -> int:
+        mask = 0
+        for name in names:
+            mask |= 1 << self.opponent_index[name]
+        return mask
+
+    def value(self, your_mask: int, opp_mask: int) -> float:
+        key = (your_mask, opp_mask)
+        table = self._table
+        if key in table:
+            table.move_to_end(key)
+            return table[key]
+
+        yours = bits(your_mask)
+        theirs = bits(opp_mask)
+        if not yours or not theirs:
+            result = 0.0
+        elif len(yours) == 1 and len(theirs) == 1:
+            result = self.scores[yours[0]][theirs[0]]
+        elif len(yours) > self.max_exact_subgame:
+            result = random_play_value(self.scores, yours, theirs)
+        elif self.opponent_model == "nash":
+            result = solve_matrix_game(self._defender_matrix(your_mask, opp_mask))[0]
+        else:
+            result = max(
+                self._defender_value(your_mask, opp_mask, defender)
+                for defender in yours
+            )
+
+        return self._remember(table, key, result)
+
+    def _remember(self, table: OrderedDict, key: Tuple, result: float) -> float:
+        table[key] = result
+        if len(table) > self.max_entries:
+            table.popitem(last=False)
+        return result
+
+    def _exchange_payoff(self, your_mask: int, opp_mask: int,
+                         defender: int, attackers: Tuple[int, ...],
+                         opp_defender: int, opp_attackers: Tuple[int, ...]) -> List[List[float]]:
+        """payoff[j][i]: our defender takes their attacker j, theirs takes our attacker i"""
+        s = self.scores
+        base_yours = your_mask & ~(1 << defender)
+        base_opp = opp_mask & ~(1 << opp_defender)
+        return [
+            [
+                s[attacker][opp_defender] + s[defender][opp_attacker]
+                + self.value(base_yours & ~(1 << attacker), base_opp & ~(1 << opp_attacker))
+                for attacker in attackers
+            ]
+            for opp_attacker in opp_attackers
+        ]
+
+    def _exchange_value(self, your_mask: int, opp_mask: int,
+                        defender: int, attackers: Tuple[int, ...],
+                        opp_defender: int, opp_attackers: Tuple[int, ...]) -> float:
+        """Value once both defenders and both attacker sets are on the table"""
+        s = self.scores
+        payoff = self._exchange_payoff(your_mask, opp_mask, defender, attackers, opp_defender, opp_attackers)
+        if self.opponent_model == "nash":
+            return solve_matrix_game(np.array(payoff))[0]
+        # Otherwise the opponent's defender picks one of our attackers and ours answers.
+        return respond(self.opponent_model,
+                       [max(row[i] for row in payoff) for i in range(len(attackers))],
+                       [s[attacker][opp_defender] for attacker in attackers])
+
+    def _opp_attacker_options(self, opp_mask: int, opp_defender: int) -> List[Tuple[int, ...]]:
+        opp_pool = bits(opp_mask & ~(1 << opp_defender))
+        return list(combinations(opp_pool, min(2, len(opp_pool))))
+
+    def _attackers_value(self, your_mask: int, opp_mask: int,
+                         defender: int, attackers: Tuple[int, ...], opp_defender: int) -> float:
+        key = (your_mask, opp_mask, defender, attackers, opp_defender)
+        if key in self._attackers_table:
+            return self._attackers_table[key]
+        opp_options = self._opp_attacker_options(opp_mask, opp_defender)
+        return self._remember(self._attackers_table, key, respond(self.opponent_model, [
+            self._exchange_value(your_mask, opp_mask, defender, attackers, opp_defender, opp_attackers)
+            for opp_attackers in opp_options
+        ], [max(self.scores[defender][o] for o in opp_attackers) for opp_attackers in opp_options]))
+
+    def _defender_value(self, your_mask: int, opp_mask: int, defender: int) -> float:
+        key = (your_mask, opp_mask, defender)
+        if key in self._defender_table:
+            return self._defender_table[key]
+        pool = bits(your_mask & ~(1 << defender))
+        theirs = bits(opp_mask)
+        return self._remember(self._defender_table, key, respond(self.opponent_model, [
+            max(
+                self._attackers_value(your_mask, opp_mask, defender, attackers, opp_defender)
+                for attackers in combinations(pool, min(2, len(pool)))
+            )
+            for opp_defender in theirs
+        ], [second_best([self.scores[y][o] for y in pool]) for o in theirs]))
+
+    def _attackers_matrix(self, your_mask: int, opp_mask: int, defender: int, opp_defender: int) -> np.ndarray:
+        """Nash model: exchange values of our attacker options (rows) against theirs (columns)"""
+        pool = bits(your_mask & ~(1 << defender))
+        return np.array([
+            [
+                self._exchange_value(your_mask, opp_mask, defender, attackers, opp_defender, opp_attackers)
+                for opp_attackers in self._opp_attacker_options(opp_mask, opp_defender)
+            ]
+            for attackers in combinations(pool, min(2, len(pool)))
+        ])
+
+    def _defender_matrix(self, your_mask: int, opp_mask: int) -> np.ndarray:
+        """Nash model: attacker-game values of our defenders (rows) against theirs (columns)"""
+        return np.array([
+            [
+                solve_matrix_game(self._attackers_matrix(your_mask, opp_mask, defender, opp_defender))[0]
+                for opp_defender in bits(opp_mask)
+            ]
+            for defender in bits(your_mask)
+        ])
+
+    def defender_options(self, your_remaining: List[str], opp_remaining: List[str]) -> Dict[str, float]:
+        your_mask = self.your_mask(your_remaining)
+        opp_mask = self.opponent_mask(opp_remaining)
+        if len(your_remaining) < 2 or len(opp_remaining) < 2:
+            # The last pairing is forced, so every choice is worth the same
+            value = self.value(your_mask, opp_mask)
+            return {name: value for name in your_remaining}
+        if self.opponent_model == "nash":
+            # Each defender's value against the opponent's equilibrium mix of defenders
+            matrix = self._defender_matrix(your_mask, opp_mask)
+            mix = solve_matrix_game(matrix)[2]
+            values = matrix @ mix
+            return {self.your_team[d]: float(values[r]) for r, d in enumerate(bits(your_mask))}
+        return {
+            name: self._defender_value(your_mask, opp_mask, self.your_index[name])
+            for name in your_remaining
+        }
+
+    def attacker_options(self, your_remaining: List[str], opp_remaining: List[str],
+                         your_defender: str, opponent_defender: str) -> Dict[Tuple[str, ...], float]:
+        your_mask = self.your_mask(your_remaining)
+        opp_mask = self.opponent_mask(opp_remaining)
+        defender = self.your_index[your_defender]
+        opp_defender = self.opponent_index[opponent_defender]
+        # In roster order, as _attackers_matrix lays out its rows
+        pool = bits(your_mask & ~(1 << defender))
+        options = list(combinations(pool, min(2, len(pool))))
+        names = [tuple(self.your_team[a] for a in attackers) for attackers in options]
+        if not pool or len(opp_remaining) < 2:
+            return {names[0]: self.value(your_mask, opp_mask)}
+        if self.opponent_model == "nash":
+            matrix = self._attackers_matrix(your_mask, opp_mask, defender, opp_defender)
+            values = matrix @ solve_matrix_game(matrix)[2]
+            return {pair: float(value) for pair, value in zip(names, values)}
+        return {
+            pair: self._attackers_value(your_mask, opp_mask, defender, attackers, opp_defender)
+            for pair, attackers in zip(names, options)
+        }
+
+    def matchup_options(self, your_remaining: List[str], opp_remaining: List[str],
+                        your_defender: str, opponent_attackers: List[str],
+                        opponent_defender: str, your_attackers: List[str],
+                        your_attacker_taken: Optional[str] = None) -> Dict[str, float]:
+        """Value of our defender taking each attacker offered, within the exchange _exchange_value models.
+
+        Once we know which of our attackers their defender took, each option
+        is that cell of the exchange payoff, so the best of them is what the
+        exchange is worth. Before then, nash weighs the options by their
+        defender's equilibrium mix and the other models by respond().
+        """
+        your_mask = self.your_mask(your_remaining)
+        opp_mask = self.opponent_mask(opp_remaining)
+        defender = self.your_index[your_defender]
+        opp_defender = self.opponent_index[opponent_defender]
+        attackers = tuple(self.your_index[name] for name in your_attackers)
+        offered = tuple(self.opponent_index[name] for name in opponent_attackers)
+        payoff = self._exchange_payoff(your_mask, opp_mask, defender, attackers, opp_defender, offered)
+        if your_attacker_taken is not None:
+            column = your_attackers.index(your_attacker_taken)
+            values = [row[column] for row in payoff]
+        elif self.opponent_model == "nash":
+            values = list(np.array(payoff) @ solve_matrix_game(np.array(payoff))[2])
+        else:
+            myopic = [self.scores[attacker][opp_defender] for attacker in attackers]
+            values = [respond(self.opponent_model, row, myopic) for row in payoff]
+        return {name: float(value) for name, value in zip(opponent_attackers, values)}
+
+MAX_CACHED_SESSIONS = 64
+_session_evaluators: "OrderedDict[str, Tuple[str, SubgameEvaluator]]" = OrderedDict()
+
+def get_session_evaluator(session_code: str,
+                          your_team: List[str],
+                          opponent_team: List[str],
+                          matrices: Dict[str, Dict[str, float]],
+                          opponent_model: str = "uniform") -> SubgameEvaluator:
+    """Reuse a session's value table for as long as its teams and matrices are unchanged"""
+    fingerprint = content_fingerprint({
+        "your_team": your_team,
+        "opponent_team": opponent_team,
+        "matrices": matrices
+    })
+    key = f"{session_code}:{opponent_model}"
+    cached = _session_evaluators.get(key)
+    if cached and cached[0] == fingerprint:
+        _session_evaluators.move_to_end(key)
+        return cached[1]
+
+    evaluator = SubgameEvaluator(your_team, opponent_team, matrices, opponent_model=opponent_model)
+    _session_evaluators[key] = (fingerprint, evaluator)
+    _session_evaluators.move_to_end(key)
+    if len(_session_evaluators) > MAX_CACHED_SESSIONS:
+        _session_evaluators.popitem(last=False)
+    return evaluator
+
+def recommend_options(session_code: str,
+                      your_team: List[str],
+                      opponent_team: List[str],
+                      matrices: Dict[str, Dict[str, float]],
+                      decision_type: str,
+                      unpaired_your_team: List[str],
+                      unpaired_opponent_team: List[str],
+                      your_defender: Optional[str] = None,
+                      opponent_defender: Optional[str] = None,
+                      opponent_attackers: Optional[List[str]] = None,
+                      opponent_model: str = "uniform",
+                      your_attackers: Optional[List[str]] = None,
+                      your_attacker_taken: Optional[str] = None) -> Dict:
+    """Value every option for one pairing decision; runs inside the worker pool"""
+    evaluator = get_session_evaluator(session_code, your_team, opponent_team, matrices, opponent_model)
+    if decision_type == "pick_defender":
+        return evaluator.defender_options(unpaired_your_team, unpaired_opponent_team)
+    if decision_type == "pick_attackers":
+        return evaluator.attacker_options(unpaired_your_team, unpaired_opponent_team,
+                                          your_defender, opponent_defender)
+    return evaluator.matchup_options(unpaired_your_team, unpaired_opponent_team,
+                                     your_defender, opponent_attackers,
+                                     opponent_defender, your_attackers, your_attacker_taken)
@@ -1,4 +1,4 @@
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, Field, model_validator
 from typing import List, Dict, Optional
 
 class PlayerCreate(BaseModel):
@@ -39,6 +39,12 @@ class TournamentResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class TournamentSummary(BaseModel):
+    id: int
+    name: str
+    team_count: int
+    player_count: int
+
 class SessionCreate(BaseModel):
     tournament_id: int
     your_team_id: int
@@ -58,12 +64,58 @@ class SessionResponse(BaseModel):
     class Config:
         from_attributes = True
 
+class ScoreRange(BaseModel):
+    min: float
+    max: float
+
+def check_spread(player_name: str, matrix: Dict[str, float], spread: Dict[str, ScoreRange]):
+    for opponent, score_range in spread.items():
+        if opponent not in matrix:
+            raise ValueError(f"{player_name} has a range for {opponent} but no likely score")
+        if not score_range.min <= matrix[opponent] <= score_range.max:
+            raise ValueError(f"{player_name} vs {opponent}: the range must satisfy min <= likely score <= max")
+
 class MatrixInput(BaseModel):
     player_name: str
     matrix: Dict[str, float] = Field(
         ..., 
         description="Dict mapping opponent names to predicted scores (0-20)"
     )
+    spread: Optional[Dict[str, ScoreRange]] = Field(
+        None,
+        description="Optional min/max range around the predicted score, per opponent"
+    )
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        check_spread(self.player_name, self.matrix, self.spread or {})
+        return self
+
+class BulkMatrixInput(BaseModel):
+    matrices: Dict[str, Dict[str, float]] = Field(
+        ...,
+        description="Dict mapping each player's name to their opponent -> predicted score dict"
+    )
+    spreads: Optional[Dict[str, Dict[str, ScoreRange]]] = Field(
+        None,
+        description="Optional min/max ranges, keyed like matrices"
+    )
+
+    @model_validator(mode="after")
+    def check_ranges(self):
+        for player_name, spread in (self.spreads or {}).items():
+            if player_name not in self.matrices:
+                raise ValueError(f"{player_name} has ranges but no predictions")
+            check_spread(player_name, self.matrices[player_name], spread)
+        return self
+
+class GameResultInput(BaseModel):
+    player: str
+    opponent: str
+    score: float = Field(..., ge=0, le=20, description="The score the player actually got (0-20)")
+
+class ResultsInput(BaseModel):
+    results: List[GameResultInput]
 
 from typing import Literal
 
@@ -73,4 +125,8 @@ class RecommendationRequest(BaseModel):
     unpaired_opponent_team: List[str]
     opponent_defender: Optional[str] = None
     opponent_attackers: Optional[List[str]] = None
-    your_defender: Optional[str] = None
\ No newline at end of file
+    your_defender: Optional[str] = None
+    opponent_model: Literal["uniform", "greedy", "minimax", "nash"] = "uniform"
+    # pick_defender_matchup: the attackers we sent, and the one their defender took once known
+    your_attackers: Optional[List[str]] = None
+    your_attacker_taken: Optional[str] = None
\ No newline at end of file
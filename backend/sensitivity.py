@@ -0,0 +1,118 @@
+from typing import Dict, List, Optional, Tuple
+from solver import GameTreeSolver, MODEL_OUTLOOKS
+
+# How far each prediction can move before the recommended opening changes.
+#
+# Every cell is swept across the score range in SENSITIVITY_STEP steps,
+# outwards from its current value in both directions; the first step that
+# changes the best (defender, attackers) is bisected down to
+# TIPPING_PRECISION. Another opening that is best only within a window
+# narrower than a step can fall between two tried scores and be missed, so
+# a reported tipping point is the first change the sweep finds, not
+# necessarily the nearest one. A sweep only ever changes one of our players' rows, so
+# each row runs as one task whose solver keeps every subgame without that
+# player (see GameTreeSolver.update_matrices) across all its perturbations.
+
+SCORE_RANGE = (0.0, 20.0)
+SENSITIVITY_STEP = 2.5
+TIPPING_PRECISION = 0.05
+# Half-width of the finite difference for the expected score's slope
+SLOPE_DELTA = 0.5
+
+Strategy = Tuple[int, Tuple[int, int]]
+
+def best_strategy(solver: GameTreeSolver, outlook: str) -> Tuple[Strategy, float]:
+    """The opening optimize_exact would recommend, with its value"""
+    values = solver.solve((outlook,))
+    strategy = max(values, key=lambda key: values[key][outlook])
+    return strategy, values[strategy][outlook]
+
+class RowProbe:
+    """Best opening as one cell of a row varies, memoised per tried score"""
+
+    def __init__(self, solver: GameTreeSolver, matrices: Dict[str, Dict[str, float]], row: int, outlook: str):
+        self.solver = solver
+        self.matrices = matrices
+        self.player = solver.your_team[row]
+        self.base_row = dict(matrices.get(self.player, {}))
+        self.outlook = outlook
+        self._results: Dict[Tuple[str, float], Tuple[Strategy, float]] = {}
+
+    def at(self, opponent: str, score: float) -> Tuple[Strategy, float]:
+        key = (opponent, score)
+        if key not in self._results:
+            self.solver.update_matrices({**self.matrices, self.player: {**self.base_row, opponent: score}})
+            self._results[key] = best_strategy(self.solver, self.outlook)
+        return self._results[key]
+
+    def tipping_point(self, opponent: str, score: float, base: Strategy, direction: int) -> Optional[Tuple[float, Strategy]]:
+        """First score found beyond which the best opening is no longer base, moving in direction.
+
+        Changes that revert within one SENSITIVITY_STEP can be stepped over.
+        """
+        limit = SCORE_RANGE[1] if direction > 0 else SCORE_RANGE[0]
+        inside = min(max(score, SCORE_RANGE[0]), SCORE_RANGE[1])
+        while inside != limit:
+            outside = min(inside + SENSITIVITY_STEP, limit) if direction > 0 else max(inside - SENSITIVITY_STEP, limit)
+            if self.at(opponent, outside)[0] != base:
+                while abs(outside - inside) > TIPPING_PRECISION:
+                    middle = (inside + outside) / 2
+                    if self.at(opponent, middle)[0] == base:
+                        inside = middle
+                    else:
+                        outside = middle
+                return (inside + outside) / 2, self.at(opponent, outside)[0]
+            inside = outside
+        return None
+
+    def slope(self, opponent: str, score: float) -> float:
+        low = max(SCORE_RANGE[0], score - SLOPE_DELTA)
+        high = min(SCORE_RANGE[1], score + SLOPE_DELTA)
+        if high == low:
+            return 0.0
+        return (self.at(opponent, high)[1] - self.at(opponent, low)[1]) / (high - low)
+
+def row_sensitivity(your_team: List[str],
+                    opponent_team: List[str],
+                    matrices: Dict[str, Dict[str, float]],
+                    row: int,
+                    opponent_model: str = "uniform") -> Dict:
+    """Tipping points and slopes for every cell of one of our players' rows; runs inside the worker pool.
+
+    Also returns the unperturbed best opening and its value, which every
+    row computes anyway.
+    """
+    outlook = MODEL_OUTLOOKS[opponent_model]
+    solver = GameTreeSolver(your_team, opponent_team, matrices)
+    base, value = best_strategy(solver, outlook)
+    probe = RowProbe(solver, matrices, row, outlook)
+
+    def named(strategy: Strategy) -> Dict:
+        defender, attackers = strategy
+        return {"defender": your_team[defender], "attackers": [your_team[a] for a in attackers]}
+
+    cells = []
+    for opponent in opponent_team:
+        score = probe.base_row.get(opponent, 10.0)
+        lower = probe.tipping_point(opponent, score, base, -1)
+        upper = probe.tipping_point(opponent, score, base, 1)
+        cells.append({
+            "your_player": probe.player,
+            "opponent_player": opponent,
+            "score": score,
+            "slope": probe.slope(opponent, score),
+            "lower_tipping_point": None if lower is None else lower[0],
+            "below_recommendation": None if lower is None else named(lower[1]),
+            "upper_tipping_point": None if upper is None else upper[0],
+            "above_recommendation": None if upper is None else named(upper[1]),
+        })
+    return {"strategy": base, "value": value, "cells": cells}
+
+def tipping_distance(cell: Dict) -> float:
+    """How far the cell's score is from changing the recommendation"""
+    distances = [
+        abs(cell["score"] - cell[key])
+        for key in ("lower_tipping_point", "upper_tipping_point")
+        if cell[key] is not None
+    ]
+    return min(distances, default=float("inf"))
@@ -0,0 +1,382 @@
+from typing import Dict, List, Optional, Sequence, Tuple
+from itertools import combinations
+import numpy as np
+
+from opponent_models import respond, second_best, solve_2x2, solve_matrix_game
+
+AGGREGATORS = {
+    "expected": lambda values: sum(values) / len(values),
+    "worst": min,
+    "best": max,
+}
+# "greedy" and "nash" value the opponent by an opponent model rather than a plain aggregate
+OUTLOOKS = ("expected", "worst", "best", "greedy", "nash")
+MODEL_OUTLOOKS = {"uniform": "expected", "minimax": "worst", "greedy": "greedy", "nash": "nash"}
+
+# Subgames with more players per side than this are estimated instead of
+# searched, which keeps 8- and 10-player teams interactive.
+MAX_EXACT_SUBGAME = 4
+
+def searched_exactly(team_size: int, max_exact_subgame: int = MAX_EXACT_SUBGAME) -> bool:
+    """Whether GameTreeSolver searches every exchange of a team_size pairing, none estimated"""
+    return team_size - 3 <= max_exact_subgame
+
+def random_play_value(scores: List[List[float]], yours: List[int], theirs: List[int]) -> float:
+    """Expected total of the remaining pairings if both sides pick at random.
+
+    Uniform play makes every one-to-one matching equally likely, so this is
+    the pool size times the mean of the remaining block of the matrix.
+    """
+    return sum(scores[y][o] for y in yours for o in theirs) / len(theirs)
+
+def bits(mask: int) -> List[int]:
+    """Indices of the set bits in a pool mask"""
+    indices = []
+    while mask:
+        low = mask & -mask
+        indices.append(low.bit_length() - 1)
+        mask ^= low
+    return indices
+
+def trio_mask(defender: int, attackers: Tuple[int, int]) -> int:
+    return (1 << defender) | (1 << attackers[0]) | (1 << attackers[1])
+
+class GameTreeSolver:
+    """Exact backward-induction solver for the defender/attacker pairing sequence.
+
+    Each round both sides put up a defender and two attackers, each defender
+    picks one of the attackers it is offered and the two refused attackers
+    play each other. The last two players per side pair off by a final
+    defender pick. Our decisions are maximised; the opponent's decisions are
+    aggregated according to the outlook: "expected" (uniform random opponent,
+    as in the Monte Carlo rollouts), "worst" (adversarial), "best", "greedy"
+    (the opponent settles each choice on its immediate pairings) or "nash"
+    (each simultaneous reveal is a matrix game solved for mixed equilibria).
+
+    The opening exchange is always searched. Later subgames with more than
+    max_exact_subgame players per side are valued with random_play_value,
+    so the solve is exact only when exact is True; strategy_bounds then
+    gives the range each value could move over if they were searched too.
+    """
+
+    def __init__(self,
+                 your_team: List[str],
+                 opponent_team: List[str],
+                 matrices: Dict[str, Dict[str, float]],
+                 max_exact_subgame: int = MAX_EXACT_SUBGAME):
+        self.your_team = your_team
+        self.opponent_team = opponent_team
+        self.scores = [
+            [matrices.get(y, {}).get(o, 10.0) for o in opponent_team]
+            for y in your_team
+        ]
+        self.full_your_mask = (1 << len(your_team)) - 1
+        self.full_opponent_mask = (1 << len(opponent_team)) - 1
+        self.max_exact_subgame = max_exact_subgame
+        self.exact = searched_exactly(len(your_team), max_exact_subgame)
+        self._tables: Dict[str, Dict[Tuple[int, int], float]] = {name: {} for name in OUTLOOKS}
+        # Opening exchange values of each of our strategies against every opponent opening
+        self._openings = self._opening_options(self.full_opponent_mask)
+        self._opening_rests = [self.full_opponent_mask & ~trio_mask(*opening) for opening in self._openings]
+        self._exchange_rows: Dict[str, Dict[Tuple[int, Tuple[int, int]], List[float]]] = {
+            name: {} for name in OUTLOOKS
+        }
+        self._nash_strategy_values: Optional[Dict[Tuple[int, Tuple[int, int]], float]] = None
+        # The opponent's equilibrium mixes behind _nash_strategy_values
+        self._nash_mixes: Optional[Tuple[np.ndarray, Dict[Tuple[int, int], np.ndarray]]] = None
+        self._opening_columns = {
+            o: [k for k, opening in enumerate(self._openings) if opening[0] == o]
+            for o in bits(self.full_opponent_mask)
+        }
+        self._rest_bounds: Dict[int, Tuple[np.ndarray, np.ndarray]] = {}
+        self.positions_computed = 0
+
+    @property
+    def positions_evaluated(self) -> int:
+        return sum(len(table) for table in self._tables.values())
+
+    def update_matrices(self, matrices: Dict[str, Dict[str, float]]) -> List[int]:
+        """Load new predictions, dropping only the subgames that involve a changed row.
+
+        A subgame's value depends only on the rows of the players still in it,
+        so entries whose pool excludes every changed player stay valid.
+        Returns the indices of the changed players.
+        """
+        changed = []
+        for y, name in enumerate(self.your_team):
+            row = [matrices.get(name, {}).get(o, 10.0) for o in self.opponent_team]
+            if row != self.scores[y]:
+                self.scores[y] = row
+                changed.append(y)
+        if changed:
+            stale = sum(1 << y for y in changed)
+            for table in self._tables.values():
+                for key in [key for key in table if key[0] & stale]:
+                    del table[key]
+            for rows in self._exchange_rows.values():
+                for key in [key for key in rows if trio_mask(*key) & stale]:
+                    del rows[key]
+            self._nash_strategy_values = None
+            self._nash_mixes = None
+            self._rest_bounds.clear()
+        return changed
+
+    @staticmethod
+    def _opening_options(mask: int) -> List[Tuple[int, Tuple[int, int]]]:
+        pool = bits(mask)
+        return [
+            (defender, attackers)
+            for defender in pool
+            for attackers in combinations([p for p in pool if p != defender], 2)
+        ]
+
+    def _exchange_row(self, defender: int, attackers: Tuple[int, int], outlook: str) -> List[float]:
+        rows = self._exchange_rows[outlook]
+        key = (defender, attackers)
+        if key not in rows:
+            rows[key] = [
+                self._exchange_value(defender, attackers, opp_defender, opp_attackers, outlook)
+                for opp_defender, opp_attackers in self._openings
+            ]
+        return rows[key]
+
+    def _exchange_value(self, defender: int, attackers: Tuple[int, int],
+                        opp_defender: int, opp_attackers: Tuple[int, int], outlook: str) -> float:
+        """Value of the three pairings decided by one exchange"""
+        s = self.scores
+        # payoff[j][i]: our defender takes their attacker j, theirs takes our attacker i
+        payoff = [
+            [
+                s[attackers[i]][opp_defender] + s[defender][opp_attackers[j]] + s[attackers[1 - i]][opp_attackers[1 - j]]
+                for i in range(2)
+            ]
+            for j in range(2)
+        ]
+        if outlook == "nash":
+            return solve_2x2(payoff[0][0], payoff[0][1], payoff[1][0], payoff[1][1])
+        # Otherwise the opponent's defender picks first and ours answers.
+        outcomes = [max(payoff[0][i], payoff[1][i]) for i in range(2)]
+        return self._respond(outlook, outcomes, [s[attacker][opp_defender] for attacker in attackers])
+
+    @staticmethod
+    def _respond(outlook: str, values: Sequence[float], myopic: Optional[Sequence[float]] = None) -> float:
+        if outlook == "greedy":
+            return respond("greedy", values, myopic)
+        return AGGREGATORS[outlook](values)
+
+    def _round_value(self, your_mask: int, opp_mask: int, defender: int, attackers: Tuple[int, int],
+                     opp_defender: int, opp_attackers: Tuple[int, int], outlook: str) -> float:
+        rest_yours = your_mask & ~((1 << defender) | (1 << attackers[0]) | (1 << attackers[1]))
+        rest_opp = opp_mask & ~((1 << opp_defender) | (1 << opp_attackers[0]) | (1 << opp_attackers[1]))
+        return (self._exchange_value(defender, attackers, opp_defender, opp_attackers, outlook)
+                + self.value(rest_yours, rest_opp, outlook))
+
+    def _defender_threats(self, yours: List[int], defender: int, theirs: List[int]) -> List[float]:
+        """Greedy view of each opponent defender: we send our two best into it and they keep the weaker"""
+        s = self.scores
+        return [second_best([s[y][o] for y in yours if y != defender]) for o in theirs]
+
+    def _attacker_threats(self, defender: int, opp_options: List[Tuple[int, int]]) -> List[float]:
+        """Greedy view of each opponent attacker pair: our defender takes the better matchup"""
+        s = self.scores
+        return [max(s[defender][o] for o in opp_attackers) for opp_attackers in opp_options]
+
+    def _defender_value(self, your_mask: int, opp_mask: int, yours: List[int], theirs: List[int],
+                        defender: int, outlook: str) -> float:
+        """Value of putting up defender, answering the opponent's defender and attackers"""
+        greedy = outlook == "greedy"
+        attacker_options = list(combinations([y for y in yours if y != defender], 2))
+        values = []
+        for opp_defender in theirs:
+            opp_options = list(combinations([o for o in theirs if o != opp_defender], 2))
+            threats = self._attacker_threats(defender, opp_options) if greedy else None
+            values.append(max(
+                self._respond(outlook, [
+                    self._round_value(your_mask, opp_mask, defender, attackers,
+                                      opp_defender, opp_attackers, outlook)
+                    for opp_attackers in opp_options
+                ], threats)
+                for attackers in attacker_options
+            ))
+        return self._respond(outlook, values, self._defender_threats(yours, defender, theirs) if greedy else None)
+
+    def _attackers_game(self, your_mask: int, opp_mask: int, yours: List[int], theirs: List[int],
+                        defender: int, opp_defender: int) -> float:
+        """Equilibrium value of both sides revealing attackers once the defenders are known"""
+        return solve_matrix_game(np.array([
+            [
+                self._round_value(your_mask, opp_mask, defender, attackers, opp_defender, opp_attackers, "nash")
+                for opp_attackers in combinations([o for o in theirs if o != opp_defender], 2)
+            ]
+            for attackers in combinations([y for y in yours if y != defender], 2)
+        ]))[0]
+
+    def value(self, your_mask: int, opp_mask: int, outlook: str = "expected") -> float:
+        """Value of the subgame over the remaining players of each side"""
+        table = self._tables[outlook]
+        key = (your_mask, opp_mask)
+        if key in table:
+            return table[key]
+
+        yours = bits(your_mask)
+        theirs = bits(opp_mask)
+        s = self.scores
+
+        if not yours:
+            result = 0.0
+        elif len(yours) > self.max_exact_subgame:
+            result = random_play_value(s, yours, theirs)
+        elif len(yours) == 1:
+            result = s[yours[0]][theirs[0]]
+        elif len(yours) == 2:
+            # Final pick: each defender faces the other side's remaining player.
+            payoff = [
+                [s[yours[1 - i]][theirs[j]] + s[yours[i]][theirs[1 - j]] for j in range(2)]
+                for i in range(2)
+            ]
+            if outlook == "nash":
+                result = solve_2x2(payoff[0][0], payoff[0][1], payoff[1][0], payoff[1][1])
+            else:
+                # Both pairings are settled, so a greedy opponent takes the worse one for us.
+                result = max(self._respond(outlook, row, row) for row in payoff)
+        elif outlook == "nash":
+            # Defenders are revealed together, then attackers: two nested matrix games.
+            result = solve_matrix_game(np.array([
+                [self._attackers_game(your_mask, opp_mask, yours, theirs, defender, opp_defender)
+                 for opp_defender in theirs]
+                for defender in yours
+            ]))[0]
+        else:
+            result = max(
+                self._defender_value(your_mask, opp_mask, yours, theirs, defender, outlook)
+                for defender in yours
+            )
+
+        table[key] = result
+        self.positions_computed += 1
+        return result
+
+    def _opening_terms(self, defender: int, attackers: Tuple[int, int], outlook: str) -> List[float]:
+        """Our value against each opponent opening once we commit to defender and attackers"""
+        rest_yours = self.full_your_mask & ~trio_mask(defender, attackers)
+        table = self._tables[outlook]
+        rest_values = [table.get((rest_yours, rest_opp)) for rest_opp in self._opening_rests]
+        if None in rest_values:
+            rest_values = [self.value(rest_yours, rest_opp, outlook) for rest_opp in self._opening_rests]
+        return [
+            exchange + rest
+            for exchange, rest in zip(self._exchange_row(defender, attackers, outlook), rest_values)
+        ]
+
+    def _greedy_openings(self, defender: int) -> List[List[int]]:
+        """Indices into the opponent openings a greedy opponent plays, grouped by its defender"""
+        yours = bits(self.full_your_mask)
+        theirs = bits(self.full_opponent_mask)
+        threats = self._defender_threats(yours, defender, theirs)
+        groups = []
+        for opp_defender, threat in zip(theirs, threats):
+            if threat != min(threats):
+                continue
+            indices = [k for k, opening in enumerate(self._openings) if opening[0] == opp_defender]
+            attacker_threats = self._attacker_threats(defender, [self._openings[k][1] for k in indices])
+            groups.append([k for k, t in zip(indices, attacker_threats) if t == min(attacker_threats)])
+        return groups
+
+    def _nash_root(self) -> Dict[Tuple[int, Tuple[int, int]], float]:
+        """Each opening strategy's value against the opponent's equilibrium mixes.
+
+        Defenders form one matrix game and, for each pair of defenders, the
+        attacker reveals form another; the opponent mixes by their equilibria.
+        """
+        if self._nash_strategy_values is None:
+            strategies = self._opening_options(self.full_your_mask)
+            terms = np.array([self._opening_terms(defender, attackers, "nash") for defender, attackers in strategies])
+            yours = bits(self.full_your_mask)
+            theirs = bits(self.full_opponent_mask)
+            rows = {d: [r for r, strategy in enumerate(strategies) if strategy[0] == d] for d in yours}
+            cols = self._opening_columns
+
+            defender_game = np.zeros((len(yours), len(theirs)))
+            attacker_mixes = {}
+            for i, defender in enumerate(yours):
+                for j, opp_defender in enumerate(theirs):
+                    value, _, mix = solve_matrix_game(terms[np.ix_(rows[defender], cols[opp_defender])])
+                    defender_game[i, j] = value
+                    attacker_mixes[(defender, opp_defender)] = mix
+            _, _, defender_mix = solve_matrix_game(defender_game)
+
+            self._nash_mixes = (defender_mix, attacker_mixes)
+            self._nash_strategy_values = {
+                (defender, attackers): self._against_nash_mixes(defender, terms[r])
+                for r, (defender, attackers) in enumerate(strategies)
+            }
+        return self._nash_strategy_values
+
+    def _against_nash_mixes(self, defender: int, terms: Sequence[float]) -> float:
+        defender_mix, attacker_mixes = self._nash_mixes
+        terms = np.asarray(terms)
+        return float(sum(
+            defender_mix[j] * (terms[self._opening_columns[opp_defender]] @ attacker_mixes[(defender, opp_defender)])
+            for j, opp_defender in enumerate(bits(self.full_opponent_mask))
+        ))
+
+    def strategy_value(self, defender: int, attackers: Tuple[int, int], outlook: str = "expected") -> float:
+        """Value of committing to a defender and attacker pair before the opponent reveals.
+        
+        Every opponent opening has the same number of attacker pairs per
+        defender, so one flat aggregate equals aggregating per defender.
+        """
+        if outlook == "nash":
+            return self._nash_root()[(defender, attackers)]
+        return self._aggregate_terms(defender, self._opening_terms(defender, attackers, outlook), outlook)
+
+    def _aggregate_terms(self, defender: int, terms: Sequence[float], outlook: str) -> float:
+        """Combine a strategy's values against each opponent opening as the outlook's opponent would"""
+        if outlook == "nash":
+            self._nash_root()
+            return self._against_nash_mixes(defender, terms)
+        if outlook == "greedy":
+            groups = self._greedy_openings(defender)
+            return sum(sum(terms[k] for k in group) / len(group) for group in groups) / len(groups)
+        return AGGREGATORS[outlook](terms)
+
+    def _opening_rest_bounds(self, rest_yours: int) -> Tuple[np.ndarray, np.ndarray]:
+        """Bounds on every estimated subgame left after an opening, against each opponent opening.
+
+        Each remaining player is paired exactly once whatever either side
+        plays, so the subgame's total is at least the larger of its row- and
+        column-minimum sums and at most the smaller of the maximum sums.
+        """
+        if rest_yours not in self._rest_bounds:
+            theirs = np.array([bits(rest_opp) for rest_opp in self._opening_rests])
+            block = np.array(self.scores)[bits(rest_yours)][:, theirs]  # (ours, openings, theirs)
+            low = np.maximum(block.min(axis=2).sum(axis=0), block.min(axis=0).sum(axis=1))
+            high = np.minimum(block.max(axis=2).sum(axis=0), block.max(axis=0).sum(axis=1))
+            self._rest_bounds[rest_yours] = (low, high)
+        return self._rest_bounds[rest_yours]
+
+    def strategy_bounds(self, defender: int, attackers: Tuple[int, int], outlook: str = "expected") -> Tuple[float, float]:
+        """Range strategy_value could take if the estimated subgames were searched as well.
+
+        When the solve is not exact, exactly the subgames after the opening
+        are estimated; swapping each for its bounds bounds the strategy's
+        value. Under "nash" the opponent keeps the mixes solved for the
+        estimates, so that range is against those mixes.
+        """
+        if self.exact:
+            value = self.strategy_value(defender, attackers, outlook)
+            return value, value
+        exchange = np.array(self._exchange_row(defender, attackers, outlook))
+        low, high = self._opening_rest_bounds(self.full_your_mask & ~trio_mask(defender, attackers))
+        return (float(self._aggregate_terms(defender, exchange + low, outlook)),
+                float(self._aggregate_terms(defender, exchange + high, outlook)))
+
+    def solve(self, outlooks: Sequence[str] = tuple(AGGREGATORS)) -> Dict[Tuple[int, Tuple[int, int]], Dict[str, float]]:
+        """Value every opening strategy under each outlook"""
+        return {
+            (defender, attackers): {
+                outlook: self.strategy_value(defender, attackers, outlook)
+                for outlook in outlooks
+            }
+            for defender, attackers in self._opening_options(self.full_your_mask)
+        }
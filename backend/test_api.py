@@ -0,0 +1,95 @@
+import json
+
+from conftest import create_pairing, random_matrices
+from fastapi.testclient import TestClient
+
+from main import app
+from optimizer import PairingOptimizer, Objective
+
+# Endpoints exercised through the app, against the throwaway database conftest sets up.
+
+def read_events(text: str):
+    events = []
+    for block in text.strip().split("\n\n"):
+        fields = dict(line.split(": ", 1) for line in block.split("\n"))
+        events.append((fields["event"], json.loads(fields["data"])))
+    return events
+
+def test_optimize_stream_reports_progress_then_the_result():
+    with TestClient(app) as client:
+        code = create_pairing(client)
+        response = client.get(f"/sessions/{code}/optimize/stream", params={"updates": 4, "seed": 5})
+        assert response.headers["content-type"].startswith("text/event-stream")
+        events = read_events(response.text)
+        assert [name for name, _ in events] == ["progress"] * 4 + ["result"]
+        assert [data["completed"] for _, data in events[:-1]] == [1, 2, 3, 4]
+        assert all(data["total"] == 4 for _, data in events[:-1])
+        _, result = events[-1]
+        assert {key: value for key, value in events[-2][1].items() if key not in ("completed", "total")} == result
+        assert result["seed"] == 5
+
+        # A completed run is stored, so asking again replays only the result
+        again = read_events(client.get(f"/sessions/{code}/optimize/stream", params={"updates": 4, "seed": 5}).text)
+        assert again == [("result", result)]
+    print("✓ The optimisation stream sends each slice's progress, then the stored result")
+
+def test_create_tournament_rejects_what_it_cannot_import():
+    with TestClient(app) as client:
+        for teams in (
+            [{"name": "Home", "players": [{"name": "Sam"}]}, {"name": "Home", "players": [{"name": "Euan"}]}],
+            [{"name": " ", "players": [{"name": "Sam"}]}],
+            [{"name": "Home", "players": [{"name": ""}]}],
+        ):
+            response = client.post("/tournaments", json={"name": "Bad", "teams": teams})
+            assert response.status_code == 400, teams
+        assert not [t for t in client.get("/tournaments", params={"summary": True}).json() if t["name"] == "Bad"]
+
+        created = client.post("/tournaments", json={"name": "Good", "teams": [
+            {"name": "Home", "players": [{"name": "Sam"}]}, {"name": "Away", "players": [{"name": "Sam"}]}
+        ]}).json()
+        assert [len(team["players"]) for team in created["teams"]] == [1, 1]
+    print("✓ POST /tournaments answers 400 for repeated or blank names and writes nothing")
+
+def test_recommend_rejects_positions_the_pools_cannot_hold():
+    with TestClient(app) as client:
+        code = create_pairing(client)
+        recommend = lambda **body: client.post(f"/sessions/{code}/recommend", json=body)
+        assert recommend(decision_type="pick_defender", unpaired_your_team=[], unpaired_opponent_team=[]).status_code == 400
+        # Real players who have already been paired
+        pools = {"unpaired_your_team": ["Sam", "Euan"], "unpaired_opponent_team": ["Jim", "Joe"]}
+        for body in (
+            {"decision_type": "pick_attackers", "your_defender": "Laurence", "opponent_defender": "Jim"},
+            {"decision_type": "pick_attackers", "your_defender": "Sam", "opponent_defender": "Jack"},
+            {"decision_type": "pick_defender_matchup", "your_defender": "Sam", "your_attackers": ["Euan"],
+             "opponent_defender": "Jim", "opponent_attackers": ["Jack"]},
+            {"decision_type": "pick_defender_matchup", "your_defender": "Sam", "your_attackers": ["Euan"],
+             "opponent_defender": "Jim", "opponent_attackers": ["Joe"], "your_attacker_taken": "Sam"},
+            {"decision_type": "pick_defender", "unpaired_your_team": ["Sam", "Sam"]},
+        ):
+            response = recommend(**{**pools, **body})
+            assert response.status_code == 400, body
+        assert recommend(decision_type="pick_attackers", your_defender="Sam", opponent_defender="Jim",
+                         **pools).json()["recommendation"] == ["Euan"]
+    print("✓ /recommend answers 400 for empty pools and players who are no longer unpaired")
+
+def test_optimize_defaults_to_exact_only_where_it_searches_everything():
+    with TestClient(app) as client:
+        code = create_pairing(client)
+        exact = client.post(f"/sessions/{code}/optimize").json()
+        assert exact["mode"] == "exact" and exact["confidence"] == 1
+        # exact has no risk objectives, so those sample
+        cvar = client.post(f"/sessions/{code}/optimize", params={"objective": "cvar"}).json()
+        assert cvar["mode"] == "batch" and cvar["objective"] == "cvar"
+
+    names, opponents, matrices = random_matrices(10, 1)
+    assert PairingOptimizer(names[:7], opponents[:7], matrices).default_mode() == "exact"
+    assert PairingOptimizer(names, opponents, matrices).default_mode() == "batch"
+    assert PairingOptimizer(names, opponents, matrices).default_mode("nash") == "exact"
+    assert PairingOptimizer(names[:5], opponents[:5], matrices, objective=Objective("cvar")).default_mode() == "batch"
+    print("✓ /optimize solves exactly up to 7 players and samples above, or when the request needs it")
+
+if __name__ == "__main__":
+    test_optimize_stream_reports_progress_then_the_result()
+    test_create_tournament_rejects_what_it_cannot_import()
+    test_recommend_rejects_positions_the_pools_cannot_hold()
+    test_optimize_defaults_to_exact_only_where_it_searches_everything()
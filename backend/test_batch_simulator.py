@@ -0,0 +1,90 @@
+import random
+import numpy as np
+
+from optimizer import PairingOptimizer, expected_matrices
+from batch_simulator import BatchSimulator
+from conftest import sample_matrices, your_team, opponent_team
+
+# The vectorised engine must sample the same score distribution as the
+# scalar reference path in PairingOptimizer.
+
+STRATEGIES = [
+    ("Denis", ["Byron", "Euan"]),
+    ("Laurence", ["Sam", "Euan"]),
+    ("Byron", ["Laurence", "Denis"]),
+]
+
+def test_batch_matches_scalar_reference():
+    random.seed(1)
+    optimizer = PairingOptimizer(your_team, opponent_team, sample_matrices)
+    simulator = BatchSimulator(your_team, opponent_team, sample_matrices)
+    rng = np.random.default_rng(1)
+
+    for defender, attackers in STRATEGIES:
+        scalar = np.array([
+            optimizer.run_single_simulation(defender, attackers).total_score
+            for _ in range(20000)
+        ])
+        batch = simulator.simulate(defender, attackers, 200000, rng)
+
+        # Five standard errors of the difference between the two means
+        tolerance = 5 * np.sqrt(scalar.var() / len(scalar) + batch.var() / len(batch))
+        assert abs(scalar.mean() - batch.mean()) < tolerance
+        # Every outcome is equally likely, so both paths see the same set of totals
+        assert set(np.unique(batch).tolist()) == set(np.unique(scalar).tolist())
+        print(f"✓ {defender} + {attackers}: scalar {scalar.mean():.2f}, batch {batch.mean():.2f}")
+
+def test_batch_scores_are_reachable_pairings():
+    simulator = BatchSimulator(your_team, opponent_team, sample_matrices)
+    totals = simulator.simulate("Denis", ["Byron", "Euan"], 10000, np.random.default_rng(2))
+    lowest = sum(min(row.values()) for row in sample_matrices.values())
+    highest = sum(max(row.values()) for row in sample_matrices.values())
+    assert totals.shape == (10000,)
+    assert lowest <= totals.min() and totals.max() <= highest
+    print("✓ Batch totals stay within the matrix bounds")
+
+def test_batch_matches_scalar_reference_for_eight_players():
+    random.seed(3)
+    names = [f"Y{i}" for i in range(8)]
+    opponents = [f"O{i}" for i in range(8)]
+    matrices = {y: {o: float((3 * i + 5 * j) % 21) for j, o in enumerate(opponents)} for i, y in enumerate(names)}
+    optimizer = PairingOptimizer(names, opponents, matrices)
+    simulator = BatchSimulator(names, opponents, matrices)
+
+    scalar = np.array([
+        optimizer.run_single_simulation("Y0", ["Y1", "Y2"]).total_score
+        for _ in range(20000)
+    ])
+    batch = simulator.simulate("Y0", ["Y1", "Y2"], 200000, np.random.default_rng(3))
+    assert len(optimizer.simulate_pairing_round(names, opponents, "Y0", "O0", ["Y1", "Y2"], ["O1", "O2"])) == 8
+
+    tolerance = 5 * np.sqrt(scalar.var() / len(scalar) + batch.var() / len(batch))
+    assert abs(scalar.mean() - batch.mean()) < tolerance
+    print(f"✓ 8 players: scalar {scalar.mean():.2f}, batch {batch.mean():.2f}")
+
+def test_ranged_cells_sample_their_triangular_mean():
+    spreads = {y: {o: (max(0, score - 5), min(20, score + 3)) for o, score in row.items()}
+               for y, row in sample_matrices.items()}
+    ranged = BatchSimulator(your_team, opponent_team, sample_matrices, spreads=spreads)
+    mean_only = BatchSimulator(your_team, opponent_team, expected_matrices(sample_matrices, spreads))
+    ranged_totals = ranged.simulate("Denis", ["Byron", "Euan"], 400000, np.random.default_rng(4))
+    mean_totals = mean_only.simulate("Denis", ["Byron", "Euan"], 400000, np.random.default_rng(5))
+    tolerance = 5 * np.sqrt(ranged_totals.var() / len(ranged_totals) + mean_totals.var() / len(mean_totals))
+    assert abs(ranged_totals.mean() - mean_totals.mean()) < tolerance
+    # Drawing within each cell's range widens the spread of totals
+    assert ranged_totals.std() > mean_totals.std()
+
+    # A range of zero width is just the likely score
+    pinned = {y: {o: (score, score) for o, score in row.items()} for y, row in sample_matrices.items()}
+    pinned_totals = BatchSimulator(your_team, opponent_team, sample_matrices, spreads=pinned).simulate(
+        "Denis", ["Byron", "Euan"], 20000, np.random.default_rng(6))
+    plain_totals = BatchSimulator(your_team, opponent_team, sample_matrices).simulate(
+        "Denis", ["Byron", "Euan"], 20000, np.random.default_rng(6))
+    assert set(np.unique(pinned_totals).tolist()) == set(np.unique(plain_totals).tolist())
+    print(f"✓ Ranged cells: mean {ranged_totals.mean():.2f} vs {mean_totals.mean():.2f} at the triangular means")
+
+if __name__ == "__main__":
+    test_batch_matches_scalar_reference()
+    test_batch_scores_are_reachable_pairings()
+    test_batch_matches_scalar_reference_for_eight_players()
+    test_ranged_cells_sample_their_triangular_mean()
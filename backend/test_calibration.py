@@ -0,0 +1,111 @@
+import tempfile
+import threading
+
+from models import Team, Player, Session, CalibrationStat, upsert_team_predictions
+from calibration import record_results, rebuild_calibration, load_calibration, player_biases, bias_corrected_matrices
+from conftest import fresh_db, session_factory
+
+def seeded_db(db=None):
+    """Two sessions between Home and Away with predictions for most pairings"""
+    db = db or fresh_db()
+    db.add_all([Team(id=1, name="Home"), Team(id=2, name="Away")])
+    db.add_all([
+        Player(id=1, team_id=1, name="Laurence", army="Orks"),
+        Player(id=2, team_id=1, name="Byron", army="Tau"),
+        Player(id=3, team_id=1, name="Denis", army="Orks"),
+        Player(id=4, team_id=2, name="Jack", army="Eldar"),
+        Player(id=5, team_id=2, name="John", army="Necrons"),
+        Player(id=6, team_id=2, name="James"),
+    ])
+    for session_id in (1, 2):
+        db.add(Session(id=session_id, code=f"S{session_id}", your_team_id=1, opponent_team_id=2))
+        upsert_team_predictions(db, session_id, {
+            "Laurence": {"Jack": 15, "John": 8, "James": 12},
+            "Byron": {"Jack": 9, "John": 14, "James": 10},
+            "Denis": {"Jack": 11, "John": 7},
+        })
+    db.commit()
+    return db
+
+def snapshot(db):
+    return {
+        (stat.scope, stat.key): (stat.games, round(stat.error_sum, 9), round(stat.abs_error_sum, 9), round(stat.sq_error_sum, 9))
+        for stat in db.query(CalibrationStat).all()
+        if stat.games
+    }
+
+def test_incremental_aggregates_match_a_rebuild():
+    db = seeded_db()
+    record_results(db, 1, [(1, 4, 12.0), (2, 5, 14.0), (3, 6, 9.0)])
+    record_results(db, 2, [(1, 5, 11.0)])
+    # Re-recording a game swaps its old error for the new one
+    record_results(db, 1, [(2, 6, 4.0), (1, 4, 17.0)])
+    db.commit()
+    incremental = snapshot(db)
+    rebuild_calibration(db)
+    db.commit()
+    assert snapshot(db) == incremental
+
+    laurence = next(row for row in load_calibration(db, "player") if row["player_name"] == "Laurence")
+    # Predicted 15 vs 17 in session 1 and 8 vs 11 in session 2
+    assert laurence["games"] == 2 and laurence["bias"] == -2.5 and laurence["mean_absolute_error"] == 2.5
+    # Denis had no prediction against James, so that game counts nowhere
+    assert [row["key"] for row in load_calibration(db, "army")] == ["Orks", "Tau"]
+    print("✓ Aggregates maintained on insert and replace equal a full rebuild")
+
+def test_parallel_re_records_keep_the_aggregates_exact():
+    # A file database, so each writer has its own connection
+    Sessions = session_factory(f"sqlite:///{tempfile.mkdtemp()}/calibration.db")
+    seeded_db(Sessions()).close()
+    start = threading.Barrier(4)
+    failures = []
+
+    def re_record(score: float):
+        db = Sessions()
+        try:
+            start.wait()
+            for _ in range(10):
+                record_results(db, 1, [(1, 4, score), (2, 5, score)])
+                db.commit()
+        except Exception as error:
+            failures.append(error)
+        finally:
+            db.close()
+
+    threads = [threading.Thread(target=re_record, args=(score,)) for score in (3.0, 9.0, 14.0, 20.0)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    assert not failures
+    db = Sessions()
+    incremental = snapshot(db)
+    rebuild_calibration(db)
+    db.commit()
+    assert snapshot(db) == incremental
+    # Whichever write came last, each game is counted exactly once
+    assert incremental[("player", "1")][0] == incremental[("player", "2")][0] == 1
+    print("✓ Concurrent re-records of the same games leave the aggregates equal to a rebuild")
+
+def test_bias_correction_shrinks_towards_the_prediction():
+    db = seeded_db()
+    record_results(db, 1, [(2, 4, 4.0)])
+    record_results(db, 2, [(2, 5, 9.0)])
+    db.commit()
+    biases = player_biases(db, {"Laurence": 1, "Byron": 2})
+    assert biases == {"Byron": (5.0, 2)}
+    matrices, spreads = bias_corrected_matrices(
+        {"Byron": {"Jack": 9, "John": 1}, "Laurence": {"Jack": 15}},
+        {"Byron": {"Jack": (6, 12)}},
+        biases
+    )
+    # Two games against a prior of five: 2/7 of the +5 bias comes off
+    assert abs(matrices["Byron"]["Jack"] - (9 - 10 / 7)) < 1e-9
+    assert matrices["Byron"]["John"] == 0.0 and matrices["Laurence"]["Jack"] == 15
+    assert abs(spreads["Byron"]["Jack"][1] - (12 - 10 / 7)) < 1e-9
+    print("✓ Bias correction shifts each player's row by their shrunk bias")
+
+if __name__ == "__main__":
+    test_incremental_aggregates_match_a_rebuild()
+    test_parallel_re_records_keep_the_aggregates_exact()
+    test_bias_correction_shrinks_towards_the_prediction()
@@ -0,0 +1,80 @@
+from datetime import datetime, timedelta, timezone
+
+from fastapi import FastAPI, Request
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+
+from http_cache import CompressionMiddleware, conditional_response, entity_tag
+
+# Conditional GETs and compression, exercised on a throwaway app.
+
+app = FastAPI()
+app.add_middleware(CompressionMiddleware)
+state = {"version": 1, "updated_at": datetime(2025, 3, 1, 12, 0, 0), "renders": 0}
+
+@app.get("/thing")
+async def thing(request: Request):
+    def render() -> str:
+        state["renders"] += 1
+        return '{"items": [' + ", ".join(["1"] * 2000) + "]}"
+    return conditional_response(request, entity_tag("thing", 1, state["version"]), state["updated_at"], render)
+
+@app.get("/stream")
+async def stream():
+    async def events():
+        for i in range(3):
+            yield f"data: {i}\n\n" * 200
+    return StreamingResponse(events(), media_type="text/event-stream")
+
+client = TestClient(app)
+
+def test_unchanged_versions_are_not_modified():
+    first = client.get("/thing")
+    assert first.status_code == 200 and state["renders"] == 1
+    etag = first.headers["etag"]
+    assert etag == 'W/"thing-1-v1"' and first.headers["last-modified"] == "Sat, 01 Mar 2025 12:00:00 GMT"
+
+    for headers in (
+        {"If-None-Match": etag},
+        {"If-None-Match": f'"other", {etag.removeprefix("W/")}'},
+        {"If-Modified-Since": first.headers["last-modified"]},
+    ):
+        response = client.get("/thing", headers=headers)
+        assert response.status_code == 304 and response.content == b""
+        assert response.headers["etag"] == etag
+    assert state["renders"] == 1
+
+    # A write bumps the version; the stale tag no longer matches and wins over the date
+    state["version"] += 1
+    response = client.get("/thing", headers={"If-None-Match": etag, "If-Modified-Since": first.headers["last-modified"]})
+    assert response.status_code == 200 and response.headers["etag"] == 'W/"thing-1-v2"'
+    print("✓ Matching validators get 304 without rendering; a new version renders again")
+
+def test_dates_validate_only_once_their_second_is_over():
+    # A second ahead, so the test can't outlast the write's second
+    now = datetime.now(timezone.utc).replace(tzinfo=None) + timedelta(seconds=1)
+    state.update(version=state["version"] + 1, updated_at=now)
+    try:
+        response = client.get("/thing")
+        assert "last-modified" not in response.headers
+        # Another write could still land in this second, so only the ETag answers 304
+        since = now.strftime("%a, %d %b %Y %H:%M:%S GMT")
+        assert client.get("/thing", headers={"If-Modified-Since": since}).status_code == 200
+        assert client.get("/thing", headers={"If-None-Match": response.headers["etag"]}).status_code == 304
+    finally:
+        state["updated_at"] = datetime(2025, 3, 1, 12, 0, 0)
+    print("✓ A change in the current second sends no Last-Modified and never matches If-Modified-Since")
+
+def test_large_bodies_are_gzipped_but_streams_are_not():
+    response = client.get("/thing", headers={"Accept-Encoding": "gzip"})
+    assert response.headers["content-encoding"] == "gzip"
+    assert len(response.json()["items"]) == 2000
+    events = client.get("/stream", headers={"Accept-Encoding": "gzip"})
+    assert "content-encoding" not in events.headers
+    assert events.text.count("data:") == 600
+    print("✓ JSON bodies are compressed and event streams pass through")
+
+if __name__ == "__main__":
+    test_unchanged_versions_are_not_modified()
+    test_dates_validate_only_once_their_second_is_over()
+    test_large_bodies_are_gzipped_but_streams_are_not()
@@ -0,0 +1,74 @@
+import asyncio
+
+from models import Team, Player, Session, load_matrices, upsert_team_predictions
+from importer import TournamentImporter, TournamentImportError, iter_lines, import_csv, import_ndjson
+from conftest import fresh_db
+
+async def chunked(data: bytes, size: int):
+    for start in range(0, len(data), size):
+        yield data[start:start + size]
+
+def run_import(parse, data: bytes, batch_size: int = 3, chunk_size: int = 7):
+    db = fresh_db()
+    importer = TournamentImporter(db, "Import test", batch_size=batch_size)
+    asyncio.run(parse(iter_lines(chunked(data, chunk_size)), importer))
+    return db, importer.finish()
+
+def test_csv_import_groups_players_by_team():
+    # Teams interleave and the upload is split mid-line (and mid-character) across chunks
+    data = (
+        "﻿Team,Player,Army,Archetype\r\n"
+        "Home,Laurence,Orks,\r\n"
+        "Away,Jack,Eldar,Skirmish\r\n"
+        "Home,Byron,Tau,Gunline\r\n"
+        "\r\n"
+        "Away,Jöhn,,\r\n"
+        "Home,Denis,Necrons,Hammer\r\n"
+    ).encode("utf-8")
+    db, summary = run_import(import_csv, data)
+    assert summary["team_count"] == 2 and summary["player_count"] == 5
+    rosters = {team.name: [player.name for player in team.players] for team in db.query(Team).all()}
+    assert rosters == {"Home": ["Laurence", "Byron", "Denis"], "Away": ["Jack", "Jöhn"]}
+    assert db.query(Player).filter(Player.name == "Jack").one().archetype == "Skirmish"
+    assert db.query(Player).filter(Player.name == "Laurence").one().archetype is None
+    print("✓ CSV import groups interleaved rows by team")
+
+def test_ndjson_import_and_errors():
+    data = b'{"name": "Home", "players": [{"name": "Sam"}, {"name": "Euan", "army": "Orks"}]}\n{"name": "Away", "players": [{"name": "Joe"}]}'
+    db, summary = run_import(import_ndjson, data, batch_size=1)
+    assert summary["team_count"] == 2 and summary["player_count"] == 3
+    assert db.query(Player).filter(Player.name == "Euan").one().army == "Orks"
+
+    for parse, bad in (
+        (import_csv, b"team,name\nHome,Sam\n"),
+        (import_csv, b"team,player\nHome,\n"),
+        (import_ndjson, b'{"name": "Home", "players": [{"name": "Sam"}]}\nnot json\n'),
+        (import_ndjson, b'{"name": "Home", "players": [{"name": "Sam"}]}\n{"name": "Home", "players": [{"name": "Euan"}]}\n'),
+    ):
+        try:
+            run_import(parse, bad)
+        except TournamentImportError:
+            continue
+        raise AssertionError(f"{bad!r} should be rejected")
+    print("✓ NDJSON import works and malformed uploads are rejected")
+
+def test_team_predictions_replace_only_listed_players():
+    db = fresh_db()
+    db.add(Session(id=1, code="ABC123"))
+    upsert_team_predictions(db, 1, {
+        "Laurence": {"Jack": 15, "John": 8},
+        "Byron": {"Jack": 9, "John": 14},
+    })
+    upsert_team_predictions(db, 1, {"Byron": {"Jack": 10}, "Denis": {"John": 7}})
+    db.commit()
+    assert load_matrices(db, 1) == {
+        "Laurence": {"Jack": 15, "John": 8},
+        "Byron": {"Jack": 10},
+        "Denis": {"John": 7},
+    }
+    print("✓ Bulk submission replaces each listed player's row and keeps the rest")
+
+if __name__ == "__main__":
+    test_csv_import_groups_players_by_team()
+    test_ndjson_import_and_errors()
+    test_team_predictions_replace_only_listed_players()
@@ -0,0 +1,84 @@
+import json
+import os
+import tempfile
+
+from conftest import create_pairing
+from fastapi.testclient import TestClient
+from sqlalchemy import create_engine, text
+
+import main
+import metrics
+from metrics import Histogram, RequestStats, QUERY_LATENCY, current_request, instrument_engine
+
+def series(histogram: Histogram, *labels: str):
+    return histogram._series.get(labels, [0] * (len(histogram.buckets) + 3))
+
+def test_histogram_renders_cumulative_buckets():
+    histogram = Histogram("demo_seconds", "Demo", ("route",), (0.1, 1.0))
+    for value in (0.05, 0.1, 0.5, 3.0):
+        histogram.observe(value, "/a")
+    assert histogram.render() == [
+        "# HELP demo_seconds Demo",
+        "# TYPE demo_seconds histogram",
+        'demo_seconds_bucket{route="/a",le="0.1"} 2',
+        'demo_seconds_bucket{route="/a",le="1.0"} 3',
+        'demo_seconds_bucket{route="/a",le="+Inf"} 4',
+        'demo_seconds_sum{route="/a"} 3.65',
+        'demo_seconds_count{route="/a"} 4',
+    ]
+    print("✓ Histograms render cumulative Prometheus buckets")
+
+def test_queries_are_counted_against_the_current_request():
+    engine = create_engine("sqlite://")
+    instrument_engine(engine)
+    selects = series(QUERY_LATENCY, "SELECT")[-1]
+    stats = RequestStats()
+    token = current_request.set(stats)
+    try:
+        with engine.connect() as connection:
+            for _ in range(3):
+                connection.execute(text("select 1"))
+    finally:
+        current_request.reset(token)
+    with engine.connect() as connection:
+        connection.execute(text("select 1"))
+    # Queries outside a request still reach the global histogram
+    assert stats.query_count == 3 and stats.query_time > 0
+    assert series(QUERY_LATENCY, "SELECT")[-1] == selects + 4
+    print("✓ Query hooks count a request's own queries")
+
+def test_requests_and_streamed_phases_reach_metrics():
+    with TestClient(main.app) as client:
+        code = create_pairing(client)
+        response = client.get(f"/sessions/{code}")
+        assert 'desc="1 queries"' in response.headers["server-timing"]
+        client.get(f"/sessions/{code}/optimize/stream", params={"updates": 2})
+        exposition = client.get("/metrics").text
+    assert 'http_request_duration_seconds_count{method="GET",route="/sessions/{code}",status="200"}' in exposition
+    assert 'http_request_db_queries_bucket{method="GET",route="/sessions/{code}",le="1"}' in exposition
+    for phase in ("simulation", "decision_tree"):
+        assert f'optimizer_phase_duration_seconds_count{{mode="batch",phase="{phase}"}}' in exposition
+    print("✓ /metrics reports request latency, query counts and streamed optimiser phases")
+
+def test_profiled_requests_are_dumped():
+    profile_dir = tempfile.mkdtemp()
+    main.PROFILE_DIR = metrics.PROFILE_DIR = profile_dir
+    try:
+        with TestClient(main.app) as client:
+            code = create_pairing(client)
+            assert "x-profile-dump" not in client.get(f"/sessions/{code}").headers
+            stem = client.get(f"/sessions/{code}", headers={"X-Profile": "1"}).headers["x-profile-dump"]
+    finally:
+        main.PROFILE_DIR = metrics.PROFILE_DIR = None
+    assert stem.endswith("-GET-sessions_code")
+    assert os.path.getsize(os.path.join(profile_dir, stem + ".prof")) > 0
+    with open(os.path.join(profile_dir, stem + ".json")) as f:
+        dump = json.load(f)
+    assert dump["route"] == "/sessions/{code}" and dump["query_count"] == len(dump["slowest_queries"]) == 1
+    print("✓ X-Profile requests leave a cProfile dump and a query log")
+
+if __name__ == "__main__":
+    test_histogram_renders_cumulative_buckets()
+    test_queries_are_counted_against_the_current_request()
+    test_requests_and_streamed_phases_reach_metrics()
+    test_profiled_requests_are_dumped()
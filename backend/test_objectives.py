@@ -0,0 +1,42 @@
+import numpy as np
+
+from optimizer import PairingOptimizer, ScoreAccumulator, Objective, TOTAL_BIN_WIDTH
+from conftest import sample_matrices, your_team, opponent_team
+
+# P(win) and CVaR come from histograms merged across workers, and only
+# sampling modes can rank by them.
+
+def test_accumulated_risk_measures_match_the_samples():
+    totals = np.random.default_rng(5).normal(50, 8, 100000).clip(0, 100)
+    whole = ScoreAccumulator(win_threshold=55)
+    whole.add(totals)
+    merged = ScoreAccumulator(win_threshold=55)
+    for batch in np.array_split(totals, 7):
+        part = ScoreAccumulator(win_threshold=55)
+        part.add(batch)
+        merged.merge(part)
+
+    ordered = np.sort(totals)
+    for accumulator in (whole, merged):
+        summary = accumulator.summary(cvar_alpha=0.05)
+        assert summary.win_probability == np.count_nonzero(totals > 55) / len(totals)
+        assert abs(summary.cvar - ordered[:5000].mean()) < TOTAL_BIN_WIDTH
+        assert abs(summary.mean - totals.mean()) < 1e-9
+    assert whole.wins == merged.wins and np.array_equal(whole.bin_counts, merged.bin_counts)
+    print("✓ P(win) and CVaR read from merged histograms match the raw samples")
+
+def test_risk_objectives_need_sampling():
+    optimizer = PairingOptimizer(your_team, opponent_team, sample_matrices, seed=2, objective=Objective("cvar"))
+    try:
+        optimizer.optimize(6000, "exact")
+    except ValueError:
+        pass
+    else:
+        raise AssertionError("exact mode should reject risk objectives")
+    result = optimizer.optimize(6000, "batch")
+    assert result.objective == "cvar" and result.cvar <= result.expected_score
+    print("✓ Risk objectives are ranked by sampling modes only")
+
+if __name__ == "__main__":
+    test_accumulated_risk_measures_match_the_samples()
+    test_risk_objectives_need_sampling()
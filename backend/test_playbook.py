@@ -0,0 +1,89 @@
+import random
+from itertools import combinations
+
+from recommender import SubgameEvaluator
+from playbook import build_playbook, state_key
+from solver import bits
+from conftest import sample_matrices, your_team, opponent_team, random_matrices
+
+# The playbook must hold exactly what /recommend would answer at every
+# position a pairing can reach while the captain follows it.
+
+def test_playbook_matches_recommendations():
+    for model in ("uniform", "nash"):
+        playbook = build_playbook(SubgameEvaluator(your_team, opponent_team, sample_matrices, opponent_model=model),
+                                  your_team, opponent_team)
+        evaluator = SubgameEvaluator(your_team, opponent_team, sample_matrices, opponent_model=model)
+        assert playbook["complete"]
+        for key, state in playbook["states"].items():
+            if "defenders" not in state:
+                continue
+            your_mask, opp_mask = (int(mask) for mask in key.split(":"))
+            yours = [your_team[y] for y in bits(your_mask)]
+            theirs = [opponent_team[o] for o in bits(opp_mask)]
+            defenders = evaluator.defender_options(yours, theirs)
+            assert state["defenders"] == [round(defenders[name], 2) for name in yours]
+            defender = your_team[state["defender"]]
+            assert defenders[defender] == max(defenders.values())
+
+            pool = [name for name in yours if name != defender]
+            pairs = list(combinations(pool, min(2, len(pool))))
+            for row, row_takes, opp_defender in zip(state["attackers"], state["takes"], theirs):
+                options = evaluator.attacker_options(yours, theirs, defender, opp_defender)
+                assert row == [round(options[pair], 2) for pair in pairs]
+                sent = list(pairs[row.index(max(row))])
+                offerable = [name for name in theirs if name != opp_defender]
+                for taken, values in zip(sent, row_takes):
+                    takes = evaluator.matchup_options(yours, theirs, defender, offerable, opp_defender, sent, taken)
+                    assert values == [round(takes[name], 2) for name in offerable]
+        print(f"✓ {model}: {len(playbook['states'])} playbook states match /recommend")
+
+def test_following_the_playbook_never_leaves_it():
+    random.seed(4)
+    names, opponents, matrices = random_matrices(6, 4)
+    playbook = build_playbook(SubgameEvaluator(names, opponents, matrices), names, opponents)
+    states = playbook["states"]
+
+    for _ in range(300):
+        yours, theirs = list(range(6)), list(range(6))
+        while len(yours) > 1:
+            state = states[state_key(sum(1 << y for y in yours), sum(1 << o for o in theirs))]
+            defender = state["defender"]
+            # The opponent plays at random; we follow the book
+            opp_defender = random.choice(theirs)
+            pool = [y for y in yours if y != defender]
+            pairs = list(combinations(pool, min(2, len(pool))))
+            row = state["attackers"][theirs.index(opp_defender)]
+            sent = pairs[row.index(max(row))]
+            offerable = [o for o in theirs if o != opp_defender]
+            offered = random.sample(offerable, len(sent))
+            taken_by_them = random.choice(sent)
+            takes = state["takes"][theirs.index(opp_defender)][sent.index(taken_by_them)]
+            taken = max(offered, key=lambda o: takes[offerable.index(o)])
+            yours.remove(defender)
+            yours.remove(taken_by_them)
+            theirs.remove(opp_defender)
+            theirs.remove(taken)
+        assert state_key(sum(1 << y for y in yours), sum(1 << o for o in theirs)) in states
+    print(f"✓ 300 random opponents stay inside a {len(states)}-state playbook")
+
+def test_playbook_stops_at_a_whole_round():
+    playbook = build_playbook(SubgameEvaluator(your_team, opponent_team, sample_matrices),
+                              your_team, opponent_team, max_states=10)
+    assert not playbook["complete"]
+    assert playbook["depth"] == 1 and list(playbook["states"]) == [playbook["root"]]
+    assert not playbook["timed_out"]
+
+    names, opponents, matrices = random_matrices(6, 5)
+    evaluator = SubgameEvaluator(names, opponents, matrices)
+    playbook = build_playbook(evaluator, names, opponents, time_budget=0)
+    assert playbook["timed_out"] and not playbook["complete"]
+    assert playbook["depth"] == 1 and list(playbook["states"]) == [playbook["root"]]
+    # Given its time, a later build on the same evaluator reaches the last pairing
+    assert build_playbook(evaluator, names, opponents)["complete"]
+    print("✓ A playbook over its state or time budget keeps only whole rounds")
+
+if __name__ == "__main__":
+    test_playbook_matches_recommendations()
+    test_following_the_playbook_never_leaves_it()
+    test_playbook_stops_at_a_whole_round()
@@ -133,6 +133,8 @@ response = requests.post(
         "unpaired_your_team": ["Laurence", "Byron", "Denis", "Sam", "Euan"],
         "unpaired_opponent_team": ["Jack", "John", "James", "Jim", "Joe"],
         "your_defender": your_defender,
+        "your_attackers": your_attackers,
+        "opponent_defender": opponent_defender,
         "opponent_attackers": opponent_attackers
     }
 )
@@ -0,0 +1,63 @@
+from itertools import combinations
+
+import numpy as np
+
+from recommender import SubgameEvaluator, recommend_options
+from opponent_models import OPPONENT_MODELS, respond, solve_matrix_game
+from conftest import sample_matrices, your_team, opponent_team
+
+def test_last_pairing_is_forced():
+    for model in OPPONENT_MODELS:
+        defenders = recommend_options("LAST", your_team, opponent_team, sample_matrices, "pick_defender",
+                                      ["Sam"], ["Joe"], opponent_model=model)
+        assert defenders == {"Sam": 15}
+        attackers = recommend_options("LAST", your_team, opponent_team, sample_matrices, "pick_attackers",
+                                      ["Sam"], ["Joe"], your_defender="Sam", opponent_defender="Joe",
+                                      opponent_model=model)
+        assert attackers == {(): 15}
+    print("✓ One player per side leaves a single forced option under every model")
+
+def test_attacker_options_ignore_request_order():
+    shuffled = ["Euan", "Sam", "Byron", "Laurence", "Denis"]
+    for model in OPPONENT_MODELS:
+        options = [
+            recommend_options(f"ORDER-{model}", your_team, opponent_team, sample_matrices, "pick_attackers",
+                              unpaired, list(reversed(opponent_team)), your_defender="Denis",
+                              opponent_defender="Jim", opponent_model=model)
+            for unpaired in (your_team, shuffled)
+        ]
+        assert options[0] == options[1] and len(set(options[0].values())) > 1
+        assert list(options[1]) == [("Laurence", "Byron"), ("Laurence", "Sam"), ("Laurence", "Euan"),
+                                    ("Byron", "Sam"), ("Byron", "Euan"), ("Sam", "Euan")]
+    print("✓ Attacker pairs keep their values however the request orders the players")
+
+def test_matchups_are_valued_within_the_exchange():
+    yours, theirs = your_team[:4], opponent_team[:4]
+    for model in OPPONENT_MODELS:
+        evaluator = SubgameEvaluator(your_team, opponent_team, sample_matrices, opponent_model=model)
+        your_mask, opp_mask = evaluator.your_mask(yours), evaluator.opponent_mask(theirs)
+        for defender in yours:
+            for opp_defender in theirs:
+                for attackers in combinations([name for name in yours if name != defender], 2):
+                    for offered in combinations([name for name in theirs if name != opp_defender], 2):
+                        # payoff[j][i]: we take their attacker j once theirs has taken our attacker i
+                        payoff = [[evaluator.matchup_options(yours, theirs, defender, list(offered), opp_defender,
+                                                             list(attackers), taken)[name]
+                                   for taken in attackers] for name in offered]
+                        if model == "nash":
+                            value = solve_matrix_game(np.array(payoff))[0]
+                        else:
+                            value = respond(model, [max(row[i] for row in payoff) for i in range(2)],
+                                            [sample_matrices[taken][opp_defender] for taken in attackers])
+                        exchange = evaluator._exchange_value(
+                            your_mask, opp_mask, evaluator.your_index[defender],
+                            tuple(evaluator.your_index[name] for name in attackers),
+                            evaluator.opponent_index[opp_defender],
+                            tuple(evaluator.opponent_index[name] for name in offered))
+                        assert abs(value - exchange) < 1e-9
+    print("✓ Our defender's best take is worth what the exchange is under every model")
+
+if __name__ == "__main__":
+    test_last_pairing_is_forced()
+    test_attacker_options_ignore_request_order()
+    test_matchups_are_valued_within_the_exchange()
@@ -0,0 +1,43 @@
+from optimizer import PairingOptimizer
+from conftest import sample_matrices, your_team, opponent_team
+
+# Seeded runs must be reproducible and not depend on how the strategies are
+# split across workers.
+
+def result_without_timing(result):
+    result.computation_time = 0.0
+    result.timings = {}
+    return result
+
+def test_seeded_runs_are_identical():
+    for mode in ("monte_carlo", "batch", "adaptive"):
+        first = PairingOptimizer(your_team, opponent_team, sample_matrices, seed=7).optimize(6000, mode)
+        second = PairingOptimizer(your_team, opponent_team, sample_matrices, seed=7).optimize(6000, mode)
+        assert result_without_timing(first) == result_without_timing(second)
+        assert first.seed == 7
+        print(f"✓ {mode}: seed 7 reproduces the same result")
+
+def test_unseeded_runs_follow_the_inputs():
+    first = PairingOptimizer(your_team, opponent_team, sample_matrices)
+    second = PairingOptimizer(your_team, opponent_team, sample_matrices)
+    assert first.seed == second.seed
+    changed = {**sample_matrices, "Sam": {**sample_matrices["Sam"], "Joe": 2}}
+    assert PairingOptimizer(your_team, opponent_team, changed).seed != first.seed
+    print("✓ The default seed is derived from the inputs")
+
+def test_split_does_not_change_samples():
+    optimizer = PairingOptimizer(your_team, opponent_team, sample_matrices, seed=3)
+    strategies = optimizer.strategies()
+    for mode in ("monte_carlo", "batch"):
+        whole = optimizer.sample_strategies(strategies, 200, mode)
+        split = {}
+        for chunk in (strategies[0::3], strategies[1::3], strategies[2::3]):
+            split.update(PairingOptimizer(your_team, opponent_team, sample_matrices, seed=3)
+                         .sample_strategies(chunk, 200, mode))
+        assert whole == split
+        print(f"✓ {mode}: samples are the same however the strategies are split")
+
+if __name__ == "__main__":
+    test_seeded_runs_are_identical()
+    test_unseeded_runs_follow_the_inputs()
+    test_split_does_not_change_samples()
@@ -0,0 +1,44 @@
+from solver import GameTreeSolver
+from sensitivity import row_sensitivity, best_strategy, TIPPING_PRECISION
+from conftest import sample_matrices, your_team, opponent_team
+
+# Each reported tipping point must really separate the current
+# recommendation from the one that takes over, checked with fresh solvers.
+
+def fresh_best(player: str, opponent: str, score: float, outlook: str = "expected"):
+    matrices = {**sample_matrices, player: {**sample_matrices[player], opponent: score}}
+    (defender, attackers), value = best_strategy(GameTreeSolver(your_team, opponent_team, matrices), outlook)
+    return {"defender": your_team[defender], "attackers": [your_team[a] for a in attackers]}, value
+
+def test_tipping_points_separate_recommendations():
+    base, value = fresh_best("Laurence", "Jack", 15)
+    checked = 0
+    for row in range(len(your_team)):
+        report = row_sensitivity(your_team, opponent_team, sample_matrices, row)
+        # Every row reports the unperturbed opening it measured against
+        (defender, attackers) = report["strategy"]
+        assert {"defender": your_team[defender], "attackers": [your_team[a] for a in attackers]} == base
+        assert abs(report["value"] - value) < 1e-9
+        for cell in report["cells"]:
+            player, opponent = cell["your_player"], cell["opponent_player"]
+            for side, sign in (("lower", -1), ("upper", 1)):
+                point = cell[f"{side}_tipping_point"]
+                if point is None:
+                    continue
+                taken_over = cell["below_recommendation" if sign < 0 else "above_recommendation"]
+                assert fresh_best(player, opponent, point - sign * TIPPING_PRECISION)[0] == base
+                assert fresh_best(player, opponent, point + sign * TIPPING_PRECISION)[0] == taken_over != base
+                checked += 1
+    assert checked
+    print(f"✓ {checked} tipping points match fresh solves on either side")
+
+def test_slope_is_the_value_change():
+    cell = next(c for c in row_sensitivity(your_team, opponent_team, sample_matrices, 2)["cells"] if c["opponent_player"] == "James")
+    _, low = fresh_best("Denis", "James", 17.5)
+    _, high = fresh_best("Denis", "James", 18.5)
+    assert abs(cell["slope"] - (high - low)) < 1e-9
+    print(f"✓ Denis vs James: the expected score moves {cell['slope']:.2f} per point")
+
+if __name__ == "__main__":
+    test_tipping_points_separate_recommendations()
+    test_slope_is_the_value_change()
@@ -0,0 +1,79 @@
+import numpy as np
+
+from solver import GameTreeSolver, OUTLOOKS
+from optimizer import PairingOptimizer
+from opponent_models import solve_matrix_game
+from conftest import random_matrices
+
+# A solver updated in place after a matrix edit must give the same strategy
+# values as a solver built from the edited matrices.
+
+def test_incremental_update_matches_fresh_solve():
+    for size in (3, 5, 6, 8):
+        your_team, opponent_team, matrices = random_matrices(size, size)
+        solver = GameTreeSolver(your_team, opponent_team, matrices)
+        solver.solve(OUTLOOKS)
+
+        matrices[your_team[1]][opponent_team[0]] += 7
+        assert solver.update_matrices(matrices) == [1]
+        before = solver.positions_computed
+        updated = solver.solve(OUTLOOKS)
+
+        assert updated == GameTreeSolver(your_team, opponent_team, matrices).solve(OUTLOOKS)
+        assert solver.positions_computed - before < solver.positions_evaluated
+        print(f"✓ {size} players: incremental solve matches a fresh solve")
+
+def test_unchanged_matrices_reuse_everything():
+    your_team, opponent_team, matrices = random_matrices(5, 0)
+    solver = GameTreeSolver(your_team, opponent_team, matrices)
+    first = solver.solve()
+    before = solver.positions_computed
+    assert solver.update_matrices(matrices) == []
+    assert solver.solve() == first
+    assert solver.positions_computed == before
+    print("✓ Unchanged matrices recompute nothing")
+
+def test_matrix_game_equilibrium():
+    rng = np.random.default_rng(0)
+    for shape in [(2, 2), (3, 3), (6, 4), (10, 10)]:
+        payoff = rng.integers(0, 20, shape).astype(float)
+        value, row_mix, col_mix = solve_matrix_game(payoff)
+        # Neither side gains by deviating from its mix
+        assert (row_mix @ payoff).min() >= value - 1e-9
+        assert (payoff @ col_mix).max() <= value + 1e-9
+        assert abs(row_mix.sum() - 1) < 1e-9 and abs(col_mix.sum() - 1) < 1e-9
+    print("✓ Matrix games solve to equilibria")
+
+def test_opponent_models_are_ordered():
+    your_team, opponent_team, matrices = random_matrices(5, 1)
+    values = GameTreeSolver(your_team, opponent_team, matrices).solve(("expected", "worst", "best", "greedy", "nash"))
+    for strategy_values in values.values():
+        # An opponent that sees our choices and plays to hurt us is the worst case
+        assert strategy_values["worst"] <= min(strategy_values["expected"], strategy_values["greedy"],
+                                               strategy_values["nash"]) + 1e-9
+        assert strategy_values["best"] >= strategy_values["expected"]
+    print("✓ Opponent models stay within the worst and best cases")
+
+def test_estimated_solves_are_bounded_by_the_full_search():
+    your_team, opponent_team, matrices = random_matrices(7, 2)
+    estimated = GameTreeSolver(your_team, opponent_team, matrices, max_exact_subgame=3)
+    searched = GameTreeSolver(your_team, opponent_team, matrices, max_exact_subgame=7)
+    assert not estimated.exact and searched.exact
+    outlooks = ("expected", "worst", "best", "greedy")
+    for strategy, values in searched.solve(outlooks).items():
+        for outlook in outlooks:
+            low, high = estimated.strategy_bounds(*strategy, outlook)
+            assert low - 1e-9 <= values[outlook] <= high + 1e-9
+            assert searched.strategy_bounds(*strategy, outlook) == (values[outlook], values[outlook])
+
+    result = PairingOptimizer(*random_matrices(8, 3)).optimize_exact()
+    low, high = result.confidence_interval
+    assert low < result.expected_score < high and result.confidence < 1
+    print(f"✓ 8 players: expected {result.expected_score:.1f} could be anywhere in {low:.1f}-{high:.1f}")
+
+if __name__ == "__main__":
+    test_incremental_update_matches_fresh_solve()
+    test_unchanged_matrices_reuse_everything()
+    test_matrix_game_equilibrium()
+    test_opponent_models_are_ordered()
+    test_estimated_solves_are_bounded_by_the_full_search()
@@ -4,7 +4,7 @@ const API_BASE_URL = 'https://strategium.onrender.com';
 
 export const api = {
   // Tournament endpoints
-  getTournaments: () => axios.get(`${API_BASE_URL}/tournaments`),
+  getTournaments: () => axios.get(`${API_BASE_URL}/tournaments`, { params: { summary: true } }),
   getTournament: (id) => axios.get(`${API_BASE_URL}/tournaments/${id}`),
   getTournamentSessions: (tournamentId) => axios.get(`${API_BASE_URL}/tournaments/${tournamentId}/sessions`),
   
@@ -15,8 +15,10 @@ export const api = {
   // Matrix endpoints
   submitMatrix: (code, data) => axios.post(`${API_BASE_URL}/sessions/${code}/matrix`, data),
   getMatrices: (code) => axios.get(`${API_BASE_URL}/sessions/${code}/matrices`),
+  matrixEvents: (code) => new EventSource(`${API_BASE_URL}/sessions/${code}/events`),
   
   // Optimization endpoints
   optimize: (code) => axios.post(`${API_BASE_URL}/sessions/${code}/optimize`),
+  getPlaybook: (code) => axios.get(`${API_BASE_URL}/sessions/${code}/playbook`),
   getRecommendation: (code, data) => axios.post(`${API_BASE_URL}/sessions/${code}/recommend`, data),
 };
\ No newline at end of file
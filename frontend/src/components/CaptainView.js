@@ -1,5 +1,6 @@
-import React, { useState, useEffect } from 'react';
+import React, { useState, useEffect, useRef } from 'react';
 import { api } from '../api';
+import { recommendFromPlaybook } from '../playbook';
 import './CaptainView.css';
 
 function CaptainView() {
@@ -12,6 +13,7 @@ function CaptainView() {
   const [sessionName, setSessionName] = useState('');
   const [matrices, setMatrices] = useState({});
   const [recommendation, setRecommendation] = useState(null);
+  const [playbook, setPlaybook] = useState(null);
   const [allSessions, setAllSessions] = useState([]);
   
   // Pairing state
@@ -22,8 +24,16 @@ function CaptainView() {
   const [opponentDefender, setOpponentDefender] = useState('');
   const [opponentAttackers, setOpponentAttackers] = useState([]);
   
+  const matrixEventsRef = useRef(null);
+  const playbookLoadingRef = useRef(false);
+  
   useEffect(() => {
     loadTournaments();
+    return () => {
+      if (matrixEventsRef.current) {
+        matrixEventsRef.current.close();
+      }
+    };
   }, []);
   
   const loadTournaments = async () => {
@@ -80,7 +90,7 @@ function CaptainView() {
       setUnpairedYourTeam(yourTeam.players.map(p => p.name));
       setUnpairedOpponentTeam(opponentTeam.players.map(p => p.name));
       
-      pollMatrices(response.data.code);
+      watchMatrices(response.data.code);
     } catch (error) {
       console.error('Error creating session:', error);
     }
@@ -109,7 +119,7 @@ function CaptainView() {
       const matricesResponse = await api.getMatrices(code);
       setMatrices(matricesResponse.data.matrices);
       
-      pollMatrices(code);
+      watchMatrices(code);
       setStep('waiting');
     } catch (error) {
       alert('Session not found. Please check the code.');
@@ -117,6 +127,36 @@ function CaptainView() {
     }
   };
   
+  const watchMatrices = (code) => {
+    if (!window.EventSource) {
+      pollMatrices(code);
+      return;
+    }
+    
+    if (matrixEventsRef.current) {
+      matrixEventsRef.current.close();
+    }
+    
+    const source = api.matrixEvents(code);
+    matrixEventsRef.current = source;
+    
+    source.addEventListener('snapshot', (event) => {
+      setMatrices(JSON.parse(event.data).matrices);
+    });
+    
+    source.addEventListener('matrix_submitted', (event) => {
+      const data = JSON.parse(event.data);
+      setMatrices(prev => ({ ...prev, [data.player]: data.matrix }));
+    });
+    
+    source.onerror = () => {
+      // Stream unavailable or dropped: fall back to polling
+      source.close();
+      matrixEventsRef.current = null;
+      pollMatrices(code);
+    };
+  };
+  
   const pollMatrices = async (code) => {
     const interval = setInterval(async () => {
       try {
@@ -132,10 +172,21 @@ function CaptainView() {
     }, 2000);
   };
   
+  const loadPlaybook = () => {
+    if (playbookLoadingRef.current) return;
+    playbookLoadingRef.current = true;
+    api.getPlaybook(sessionCode)
+      .then(response => setPlaybook(response.data))
+      .catch(error => console.error('Error loading playbook:', error))
+      .finally(() => { playbookLoadingRef.current = false; });
+  };
+  
   const startPairing = () => {
     setStep('pairing');
     setPairingStep('pick_defender');
     getRecommendation('pick_defender');
+    // Later decisions are looked up locally once the playbook has loaded
+    loadPlaybook();
   };
   
   const getRecommendation = async (decisionType, extraData = {}) => {
@@ -147,8 +198,16 @@ function CaptainView() {
         ...extraData
       };
       
+      const local = playbook && recommendFromPlaybook(playbook, requestData);
+      if (local) {
+        setRecommendation(local);
+        return;
+      }
+      
       const response = await api.getRecommendation(sessionCode, requestData);
       setRecommendation(response.data);
+      // A book cut short by the server's time budget grows on each request, as the worker stays warm
+      if (playbook && playbook.timed_out) loadPlaybook();
     } catch (error) {
       console.error('Error getting recommendation:', error);
     }
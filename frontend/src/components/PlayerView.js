@@ -10,6 +10,7 @@ function PlayerView() {
   const [opponentTeam, setOpponentTeam] = useState(null);
   const [selectedPlayer, setSelectedPlayer] = useState('');
   const [matrix, setMatrix] = useState({});
+  const [spread, setSpread] = useState({}); // optional {opponent: {min, max}}
   const [error, setError] = useState('');
 
   const joinSession = async () => {
@@ -59,11 +60,31 @@ function PlayerView() {
     });
   };
 
+  const updateRange = (opponentName, bound, value) => {
+    setSpread({
+      ...spread,
+      [opponentName]: { ...spread[opponentName], [bound]: value === '' ? undefined : parseInt(value) }
+    });
+  };
+
+  // Only ranges with both ends filled in are sent
+  const completeRanges = () => Object.fromEntries(
+    Object.entries(spread).filter(([, range]) => range && range.min !== undefined && range.max !== undefined)
+  );
+
   const submitMatrix = async () => {
+    const ranges = completeRanges();
+    const invalid = Object.entries(ranges).find(([name, range]) => !(range.min <= matrix[name] && matrix[name] <= range.max));
+    if (invalid) {
+      setError(`The range for ${invalid[0]} must include your predicted score.`);
+      return;
+    }
+
     try {
       await api.submitMatrix(sessionCode.toUpperCase(), {
         player_name: selectedPlayer,
-        matrix: matrix
+        matrix: matrix,
+        ...(Object.keys(ranges).length ? { spread: ranges } : {})
       });
       setStep('submitted');
     } catch (err) {
@@ -123,11 +144,13 @@ function PlayerView() {
           <h3>Predict Your Matchups</h3>
           <p>Player: <strong>{selectedPlayer}</strong></p>
           <p>Enter your predicted score (0-20) against each opponent:</p>
+          <p><small>Unsure? Optionally give the lowest and highest score you could see, so the optimiser can weigh the risk.</small></p>
 
           <div className="matrix-grid">
             <div className="matrix-header">
               <div>Opponent</div>
               <div>Your Predicted Score</div>
+              <div>Range (optional)</div>
             </div>
 
             {opponentTeam.players.map(opponent => (
@@ -154,6 +177,26 @@ function PlayerView() {
                     className="score-number"
                   />
                 </div>
+                <div className="score-range">
+                  <input
+                    type="number"
+                    min="0"
+                    max="20"
+                    placeholder="min"
+                    value={spread[opponent.name]?.min ?? ''}
+                    onChange={(e) => updateRange(opponent.name, 'min', e.target.value)}
+                    className="score-number"
+                  />
+                  <input
+                    type="number"
+                    min="0"
+                    max="20"
+                    placeholder="max"
+                    value={spread[opponent.name]?.max ?? ''}
+                    onChange={(e) => updateRange(opponent.name, 'max', e.target.value)}
+                    className="score-number"
+                  />
+                </div>
               </div>
             ))}
           </div>
@@ -177,6 +220,7 @@ function PlayerView() {
             })}
           </div>
 
+          {error && <p className="error-message">{error}</p>}
           <button className="primary-button" onClick={submitMatrix}>
             Submit Predictions
           </button>
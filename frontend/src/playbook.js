@@ -0,0 +1,80 @@
+// Local lookups into the playbook from GET /sessions/{code}/playbook.
+// Each function answers like POST /sessions/{code}/recommend, or returns null
+// when the position is off the book so the caller can ask the API instead.
+// See backend/playbook.py for the layout.
+
+const indicesOf = (names, team) => {
+  const indices = names.map(name => team.indexOf(name));
+  return indices.includes(-1) ? null : indices.sort((a, b) => a - b);
+};
+
+const maskOf = (indices) => indices.reduce((mask, index) => mask + 2 ** index, 0);
+
+const combinations = (items, size) => {
+  if (size === 0) return [[]];
+  return items.flatMap((item, i) =>
+    combinations(items.slice(i + 1), size - 1).map(rest => [item, ...rest])
+  );
+};
+
+// Python's str() of a tuple, which is how /recommend labels attacker pairs
+const pairLabel = (names) => `(${names.map(name => `'${name}'`).join(', ')}${names.length === 1 ? ',' : ''})`;
+
+const answer = (decisionType, playbook, options) => {
+  const [best] = options.reduce((top, option) => (option[1] > top[1] ? option : top));
+  return {
+    recommendation: best,
+    expected_total_score: Math.max(...options.map(([, value]) => value)),
+    all_options: Object.fromEntries(options.map(([label, value]) => [
+      Array.isArray(label) ? pairLabel(label) : label, value
+    ])),
+    decision_type: decisionType,
+    opponent_model: playbook.opponent_model,
+    source: 'playbook',
+  };
+};
+
+export function recommendFromPlaybook(playbook, request) {
+  const yourTeam = playbook.your_team;
+  const opponentTeam = playbook.opponent_team;
+  const yours = indicesOf(request.unpaired_your_team, yourTeam);
+  const theirs = indicesOf(request.unpaired_opponent_team, opponentTeam);
+  if (!yours || !theirs) return null;
+
+  const state = playbook.states[`${maskOf(yours)}:${maskOf(theirs)}`];
+  if (!state || state.defenders === undefined) return null;
+
+  if (request.decision_type === 'pick_defender') {
+    return answer(request.decision_type, playbook,
+      yours.map((y, i) => [yourTeam[y], state.defenders[i]]));
+  }
+
+  // Later decisions are only in the book for the defender it recommends
+  if (request.your_defender !== yourTeam[state.defender]) return null;
+
+  if (request.decision_type === 'pick_attackers') {
+    const row = theirs.indexOf(opponentTeam.indexOf(request.opponent_defender));
+    if (row === -1) return null;
+    const pool = yours.filter(y => y !== state.defender);
+    const pairs = combinations(pool, Math.min(2, pool.length));
+    return answer(request.decision_type, playbook,
+      pairs.map((pair, i) => [pair.map(y => yourTeam[y]), state.attackers[row][i]]));
+  }
+
+  // Takes are held for the attackers the book sent, once their defender has taken one
+  const row = theirs.indexOf(opponentTeam.indexOf(request.opponent_defender));
+  if (row === -1) return null;
+  const pool = yours.filter(y => y !== state.defender);
+  const pairs = combinations(pool, Math.min(2, pool.length));
+  const sent = pairs[state.attackers[row].indexOf(Math.max(...state.attackers[row]))];
+  const attackers = indicesOf(request.your_attackers || [], yourTeam);
+  if (!attackers || attackers.join() !== sent.join()) return null;
+  const taken = sent.indexOf(yourTeam.indexOf(request.your_attacker_taken));
+  if (taken === -1) return null;
+
+  const offerable = theirs.filter((o, i) => i !== row);
+  const offered = (request.opponent_attackers || []).map(name => offerable.indexOf(opponentTeam.indexOf(name)));
+  if (!offered.length || offered.includes(-1)) return null;
+  return answer(request.decision_type, playbook,
+    offered.map(position => [opponentTeam[offerable[position]], state.takes[row][taken][position]]));
+}